@@ -1,15 +1,32 @@
 # -*- coding: utf-8 -*-
 
+from django.utils.translation import gettext_lazy as _
 from modernrpc.core import REQUEST_KEY, rpc_method
 
 from tcms.bugs.models import Bug
 from tcms.management.models import Tag
 from tcms.rpc.decorators import permissions_required
+from tcms.rpc.utils import (check_start, search_filter, search_filter_page, search_page,
+                            unique_filter)
+from tcms.search import fulltext
+
+# pk must be the first item
+FILTER_FIELDS = (
+    'pk',
+    'summary',
+    'created_at',
+    'product__name',
+    'version__value',
+    'build__name',
+    'reporter__username',
+    'assignee__username',
+)
 
 __all__ = (
     'add_tag',
     'remove_tag',
     'filter',
+    'search',
     'remove',
 )
 
@@ -74,25 +91,92 @@ def remove(query):
 
 
 @rpc_method(name='Bug.filter')
-def filter(query):  # pylint: disable=redefined-builtin
+def filter(query, limit=None,  # pylint: disable=redefined-builtin,too-many-arguments
+           after_pk=None, fields=None,
+           search=None, start=0):  # pylint: disable=redefined-outer-name
     """
-    .. function:: XML-RPC Bug.filter(query)
+    .. function:: XML-RPC Bug.filter(query, limit, after_pk, fields, search, start)
 
         Get list of bugs.
 
         :param query: Field lookups for :class:`tcms.bugs.models.Bug`
         :type query: dict
+        :param limit: Return a single page with at most this many objects
+        :type limit: int
+        :param after_pk: Return only objects with PK greater than this value
+        :type after_pk: int
+        :param fields: Names of the fields to return, all fields if not specified.
+                       ``pk`` is always returned!
+        :type fields: list(str)
+        :param search: Return only bugs containing these words, ordered by
+                       relevance instead of by PK. See :mod:`tcms.search.fulltext`
+        :type search: str
+        :param start: Index of the first object on the page, used to page
+                      through search results when ``limit`` is specified
+        :type start: int
         :return: List of serialized :class:`tcms.bugs.models.Bug` objects.
-        :rtype: list
+                 When ``limit`` is specified returns ``{'data': [...], 'next': pk}``,
+                 use ``next`` as ``after_pk`` to fetch the next page until it is ``None``.
+                 When searching ``next`` is always ``None``, use ``next_start``
+                 as ``start`` instead
+        :rtype: list or dict
+        :raises ValueError: if ``limit`` or ``fields`` are not valid or
+                            if ``after_pk`` is used together with ``search``
+                            or if ``start`` is not valid
     """
-    result = Bug.objects.filter(**query).values(
-        'pk',
-        'summary',
-        'created_at',
-        'product__name',
-        'version__value',
-        'build__name',
-        'reporter__username',
-        'assignee__username',
-    )
-    return list(result)
+    values_fields = FILTER_FIELDS
+    if fields is not None:
+        unknown = set(fields).difference(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(_('Unknown fields: %s') % ', '.join(sorted(unknown)))
+        values_fields = ('pk', ) + tuple(name for name in FILTER_FIELDS[1:] if name in fields)
+
+    result = search_filter(Bug, query, after_pk, search).values(*values_fields)
+
+    if limit is None:
+        return list(result)
+
+    if not isinstance(limit, int) or limit < 1:
+        raise ValueError(_('limit must be a positive integer'))
+
+    check_start(start)
+
+    data = list(result[start:start + limit])
+    return search_filter_page({
+        'data': data,
+        'next': data[-1]['pk'] if len(data) == limit else None,
+    }, search, start, limit)
+
+
+@rpc_method(name='Bug.search')
+def search(query=None, order_by=None, start=0, length=None, terms=None):
+    """
+    .. function:: XML-RPC Bug.search(query, order_by, start, length, terms)
+
+        Return a single page of bugs, sorted on the server, together
+        with the number of all matching bugs. Items contain the same
+        keys as the result of ``Bug.filter()``.
+
+        :param query: Field lookups for :class:`tcms.bugs.models.Bug`
+        :type query: dict
+        :param order_by: Keys of the result to sort by, prefixed with ``-``
+                         for descending order, e.g. ``['-created_at']``.
+                         Sorted by relevance when searching for ``terms``,
+                         otherwise by PK, if not specified
+        :type order_by: list(str)
+        :param start: Index of the first bug to return
+        :type start: int
+        :param length: Maximum number of bugs to return,
+                       ``DEFAULT_PAGE_SIZE`` if not specified
+        :type length: int
+        :param terms: Return only bugs containing these words,
+                      see :mod:`tcms.search.fulltext`
+        :type terms: str
+        :return: ``{'total': int, 'data': [...]}``
+        :rtype: dict
+        :raises ValueError: if ``order_by``, ``start`` or ``length`` are not valid
+    """
+    query_set = unique_filter(Bug, query or {}).order_by('pk')
+    query_set = fulltext.search(query_set, terms)
+    return search_page(query_set, dict((name, name) for name in FILTER_FIELDS),
+                       order_by, start, length)
@@ -1,6 +1,6 @@
 # pylint: disable=import-outside-toplevel
 from django.apps import AppConfig as DjangoAppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_migrate
 from django.db.models.signals import post_save
 
 
@@ -8,11 +8,16 @@ class AppConfig(DjangoAppConfig):
     name = 'tcms.bugs'
 
     def ready(self):
+        from django_comments.models import Comment
         from .models import Bug
         from .management import create_permissions
         from tcms import signals
 
         post_save.connect(signals.handle_emails_post_bug_save, sender=Bug)
+        post_save.connect(signals.handle_search_index_post_save, sender=Bug)
+        post_delete.connect(signals.handle_search_index_post_delete, sender=Bug)
+        post_save.connect(signals.handle_search_index_post_comment_save, sender=Comment)
+        post_delete.connect(signals.handle_search_index_post_comment_save, sender=Comment)
         post_migrate.connect(
             create_permissions,
             dispatch_uid="tcms.bugs.management.create_permissions"
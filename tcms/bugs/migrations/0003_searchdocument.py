@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+def index_bugs(apps, schema_editor):
+    """
+        Index existing bugs for full-text search, the same
+        way tcms.search.fulltext.searchable_text() does.
+    """
+    bug_model = apps.get_model('bugs', 'Bug')
+    if not bug_model.objects.exists():
+        return
+
+    comment_model = apps.get_model('django_comments', 'Comment')
+    content_type_model = apps.get_model('contenttypes', 'ContentType')
+    search_document_model = apps.get_model('search', 'SearchDocument')
+
+    content_type, _ = content_type_model.objects.get_or_create(app_label='bugs', model='bug')
+
+    # the description of a bug is its first comment
+    comments = {}
+    for object_pk, comment in comment_model.objects.filter(
+            content_type=content_type, is_removed=False
+    ).order_by('pk').values_list('object_pk', 'comment').iterator():
+        comments.setdefault(object_pk, []).append(comment)
+
+    documents = []
+    for pk, summary in bug_model.objects.values_list('pk', 'summary').iterator():
+        values = [summary or '']
+        values.extend(comments.get(str(pk), []))
+        documents.append(search_document_model(
+            content_type=content_type, object_id=pk, text='\n'.join(values)))
+
+    search_document_model.objects.bulk_create(documents, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('bugs', '0002_add_permissions'),
+        ('django_comments', '0003_add_submit_date_index'),
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_bugs, migrations.RunPython.noop),
+    ]
@@ -2,13 +2,11 @@
 $(document).ready(function() {
     var table = $("#resultsTable").DataTable({
         pageLength: $('#navbar').data('defaultpagesize'),
+        // pages are sorted and sliced on the server
+        serverSide: true,
         ajax: function(data, callback, settings) {
             var params = {};
 
-            if ($('#id_summary').val()) {
-                params['summary__icontains'] = $('#id_summary').val();
-            }
-
             if ($('#id_product').val()) {
                 params['product'] = $('#id_product').val();
             };
@@ -39,22 +37,26 @@ $(document).ready(function() {
 
             params['status'] = $('#id_status').is(':checked');
 
-            dataTableJsonRPC('Bug.filter', params, callback);
+            // full-text search in summary and comments, ordered by relevance
+            const search = $('#id_summary').val();
+
+            dataTableSearchRPC('Bug.search', params, data, callback, search);
         },
         columns: [
-            { data: "pk" },
+            { data: "pk", name: "pk" },
             {
                 data: null,
+                name: "summary",
                 render: function (data, type, full, meta) {
                     return '<a href="/bugs/'+ data.pk + '/" target="_parent">' + escapeHTML(data.summary) + '</a>';
                 }
             },
-            { data: "created_at" },
-            { data: "product__name" },
-            { data: "version__value"},
-            { data: "build__name"},
-            { data: "reporter__username" },
-            { data: "assignee__username" },
+            { data: "created_at", name: "created_at" },
+            { data: "product__name", name: "product__name" },
+            { data: "version__value", name: "version__value" },
+            { data: "build__name", name: "build__name" },
+            { data: "reporter__username", name: "reporter__username" },
+            { data: "assignee__username", name: "assignee__username" },
         ],
         dom: "t",
         language: {
@@ -62,7 +64,8 @@ $(document).ready(function() {
             processing: '<div class="spinner spinner-lg"></div>',
             zeroRecords: "No records found"
         },
-        order: [[ 0, 'asc' ]],
+        // keep the order from the server, by relevance when searching
+        order: [],
     });
 
     hookIntoPagination('#resultsTable', table);
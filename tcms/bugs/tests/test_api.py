@@ -11,6 +11,7 @@ if "tcms.bugs.apps.AppConfig" not in settings.INSTALLED_APPS:
 
 from tcms.bugs.models import Bug                                        # noqa: E402
 from tcms.bugs.tests.factory import BugFactory                          # noqa: E402
+from tcms.core.helpers.comments import add_comment                      # noqa: E402
 from tcms.rpc.tests.utils import APITestCase, APIPermissionsTestCase    # noqa: E402
 from tcms.tests.factories import TagFactory                             # noqa: E402
 
@@ -121,3 +122,58 @@ class TestFilter(APITestCase):
     def test_filter_non_existing(self):
         result = self.rpc_client.Bug.filter({"pk": -99})
         self.assertEqual(len(result), 0)
+
+    def test_filter_pages(self):
+        result = self.rpc_client.Bug.filter({}, 2, None, ['summary'])
+
+        self.assertEqual([self.bug.pk, self.another_bug.pk],
+                         list(item['pk'] for item in result['data']))
+        self.assertEqual(['pk', 'summary'], sorted(result['data'][0].keys()))
+        self.assertEqual(self.another_bug.pk, result['next'])
+
+        result = self.rpc_client.Bug.filter({}, 2, result['next'], ['summary'])
+        self.assertEqual([self.yet_another_bug.pk],
+                         list(item['pk'] for item in result['data']))
+        self.assertIsNone(result['next'])
+
+    def test_filter_with_unknown_fields(self):
+        with self.assertRaisesRegex(XmlRPCFault, 'Unknown fields: non_existing'):
+            self.rpc_client.Bug.filter({}, None, None, ['summary', 'non_existing'])
+
+    def test_filter_with_search_in_comments(self):
+        add_comment([self.yet_another_bug], 'Crashes when the disk is full', self.api_user)
+
+        result = self.rpc_client.Bug.filter({'status': True}, None, None, ['summary'],
+                                            'disk full')
+        self.assertEqual([self.yet_another_bug.pk], list(item['pk'] for item in result))
+
+    def test_filter_pages_with_search(self):
+        add_comment([self.bug, self.yet_another_bug], 'Crashes when the disk is full',
+                    self.api_user)
+
+        result = self.rpc_client.Bug.filter({}, 1, None, ['summary'], 'disk full')
+        self.assertEqual(1, len(result['data']))
+        self.assertIsNone(result['next'])
+        self.assertEqual(1, result['next_start'])
+        pks = [result['data'][0]['pk']]
+
+        result = self.rpc_client.Bug.filter({}, 1, None, ['summary'], 'disk full',
+                                            result['next_start'])
+        pks.append(result['data'][0]['pk'])
+        self.assertEqual(sorted(pks), [self.bug.pk, self.yet_another_bug.pk])
+
+        result = self.rpc_client.Bug.filter({}, 1, None, ['summary'], 'disk full', 2)
+        self.assertEqual([], result['data'])
+        self.assertIsNone(result['next_start'])
+
+    def test_search(self):
+        result = self.rpc_client.Bug.search({'status': True}, ['-pk'], 0, 1)
+
+        self.assertEqual(2, result['total'])
+        self.assertEqual([self.yet_another_bug.pk], list(item['pk'] for item in result['data']))
+        self.assertEqual(self.yet_another_bug.product.name,
+                         result['data'][0]['product__name'])
+
+    def test_search_with_invalid_length(self):
+        with self.assertRaisesRegex(XmlRPCFault, 'length must be a positive integer'):
+            self.rpc_client.Bug.search({}, None, 0, 0)
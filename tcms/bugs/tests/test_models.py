@@ -6,10 +6,10 @@ from django.conf import settings
 if 'tcms.bugs.apps.AppConfig' not in settings.INSTALLED_APPS:
     raise unittest.SkipTest('tcms.bugs is disabled')
 
+from django.core import mail                            # noqa: E402
 from django.template.loader import render_to_string     # noqa: E402
 from django.test import TestCase                        # noqa: E402
 from django.utils.translation import gettext_lazy as _  # noqa: E402
-from mock import patch                                  # noqa: E402
 
 from tcms.tests.factories import UserFactory            # noqa: E402
 from tcms.bugs.tests.factory import BugFactory          # noqa: E402
@@ -23,8 +23,7 @@ class TestSendMailOnAssigneeChange(TestCase):
     * Assignee is assigned bug which was previously assigned to someone other assignee
     """
 
-    @patch('tcms.core.utils.mailto.send_mail')
-    def test_notify_assignee_on_bug_creation(self, send_mail):
+    def test_notify_assignee_on_bug_creation(self):
         assignee = UserFactory()
         bug = BugFactory(assignee=assignee)
 
@@ -33,17 +32,14 @@ class TestSendMailOnAssigneeChange(TestCase):
         expected_body = render_to_string('email/post_bug_save/email.txt', {'bug': bug})
         expected_recipients = [assignee.email]
 
-        send_mail.assert_called_once_with(
-            settings.EMAIL_SUBJECT_PREFIX + expected_subject,
-            expected_body,
-            settings.DEFAULT_FROM_EMAIL,
-            expected_recipients,
-            fail_silently=False
-        )
-        self.assertTrue(send_mail.called)
-
-    @patch('tcms.core.utils.mailto.send_mail')
-    def test_no_notification_if_assignee_not_set(self, send_mail):
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual(settings.EMAIL_SUBJECT_PREFIX + expected_subject,
+                         mail.outbox[0].subject)
+        self.assertEqual(expected_body, mail.outbox[0].body)
+        self.assertEqual(settings.DEFAULT_FROM_EMAIL, mail.outbox[0].from_email)
+        self.assertEqual(expected_recipients, mail.outbox[0].to)
+
+    def test_no_notification_if_assignee_not_set(self):
         BugFactory(assignee=None)
 
-        self.assertFalse(send_mail.called)
+        self.assertEqual(0, len(mail.outbox))
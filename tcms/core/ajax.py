@@ -15,6 +15,7 @@ from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 from django.views.generic.base import View
 
+from tcms.testcases.helpers.email import email_cases_update
 from tcms.testcases.models import TestCase, TestCaseTag
 from tcms.testplans.models import TestPlan, TestPlanTag
 from tcms.testruns.models import TestRunTag
@@ -151,13 +152,12 @@ class UpdateTestCaseActorsView(View):
                                     status=HTTPStatus.NOT_FOUND)
 
         what_to_update = request.POST.get('what_to_update')
-        case_ids = request.POST.getlist('case[]')
-        for test_case in TestCase.objects.filter(pk__in=case_ids):
-            if what_to_update == 'default_tester':
-                test_case.default_tester_id = user.pk
-            elif what_to_update == 'reviewer':
-                test_case.reviewer_id = user.pk
-
-            test_case.save()
+        if what_to_update in ('default_tester', 'reviewer'):
+            # update all TestCases at once and send a single email to
+            # every recipient instead of calling save() for each TestCase
+            cases = TestCase.bulk_update(request.POST.getlist('case[]'),
+                                         {what_to_update + '_id': user.pk},
+                                         request.user)
+            email_cases_update(cases, request.user)
 
         return JsonResponse({'rc': 0, 'response': 'ok'})
@@ -0,0 +1,29 @@
+# pylint: disable=import-outside-toplevel
+from django.apps import AppConfig as DjangoAppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+class AppConfig(DjangoAppConfig):
+    name = 'tcms.core'
+
+    def ready(self):
+        from django.contrib.sites.models import Site
+
+        from .middleware import reset_unapplied_migrations
+        from .utils import reset_current_site
+
+        post_migrate.connect(
+            reset_unapplied_migrations,
+            dispatch_uid="tcms.core.middleware.reset_unapplied_migrations"
+        )
+
+        post_save.connect(
+            reset_current_site,
+            sender=Site,
+            dispatch_uid="tcms.core.utils.reset_current_site.post_save"
+        )
+        post_delete.connect(
+            reset_current_site,
+            sender=Site,
+            dispatch_uid="tcms.core.utils.reset_current_site.post_delete"
+        )
@@ -5,10 +5,11 @@ of objects.
 """
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.sites.models import Site
 from django.utils import timezone
 from django_comments.models import Comment
 
+from tcms.core.utils import current_site
+
 
 def add_comment(objs, comments, user, submit_date=None):
     """
@@ -32,7 +33,7 @@ def add_comment(objs, comments, user, submit_date=None):
         comments = 'stupid comments by Homer'
         add_comment([testrun,], comments, testuser)
     """
-    site = Site.objects.get(pk=settings.SITE_ID)
+    site = current_site()
     for obj in objs:
         content_type = ContentType.objects.get_for_model(model=obj.__class__)
         Comment.objects.create(content_type=content_type,
@@ -45,6 +46,39 @@ def add_comment(objs, comments, user, submit_date=None):
                                user_name=user.username)
 
 
+def add_comments(objs_with_comments, user, submit_date=None):
+    """
+    Add django.comment objects for multiple objects at once, using
+    a fixed number of queries.
+
+    :param objs_with_comments: List of (object, commentary) pairs
+    :type objs_with_comments: list
+    :param user: Who is adding this
+    :type user: A User model
+    :param submit_date: A time stamp
+    :type submit_date: datetime.datetime
+    """
+    if not objs_with_comments:
+        return
+
+    site = current_site()
+    submit_date = submit_date or timezone.now()
+    new_comments = []
+    for obj, comment in objs_with_comments:
+        new_comments.append(
+            Comment(content_type=ContentType.objects.get_for_model(model=obj.__class__),
+                    site=site,
+                    object_pk=obj.pk,
+                    user=user,
+                    comment=comment,
+                    submit_date=submit_date,
+                    user_email=user.email,
+                    user_name=user.username))
+
+    # comments don't keep history
+    Comment.objects.bulk_create(new_comments)  # pylint: disable=bulk-create-used
+
+
 def get_comments(obj):
     content_type = ContentType.objects.get_for_model(obj)
     return Comment.objects.filter(
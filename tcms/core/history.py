@@ -1,6 +1,11 @@
 # pylint: disable=unused-argument, no-self-use, avoid-list-comprehension
 import difflib
+import json
+from copy import copy
 
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
 from django.db.models import signals
 from django.http import HttpResponseRedirect
 from django.template.defaultfilters import safe
@@ -9,6 +14,14 @@ from django.utils.translation import gettext_lazy as _
 from simple_history.admin import SimpleHistoryAdmin
 from simple_history.models import HistoricalRecords
 
+from tcms.core.models import ArchivedHistory
+
+# historical records referenced from other tables, which are never pruned.
+# Maps tracked models to (model, field) pairs storing ``history_id`` values
+HISTORY_REFERENCES = {
+    'testcases.testcase': [('testruns.testexecution', 'case_text_version')],
+}
+
 
 def diff_objects(old_instance, new_instance, fields):
     """
@@ -21,6 +34,10 @@ def diff_objects(old_instance, new_instance, fields):
         field_diff = []
         old_value = getattr(old_instance, field.attname)
         new_value = getattr(new_instance, field.attname)
+        # don't bother diffing (large) values which didn't change
+        if old_value == new_value:
+            continue
+
         for line in difflib.unified_diff(str(old_value).split('\n'),
                                          str(new_value).split('\n'),
                                          fromfile=field.attname,
@@ -63,7 +80,43 @@ class KiwiHistoricalRecords(HistoricalRecords):
         This class will keep track of what fields were changed
         inside of the ``history_change_reason`` field. This gives us
         a crude changelog until upstream introduces their new interface.
+
+        When ``snapshot=True`` the values of tracked fields are remembered
+        when the object is loaded from the database and after every save
+        so that ``pre_save`` doesn't need to query the previous version.
+        Objects which have been refreshed, or loaded with deferred fields,
+        fall back to querying the database!
     """
+    def __init__(self, *args, snapshot=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.snapshot = snapshot
+
+    def take_snapshot(self, instance, fields=None):
+        """
+            Remember the current values of tracked fields. Deferred fields
+            are not loaded, in which case there is no snapshot!
+        """
+        if fields is None:
+            fields = list(field.attname for field in self.fields_included(instance))
+            snapshot = {}
+        else:
+            snapshot = instance.__dict__.get('_history_snapshot')
+            # a partial snapshot can't be trusted
+            if snapshot is None:
+                return
+
+        for attname in fields:
+            if attname not in instance.__dict__:
+                instance.__dict__.pop('_history_snapshot', None)
+                return
+            snapshot[attname] = instance.__dict__[attname]
+
+        instance._history_snapshot = snapshot  # pylint: disable=protected-access
+
+    def post_init(self, instance, **kwargs):
+        if instance.pk:
+            self.take_snapshot(instance)
+
     def pre_save(self, instance, **kwargs):
         """
             Signal handlers don't have access to the previous version of
@@ -73,7 +126,15 @@ class KiwiHistoricalRecords(HistoricalRecords):
             return
 
         if instance.pk and hasattr(instance, 'history'):
-            instance.previous = instance.__class__.objects.get(pk=instance.pk)
+            snapshot = instance.__dict__.get('_history_snapshot')
+            # objects created with an explicit pk haven't been loaded from the DB
+            adding = instance._state.adding  # pylint: disable=protected-access
+            if snapshot is not None and not adding:
+                instance.previous = copy(instance)
+                for attname, value in snapshot.items():
+                    setattr(instance.previous, attname, value)
+            else:
+                instance.previous = instance.__class__.objects.get(pk=instance.pk)
 
     def post_save(self, instance, created, using=None, **kwargs):
         """
@@ -92,12 +153,23 @@ class KiwiHistoricalRecords(HistoricalRecords):
                 instance.previous, instance, self.fields_included(instance))
         super().post_save(instance, created, using, **kwargs)
 
+        if self.snapshot:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                # only the updated fields match what is stored in the DB
+                update_fields = list(instance._meta.get_field(name).attname
+                                     for name in update_fields)
+            self.take_snapshot(instance, update_fields)
+
     def finalize(self, sender, **kwargs):
         """
             Connect the pre_save signal handler after calling the inherited method.
         """
         super().finalize(sender, **kwargs)
         signals.pre_save.connect(self.pre_save, sender=sender, weak=False)
+        # finalize() is called for every model class, not only for self.cls
+        if self.snapshot and sender is self.cls:
+            signals.post_init.connect(self.post_init, sender=sender, weak=False)
 
 
 class ReadOnlyHistoryAdmin(SimpleHistoryAdmin):
@@ -121,3 +193,122 @@ class ReadOnlyHistoryAdmin(SimpleHistoryAdmin):
     def response_change(self, request, obj):
         super().response_change(request, obj)
         return HttpResponseRedirect(obj.get_absolute_url())
+
+
+def history_tracked_models():
+    """
+        Return all models which keep historical records.
+    """
+    result = []
+    for model in apps.get_models():
+        if getattr(model._meta, 'simple_history_manager_attribute', None):
+            result.append(model)
+    return result
+
+
+def _record_size(record):
+    return sum(len(str(value)) for value in record.values() if value is not None)
+
+
+def _update_stats(stats, deleted, no_op_ids):
+    for record in deleted:
+        stats['deleted'] += 1
+        stats['no_op'] += int(record['history_id'] in no_op_ids)
+        stats['size'] += _record_size(record)
+
+
+def _delete_records(model, historical, records, archive, dry_run):
+    """
+        Delete a batch of historical records, except the ones
+        referenced from other tables, in a short transaction.
+
+        :return: The records which have been deleted
+        :rtype: list
+    """
+    history_ids = list(record['history_id'] for record in records)
+    protected = set()
+    for label, field_name in HISTORY_REFERENCES.get(model._meta.label_lower, []):
+        protected |= set(apps.get_model(label).objects.filter(
+            **{'%s__in' % field_name: history_ids}
+        ).values_list(field_name, flat=True))
+
+    records = list(record for record in records if record['history_id'] not in protected)
+    if dry_run or not records:
+        return records
+
+    with transaction.atomic():
+        if archive:
+            schema_name = getattr(connection, 'schema_name', None)
+            ArchivedHistory.objects.bulk_create(  # pylint: disable=bulk-create-used
+                ArchivedHistory(schema_name=schema_name,
+                                model=historical._meta.label_lower,
+                                object_id=record['id'],
+                                history_id=record['history_id'],
+                                history_date=record['history_date'],
+                                data=json.dumps(record, cls=DjangoJSONEncoder))
+                for record in records)
+        historical.objects.filter(
+            history_id__in=list(record['history_id'] for record in records)
+        ).delete()
+
+    return records
+
+
+def prune_history(model, before=None, batch_size=1000, archive=False, dry_run=False):
+    """
+        Delete historical records of ``model`` which were created before
+        ``before``, if specified, and records which didn't change any of
+        the tracked fields compared to the previous record.
+
+        The latest record for every object, which represents its current
+        state, and records listed in :data:`HISTORY_REFERENCES` are kept!
+
+        :param model: Model tracked by :class:`KiwiHistoricalRecords`
+        :type model: class
+        :param before: Records older than this are deleted
+        :type before: datetime
+        :param batch_size: How many records are deleted in a single transaction
+        :type batch_size: int
+        :param archive: Copy deleted records into :class:`tcms.core.models.ArchivedHistory`
+        :type archive: bool
+        :param dry_run: Only calculate what would be deleted
+        :type dry_run: bool
+        :return: Number of deleted records, how many of them were no-op
+                 and the approximate size of the deleted data in bytes
+        :rtype: dict
+    """
+    historical = getattr(model, model._meta.simple_history_manager_attribute).model
+    attnames = list(field.attname for field in historical._meta.fields)
+    tracked = list(name for name in attnames if not name.startswith('history_'))
+
+    stats = {'deleted': 0, 'no_op': 0, 'size': 0}
+    candidates = []
+    # history_id of candidates which are no-op, never more than batch_size
+    no_op_ids = set()
+    previous = {'id': None}
+    previous_no_op = False
+    for record in historical.objects.order_by('id', 'history_id').values(
+            *attnames
+    ).iterator(batch_size):
+        same_object = previous['id'] == record['id']
+
+        # the previous record isn't the latest one for its object
+        if same_object and (previous_no_op or (
+                before is not None and previous['history_date'] < before)):
+            candidates.append(previous)
+            if previous_no_op:
+                no_op_ids.add(previous['history_id'])
+
+            if len(candidates) >= batch_size:
+                _update_stats(stats, _delete_records(model, historical, candidates,
+                                                     archive, dry_run), no_op_ids)
+                candidates = []
+                no_op_ids = set()
+
+        previous_no_op = same_object and record['history_type'] == '~' and all(
+            record[name] == previous[name] for name in tracked)
+        previous = record
+
+    _update_stats(stats, _delete_records(model, historical, candidates, archive, dry_run),
+                  no_op_ids)
+    return stats
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+from tcms.core.history import history_tracked_models, prune_history
+from tcms.core.utils.worker import schema_context, tenant_schema_names
+
+
+class Command(BaseCommand):
+    help = ("Deletes historical records which didn't change anything and, "
+            "if a retention period is configured, records older than that. "
+            "The latest record of every object and records referenced by "
+            "test executions are always kept, for all tenants if "
+            "kiwitcms-tenants is installed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.HISTORY_RETENTION_DAYS,
+            help='Delete records older than this many days. '
+                 'Default: settings.HISTORY_RETENTION_DAYS')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of records deleted in a single transaction')
+        parser.add_argument(
+            '--archive', action='store_true',
+            help='Copy deleted records into the ArchivedHistory table')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Report what would be deleted but don't delete anything")
+
+    def handle(self, *args, **kwargs):  # pylint: disable=unused-argument
+        before = None
+        if kwargs['days'] is not None:
+            before = timezone.now() - timedelta(days=kwargs['days'])
+
+        total = 0
+        for schema_name in tenant_schema_names():
+            if schema_name is not None:
+                self.stdout.write('Tenant %s' % schema_name)
+
+            with schema_context(schema_name):
+                for model in history_tracked_models():
+                    stats = prune_history(model, before, kwargs['batch_size'],
+                                          kwargs['archive'], kwargs['dry_run'])
+                    total += stats['size']
+                    self.stdout.write(
+                        '%s: %d historical records deleted, %d of them no-op, %s.' % (
+                            model._meta.verbose_name_plural, stats['deleted'],
+                            stats['no_op'], filesizeformat(stats['size'])))
+
+        if kwargs['dry_run']:
+            self.stdout.write('Dry run, nothing has been deleted!')
+        self.stdout.write(
+            'Approximately %s reclaimed. Run VACUUM or OPTIMIZE TABLE to return '
+            'the free space to the operating system.' % filesizeformat(total))
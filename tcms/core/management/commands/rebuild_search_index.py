@@ -0,0 +1,20 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from tcms.search.fulltext import INDEXED_FIELDS, rebuild_index
+
+
+class Command(BaseCommand):
+    help = ("Rebuilds the full-text search index for test cases, test plans "
+            "and bugs, e.g. after importing data directly into the database.")
+
+    def handle(self, *args, **kwargs):  # pylint: disable=unused-argument
+        for label in INDEXED_FIELDS:
+            try:
+                model = apps.get_model(label)
+            except LookupError:
+                # e.g. bugs when KIWI_DISABLE_BUGTRACKER is defined
+                continue
+
+            count = rebuild_index(model)
+            self.stdout.write('%d %s indexed.' % (count, model._meta.verbose_name_plural))
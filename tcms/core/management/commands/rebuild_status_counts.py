@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from tcms.testruns.models import TestRunStatusCount
+
+
+class Command(BaseCommand):
+    help = ("Recalculates the number of test executions in each status "
+            "for all or the specified test runs.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'run_ids', nargs='*', type=int,
+            help='PKs of test runs, all test runs if not specified',
+        )
+
+    def handle(self, *args, **kwargs):
+        count = TestRunStatusCount.rebuild(kwargs['run_ids'] or None)
+        self.stdout.write('%d counters rebuilt.' % count)
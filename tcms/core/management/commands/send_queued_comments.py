@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from tcms.core.utils.worker import schema_context, tenant_schema_names
+from tcms.issuetracker.comments import queue_stats, send_queued_comments
+
+
+class Command(BaseCommand):
+    help = ("Posts all comments waiting in the queue to issue trackers, for all "
+            "tenants if kiwitcms-tenants is installed. Use it from cron when "
+            "ISSUE_TRACKER_QUEUE_WORKER = None!")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Only show queue statistics, do not post any comments',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['stats']:
+            stats = queue_stats()
+            self.stdout.write('Pending: %d' % stats['pending'])
+            self.stdout.write('Delivered: %d' % stats['delivered'])
+            self.stdout.write('Failed: %d' % stats['failed'])
+            self.stdout.write('Oldest: %s' % stats['oldest'])
+            return
+
+        count = 0
+        for schema_name in tenant_schema_names():
+            with schema_context(schema_name):
+                processed = send_queued_comments()
+                while processed:
+                    count += processed
+                    processed = send_queued_comments()
+
+        self.stdout.write('%d comments processed.' % count)
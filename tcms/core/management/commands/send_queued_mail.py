@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from tcms.core.utils.mailto import queue_stats, send_queued_mail
+
+
+class Command(BaseCommand):
+    help = ("Delivers all emails waiting in the queue. Use it from cron "
+            "when EMAIL_QUEUE_WORKER = None!")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Only show queue statistics, do not deliver any emails',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['stats']:
+            stats = queue_stats()
+            self.stdout.write('Pending: %d' % stats['pending'])
+            self.stdout.write('Failed: %d' % stats['failed'])
+            self.stdout.write('Oldest: %s' % stats['oldest'])
+            return
+
+        count = 0
+        processed = send_queued_mail()
+        while processed:
+            count += processed
+            processed = send_queued_mail()
+
+        self.stdout.write('%d emails processed.' % count)
@@ -1,15 +1,16 @@
 # pylint: disable=no-self-use, too-few-public-methods
 
-from django.conf import settings
 from django.contrib import messages
-from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils.deprecation import MiddlewareMixin
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
-from django.db import DEFAULT_DB_ALIAS, connections
+from django.db import connection
 from django.db.migrations.executor import MigrationExecutor
 
+from tcms.core.utils import current_site
+
 
 class CsrfDisableMiddleware(MiddlewareMixin):
     def process_view(self, request, _callback, _callback_args, _callback_kwargs):
@@ -19,7 +20,7 @@ class CsrfDisableMiddleware(MiddlewareMixin):
 class CheckSettingsMiddleware(MiddlewareMixin):
     def process_request(self, request):
         doc_url = 'https://kiwitcms.readthedocs.io/en/latest/admin.html#configure-kiwi-s-base-url'
-        site = Site.objects.get(pk=settings.SITE_ID)
+        site = current_site()
 
         if site.domain == '127.0.0.1:8000':
             messages.add_message(
@@ -36,20 +37,73 @@ class CheckSettingsMiddleware(MiddlewareMixin):
             )
 
 
+UNAPPLIED_MIGRATIONS_CACHE_KEY = 'tcms.core.middleware.unapplied_migrations'
+
+# web workers and `manage.py migrate` usually run in different processes,
+# even with a shared cache backend, so don't remember a non-zero result
+# for too long
+UNAPPLIED_MIGRATIONS_CACHE_TIMEOUT = 60
+
+# names of DB schemas where all migrations have been applied
+_ALL_MIGRATIONS_APPLIED = set()
+
+
+def _unapplied_migrations_cache_key(schema_name):
+    return '%s:%s' % (UNAPPLIED_MIGRATIONS_CACHE_KEY, schema_name)
+
+
+def count_unapplied_migrations():
+    """
+        Return the number of unapplied migrations.
+
+        Building a migration plan loads the entire migration graph from disk
+        and queries the database so the result is cached. Once all migrations
+        have been applied this is remembered for the lifetime of the process
+        b/c new migrations only appear after an upgrade, which restarts it!
+
+        The result is kept separately for every DB schema b/c tenants
+        are migrated one after the other when kiwitcms-tenants is installed.
+    """
+    schema_name = getattr(connection, 'schema_name', None)
+    if schema_name in _ALL_MIGRATIONS_APPLIED:
+        return 0
+
+    cache_key = _unapplied_migrations_cache_key(schema_name)
+    count = cache.get(cache_key)
+    if count is None:
+        executor = MigrationExecutor(connection)
+        count = len(executor.migration_plan(executor.loader.graph.leaf_nodes()))
+        if count:
+            cache.set(cache_key, count, UNAPPLIED_MIGRATIONS_CACHE_TIMEOUT)
+
+    if not count:
+        _ALL_MIGRATIONS_APPLIED.add(schema_name)
+
+    return count
+
+
+def reset_unapplied_migrations(**kwargs):  # pylint: disable=unused-argument
+    """
+        Connected to the ``post_migrate`` signal so that the next request
+        will check for unapplied migrations again!
+    """
+    _ALL_MIGRATIONS_APPLIED.clear()
+    cache.delete(_unapplied_migrations_cache_key(getattr(connection, 'schema_name', None)))
+
+
 class CheckUnappliedMigrationsMiddleware(MiddlewareMixin):
     def process_request(self, request):
         doc_url = 'https://kiwitcms.readthedocs.io/en/latest/'\
             'installing_docker.html#initial-configuration-of-running-container'
-        executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
-        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
-        if plan:
+        unapplied_migration_count = count_unapplied_migrations()
+        if unapplied_migration_count:
             messages.add_message(
                 request,
                 messages.ERROR,
                 mark_safe(  # nosec:B308:B703
                     _('You have %(unapplied_migration_count)s unapplied migration(s). '
                       'See <a href="%(doc_url)s">documentation</a>') % {
-                          "unapplied_migration_count": len(plan),
+                          "unapplied_migration_count": unapplied_migration_count,
                           "doc_url": doc_url,
                           }
                 )
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.9 on 2026-10-17 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_queuedemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('schema_name', models.CharField(blank=True, max_length=63, null=True)),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.PositiveIntegerField()),
+                ('history_id', models.PositiveIntegerField()),
+                ('history_date', models.DateTimeField()),
+                ('data', models.TextField()),
+            ],
+            options={
+                'index_together': {('schema_name', 'model', 'object_id')},
+            },
+        ),
+    ]
@@ -34,3 +34,53 @@ class TCMSActionModel(models.Model, UrlMixin):
         """
         serializer = Serializer(model=self)
         return serializer.serialize_model()
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        # values reloaded from the DB don't match the snapshot taken by
+        # KiwiHistoricalRecords anymore, the previous version will be queried
+        self.__dict__.pop('_history_snapshot', None)
+
+
+class QueuedEmail(models.Model):
+    """
+        Outgoing email notification waiting to be delivered by
+        :func:`tcms.core.utils.mailto.send_queued_mail`.
+    """
+    subject = models.TextField()
+    body = models.TextField()
+    sender = models.TextField()
+    # comma separated, sorted list of addresses
+    recipients = models.TextField()
+    created_on = models.DateTimeField(auto_now_add=True, db_index=True)
+    # set while delivery is in progress or after a failed attempt;
+    # the email is retried after some time
+    claimed_on = models.DateTimeField(null=True, blank=True, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.subject
+
+
+class ArchivedHistory(models.Model):
+    """
+        Historical record moved out of its history table by
+        ``./manage.py prune_history --archive``.
+    """
+    # DB schema of the tenant the record belongs to when kiwitcms-tenants
+    # is installed, because this table is shared by all tenants
+    schema_name = models.CharField(max_length=63, null=True, blank=True)
+    # label of the historical model, e.g. testcases.historicaltestcase
+    model = models.CharField(max_length=100)
+    object_id = models.PositiveIntegerField()
+    history_id = models.PositiveIntegerField()
+    history_date = models.DateTimeField()
+    # JSON with the values of all fields
+    data = models.TextField()
+
+    class Meta:
+        index_together = ('schema_name', 'model', 'object_id')
+
+    def __str__(self):
+        return '%s #%d' % (self.model, self.history_id)
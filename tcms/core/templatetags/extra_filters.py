@@ -2,13 +2,12 @@
     Custom template tag filters.
 """
 
-import bleach
-import markdown
-from bleach_allowlist import markdown_attrs, markdown_tags, print_tags
 from django import template
 from django.contrib.messages import constants as messages
 from django.utils.safestring import mark_safe
 
+from tcms.core.utils.markup import markdown_to_html
+
 register = template.Library()
 
 
@@ -25,16 +24,7 @@ def markdown2html(md_str):
     if md_str is None:
         md_str = ''
 
-    rendered_md = markdown.markdown(md_str,
-                                    extensions=[
-                                        'markdown.extensions.fenced_code',
-                                        'markdown.extensions.nl2br',
-                                        'markdown.extensions.tables',
-                                    ])
-    html = bleach.clean(rendered_md,
-                        markdown_tags + print_tags,
-                        markdown_attrs)
-    return mark_safe(html)  # nosec:B308:blacklist
+    return mark_safe(markdown_to_html(str(md_str)))  # nosec:B308:blacklist
 
 
 @register.filter(name='message_icon')
@@ -2,18 +2,22 @@
 from http import HTTPStatus
 
 from django import test
+from django.core import mail
+from django.db import connection
 from django.db.models import Count
 from django.http.request import HttpRequest
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from tcms.core.ajax import _TagCounter, _TagObjects
+from tcms.core.utils import current_site
 from tcms.testcases.models import TestCase, TestCaseTag
 from tcms.testplans.models import TestPlanTag
 from tcms.testruns.models import TestRunTag
 from tcms.tests import BasePlanCase
 from tcms.tests.factories import (TagFactory, TestCaseFactory, TestPlanFactory,
-                                  TestRunFactory)
+                                  TestRunFactory, UserFactory)
 from tcms.utils.permissions import initiate_user_with_default_setups
 
 
@@ -74,6 +78,59 @@ class TestTestCaseUpdates(BasePlanCase):
             HTTPStatus.NOT_FOUND)
         self._assert_default_tester_is(None)
 
+    def test_update_reviewer(self):
+        reviewer = UserFactory()
+        response = self.client.post(self.url, {
+            'case[]': self.case_pks,
+            'what_to_update': 'reviewer',
+            'username': reviewer.username
+        })
+
+        self.assertJsonResponse(response, {'rc': 0, 'response': 'ok'})
+        for test_case in TestCase.objects.filter(plan=self.plan):
+            self.assertEqual(reviewer, test_case.reviewer)
+            history = test_case.history.latest()
+            self.assertEqual(self.tester, history.history_user)
+            self.assertIn('+++ reviewer_id', history.history_change_reason)
+            self.assertIn('+%d' % reviewer.pk, history.history_change_reason)
+
+    def test_update_sends_one_email_per_recipient(self):
+        new_tester = UserFactory()
+        self.client.post(self.url, {
+            'case[]': self.case_pks,
+            'what_to_update': 'default_tester',
+            'username': new_tester.username
+        })
+
+        self._assert_default_tester_is(new_tester)
+        # authors of the last change are not notified
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual([new_tester.email], mail.outbox[0].to)
+        self.assertIn(_('UPDATE: %(count)d TestCases') % {'count': len(self.case_pks)},
+                      mail.outbox[0].subject)
+        for case in TestCase.objects.filter(plan=self.plan):
+            self.assertIn(case.get_full_url(), mail.outbox[0].body)
+
+    def test_query_count_does_not_depend_on_number_of_cases(self):
+        new_tester = UserFactory()
+        current_site()
+
+        with CaptureQueriesContext(connection) as single:
+            self.client.post(self.url, {
+                'case[]': self.case_pks[:1],
+                'what_to_update': 'default_tester',
+                'username': new_tester.username
+            })
+
+        with CaptureQueriesContext(connection) as multiple:
+            self.client.post(self.url, {
+                'case[]': self.case_pks[1:],
+                'what_to_update': 'default_tester',
+                'username': new_tester.username
+            })
+
+        self.assertEqual(len(single.captured_queries), len(multiple.captured_queries))
+
 
 class TestTagRender(BasePlanCase):
 
@@ -2,7 +2,12 @@
 
 import unittest
 
-from tcms.core.utils import string_to_list
+from django import test
+from django.conf import settings
+from django.contrib.sites.models import Site
+
+from tcms.core.utils import current_site, reset_current_site, string_to_list
+from tcms.tests.factories import TestCaseFactory
 
 
 class TestUtilsFunctions(unittest.TestCase):
@@ -42,3 +47,36 @@ class TestUtilsFunctions(unittest.TestCase):
         strings = 'abcdefg'
         result = string_to_list(strings, ':')
         self.assertEqual([strings], result)
+
+
+class TestCurrentSite(test.TestCase):
+    def setUp(self):
+        reset_current_site()
+        # changes to Site are rolled back after each test
+        self.addCleanup(reset_current_site)
+
+    def test_site_is_queried_only_once(self):
+        with self.assertNumQueries(1):
+            site = current_site()
+            self.assertIs(site, current_site())
+
+        self.assertEqual(settings.SITE_ID, site.pk)
+
+    def test_get_full_url_does_not_query_site(self):
+        cases = [TestCaseFactory(), TestCaseFactory()]
+        current_site()
+
+        with self.assertNumQueries(0):
+            for case in cases:
+                self.assertTrue(case.get_full_url().endswith('/%d/' % case.pk))
+
+    def test_cache_is_reset_when_site_is_saved(self):
+        self.assertEqual('127.0.0.1:8000', current_site().domain)
+
+        site = Site.objects.get(pk=settings.SITE_ID)
+        site.domain = 'kiwi.example.com'
+        site.save()
+
+        self.assertEqual('kiwi.example.com', current_site().domain)
+        case = TestCaseFactory()
+        self.assertEqual('https://kiwi.example.com/case/%d/' % case.pk, case.get_full_url())
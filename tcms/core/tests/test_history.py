@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=invalid-name, no-member
 
-from tcms.tests import BasePlanCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tcms.testruns.models import TestExecution, TestExecutionStatus
+from tcms.tests import BaseCaseRun, BasePlanCase
 
 
 class RemoveUserWhenThereIsHistory(BasePlanCase):
@@ -21,3 +25,62 @@ class RemoveUserWhenThereIsHistory(BasePlanCase):
         # when users are removed this is supposed to be set to None
         for history_record in self.case.history.all():
             self.assertIsNone(history_record.history_user)
+
+
+class HistorySnapshot(BaseCaseRun):  # pylint: disable=too-many-ancestors
+    """TestExecution.history uses snapshots of the previous version"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.status_passed = TestExecutionStatus.objects.get(name='PASSED')
+
+    def assert_changed_status(self, execution, old_status, new_status):
+        expected = "--- status_id\n+++ status_id\n@@ -1 +1 @@\n-%d\n+%d" % (
+            old_status.pk, new_status.pk)
+        self.assertEqual(expected, execution.history.latest().history_change_reason)
+
+    def test_save_does_not_query_previous_version(self):
+        execution = TestExecution.objects.get(pk=self.execution_1.pk)
+        execution.status = self.status_passed
+
+        with CaptureQueriesContext(connection) as context:
+            execution.save()
+
+        for query in context.captured_queries:
+            self.assertFalse(query['sql'].startswith('SELECT "testruns_testexecution"'))
+
+        self.assert_changed_status(execution, self.status_idle, self.status_passed)
+        self.assertEqual(self.status_idle.pk, execution.previous.status_id)
+
+    def test_consecutive_saves_diff_against_last_save(self):
+        execution = TestExecution.objects.get(pk=self.execution_1.pk)
+        execution.status = self.status_passed
+        execution.save()
+
+        execution.sortkey = 99
+        execution.save()
+
+        self.assertEqual(
+            "--- sortkey\n+++ sortkey\n@@ -1 +1 @@\n-%s\n+99" % self.execution_1.sortkey,
+            execution.history.latest().history_change_reason)
+
+    def test_refreshed_object_queries_previous_version(self):
+        execution = TestExecution.objects.get(pk=self.execution_1.pk)
+        TestExecution.objects.filter(pk=execution.pk).update(  # pylint: disable=objects-update-used
+            status=self.status_passed
+        )
+        execution.refresh_from_db()
+
+        execution.status = self.status_idle
+        execution.save()
+
+        self.assert_changed_status(execution, self.status_passed, self.status_idle)
+
+    def test_deferred_fields_query_previous_version(self):
+        execution = TestExecution.objects.only('pk', 'status').get(pk=self.execution_1.pk)
+        execution.status = self.status_passed
+        execution.save()
+
+        self.assert_changed_status(execution, self.status_idle, self.status_passed)
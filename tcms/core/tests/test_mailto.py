@@ -0,0 +1,135 @@
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from mock import patch
+
+from tcms.core.models import QueuedEmail
+from tcms.core.utils.mailto import queue_email, queue_stats, send_queued_mail
+
+
+@override_settings(EMAIL_QUEUE_WORKER=None)
+class TestQueueEmail(TestCase):
+    def test_merges_emails_with_same_subject_and_recipients(self):
+        queue_email('Subject', 'First change', 'kiwi@example.com',
+                    ['b@example.com', 'a@example.com'])
+        queue_email('Subject', 'Second change', 'kiwi@example.com',
+                    ['a@example.com', 'b@example.com', 'a@example.com'])
+        # exact duplicates are sent only once
+        queue_email('Subject', 'Second change', 'kiwi@example.com',
+                    ['a@example.com', 'b@example.com'])
+        queue_email('Other subject', 'Third change', 'kiwi@example.com',
+                    ['a@example.com'])
+
+        self.assertEqual(2, QueuedEmail.objects.count())
+        self.assertEqual(2, send_queued_mail())
+
+        self.assertEqual(2, len(mail.outbox))
+        self.assertEqual('Subject', mail.outbox[0].subject)
+        self.assertEqual('First change\n\nSecond change', mail.outbox[0].body)
+        self.assertEqual(['a@example.com', 'b@example.com'], mail.outbox[0].to)
+        self.assertEqual('Other subject', mail.outbox[1].subject)
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_does_not_merge_with_claimed_emails(self):
+        queue_email('Subject', 'First change', 'kiwi@example.com', ['a@example.com'])
+        QueuedEmail.objects.update(  # pylint: disable=objects-update-used
+            claimed_on=timezone.now()
+        )
+        queue_email('Subject', 'Second change', 'kiwi@example.com', ['a@example.com'])
+
+        self.assertEqual(2, QueuedEmail.objects.count())
+
+    def test_without_recipients_does_nothing(self):
+        queue_email('Subject', 'Body', 'kiwi@example.com', [None, ''])
+
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_delivers_batch_over_single_connection(self):
+        for number in range(3):
+            queue_email('Subject %d' % number, 'Body', 'kiwi@example.com', ['a@example.com'])
+
+        with patch('tcms.core.utils.mailto.get_connection',
+                   wraps=mail.get_connection) as get_connection:
+            with self.settings(EMAIL_QUEUE_BATCH_SIZE=2):
+                self.assertEqual(2, send_queued_mail())
+                self.assertEqual(1, send_queued_mail())
+                self.assertEqual(0, send_queued_mail())
+
+        self.assertEqual(2, get_connection.call_count)
+        self.assertEqual(3, len(mail.outbox))
+
+    @patch('django.core.mail.backends.locmem.EmailBackend.send_messages')
+    def test_failed_delivery_is_retried_later(self, send_messages):
+        send_messages.side_effect = ConnectionRefusedError('Connection refused')
+        queue_email('Subject', 'Body', 'kiwi@example.com', ['a@example.com'])
+
+        self.assertEqual(1, send_queued_mail())
+        # still claimed, will be retried after a while
+        self.assertEqual(0, send_queued_mail())
+
+        email = QueuedEmail.objects.get()
+        self.assertEqual(1, email.attempts)
+        self.assertEqual('Connection refused', email.last_error)
+        self.assertEqual(1, queue_stats()['pending'])
+
+        with self.settings(EMAIL_QUEUE_MAX_ATTEMPTS=1):
+            stats = queue_stats()
+        self.assertEqual(0, stats['pending'])
+        self.assertEqual(1, stats['failed'])
+        self.assertIsNone(stats['oldest'])
+
+    @patch('django.core.mail.backends.locmem.EmailBackend.send_messages')
+    def test_delivered_emails_are_not_sent_again(self, send_messages):
+        send_messages.side_effect = [1, SMTPRecipientsRefused({}), 1]
+        for number in range(3):
+            queue_email('Subject %d' % number, 'Body', 'kiwi@example.com', ['a@example.com'])
+        first, failed, last = QueuedEmail.objects.order_by('pk')
+
+        self.assertEqual(3, send_queued_mail())
+
+        self.assertEqual([failed], list(QueuedEmail.objects.all()))
+        self.assertFalse(QueuedEmail.objects.filter(pk__in=[first.pk, last.pk]).exists())
+        failed.refresh_from_db()
+        self.assertEqual(1, failed.attempts)
+
+    @patch('django.core.mail.backends.locmem.EmailBackend.open')
+    def test_connection_failure_fails_all_emails(self, open_connection):
+        open_connection.side_effect = ConnectionRefusedError('Connection refused')
+        for number in range(2):
+            queue_email('Subject %d' % number, 'Body', 'kiwi@example.com', ['a@example.com'])
+
+        self.assertEqual(2, send_queued_mail())
+
+        self.assertEqual([1, 1], list(QueuedEmail.objects.values_list('attempts', flat=True)))
+        self.assertEqual(0, len(mail.outbox))
+
+
+@override_settings(EMAIL_QUEUE_WORKER=None)
+class TestSendQueuedMailCommand(TestCase):
+    """Test manage.py send_queued_mail command"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(3):
+            queue_email('Subject %d' % number, 'Body', 'kiwi@example.com', ['a@example.com'])
+
+    def test_delivers_all_queued_emails(self):
+        out = StringIO()
+        with self.settings(EMAIL_QUEUE_BATCH_SIZE=2):
+            call_command('send_queued_mail', stdout=out)
+
+        self.assertEqual('3 emails processed.\n', out.getvalue())
+        self.assertEqual(3, len(mail.outbox))
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_stats(self):
+        out = StringIO()
+        call_command('send_queued_mail', '--stats', stdout=out)
+
+        self.assertIn('Pending: 3\n', out.getvalue())
+        self.assertIn('Failed: 0\n', out.getvalue())
+        self.assertEqual(0, len(mail.outbox))
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import unittest
+
+from django import test
+from django.core.cache import cache
+from mock import patch
+
 from tcms.core.templatetags.extra_filters import markdown2html
+from tcms.core.utils.markup import markdown_to_html, render_markdown
 
 
 class TestMarkdownExtraFilters(unittest.TestCase):
@@ -62,3 +68,38 @@ Line 2</p>""")
         self.assertEqual(markdown2html("""*hello* <object><link><iframe>
 <frame><frameset><embed>"""), """<p><em>hello</em> &lt;object&gt;&lt;link&gt;&lt;iframe&gt;<br>
 &lt;frame&gt;&lt;frameset&gt;&lt;embed&gt;</p>""")
+
+
+@test.override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-markdown',
+    }
+})
+class TestMarkdownCache(test.SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        markdown_to_html.cache_clear()
+        cache.clear()
+
+    def test_same_text_is_rendered_once(self):
+        with patch('tcms.core.utils.markup.render_markdown',
+                   wraps=render_markdown) as render:
+            first = markdown2html('*cached*')
+            # the in-process tier is empty, e.g. in a different process
+            markdown_to_html.cache_clear()
+            second = markdown2html('*cached*')
+            markdown2html('*cached*')
+
+        self.assertEqual('<p><em>cached</em></p>', first)
+        self.assertEqual(first, second)
+        self.assertEqual(1, render.call_count)
+
+    def test_cache_is_keyed_by_allowlist_version(self):
+        self.assertEqual('<p><em>versioned</em></p>', markdown_to_html('*versioned*'))
+
+        markdown_to_html.cache_clear()
+        with patch('tcms.core.utils.markup.MARKDOWN_VERSION', 'newer-allowlist'), \
+                patch('tcms.core.utils.markup.render_markdown',
+                      return_value='<p>rendered again</p>'):
+            self.assertEqual('<p>rendered again</p>', markdown_to_html('*versioned*'))
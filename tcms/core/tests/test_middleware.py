@@ -1,7 +1,14 @@
 import os
 import unittest
+from unittest.mock import patch
+
 from django import test
 from django.core.management import call_command
+from django.db import connection
+from django.core.management.sql import emit_post_migrate_signal
+from django.http import HttpRequest
+
+from tcms.core import middleware
 
 
 @unittest.skipUnless(
@@ -16,3 +23,52 @@ class TestCheckUnappliedMigrationsMiddleware(test.TransactionTestCase):
             'container">documentation</a>'
         response = self.client.get('/', follow=True)
         self.assertContains(response, unapplied_migration_message)
+
+
+class TestCountUnappliedMigrations(test.TestCase):
+    def setUp(self):
+        super().setUp()
+        middleware.reset_unapplied_migrations()
+        self.addCleanup(middleware.reset_unapplied_migrations)
+
+    def test_migration_plan_is_built_only_once(self):
+        request = HttpRequest()
+
+        with patch('tcms.core.middleware.MigrationExecutor',
+                   wraps=middleware.MigrationExecutor) as executor:
+            for _ in range(10):
+                middleware.CheckUnappliedMigrationsMiddleware().process_request(request)
+
+        self.assertEqual(1, executor.call_count)
+
+    def test_subsequent_requests_dont_query_the_database(self):
+        self.assertEqual(0, middleware.count_unapplied_migrations())
+
+        with self.assertNumQueries(0):
+            middleware.count_unapplied_migrations()
+
+    def test_post_migrate_resets_the_result(self):
+        self.assertEqual(0, middleware.count_unapplied_migrations())
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+
+        with patch('tcms.core.middleware.MigrationExecutor',
+                   wraps=middleware.MigrationExecutor) as executor:
+            self.assertEqual(0, middleware.count_unapplied_migrations())
+
+        self.assertEqual(1, executor.call_count)
+
+    def test_result_is_kept_per_schema(self):
+        self.assertEqual(0, middleware.count_unapplied_migrations())
+
+        # e.g. a tenant which hasn't been migrated yet
+        with patch.object(connection, 'schema_name', 'tenant', create=True), \
+                patch('tcms.core.middleware.MigrationExecutor') as executor:
+            executor.return_value.migration_plan.return_value = ['0001', '0002']
+
+            self.assertEqual(2, middleware.count_unapplied_migrations())
+
+        self.assertEqual(1, executor.call_count)
+        # the result for the default schema is still remembered
+        with self.assertNumQueries(0):
+            self.assertEqual(0, middleware.count_unapplied_migrations())
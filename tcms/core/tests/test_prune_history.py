@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import json
+from contextlib import nullcontext
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from mock import patch
+
+from tcms.core.history import prune_history
+from tcms.core.models import ArchivedHistory
+from tcms.testcases.models import TestCase as TestCaseModel
+from tcms.tests.factories import TestCaseFactory, TestExecutionFactory
+
+
+class TestPruneHistory(TestCase):
+    def setUp(self):
+        self.case = TestCaseFactory(summary='Initial summary')
+        # note: TestCaseFactory doesn't send post_save
+        self.case.save()
+
+        self.case.summary = 'Changed summary'
+        self.case.save()
+        # doesn't change anything
+        self.case.save()
+        self.case.save()
+
+        self.case.summary = 'Latest summary'
+        self.case.save()
+
+    def history_ids(self):
+        return list(self.case.history.order_by('history_id').values_list('history_id', flat=True))
+
+    def test_collapses_no_op_records(self):
+        initial, changed, no_op_1, no_op_2, latest = self.history_ids()
+
+        stats = prune_history(TestCaseModel)
+
+        self.assertEqual(2, stats['deleted'])
+        self.assertEqual(2, stats['no_op'])
+        self.assertGreater(stats['size'], 0)
+        self.assertEqual([initial, changed, latest], self.history_ids())
+        self.assertNotIn(no_op_1, self.history_ids())
+        self.assertNotIn(no_op_2, self.history_ids())
+
+    def test_counts_no_op_records_across_batches(self):
+        stats = prune_history(TestCaseModel, batch_size=1)
+
+        self.assertEqual(2, stats['deleted'])
+        self.assertEqual(2, stats['no_op'])
+        self.assertEqual(3, len(self.history_ids()))
+
+    def test_deletes_old_records_but_keeps_latest(self):
+        latest = self.history_ids()[-1]
+        self.case.history.update(  # pylint: disable=objects-update-used
+            history_date=timezone.now() - timedelta(days=10))
+
+        stats = prune_history(TestCaseModel, before=timezone.now() - timedelta(days=5),
+                              batch_size=2)
+
+        self.assertEqual(4, stats['deleted'])
+        self.assertEqual([latest], self.history_ids())
+        self.assertEqual('Latest summary', self.case.history.latest().summary)
+
+    def test_keeps_records_referenced_by_executions(self):
+        initial = self.history_ids()[0]
+        TestExecutionFactory(case=self.case, case_text_version=initial)
+
+        prune_history(TestCaseModel, before=timezone.now() + timedelta(days=1))
+
+        self.assertEqual([initial, self.history_ids()[-1]], self.history_ids())
+
+    def test_archive(self):
+        no_op = self.history_ids()[2]
+
+        prune_history(TestCaseModel, archive=True)
+
+        archived = ArchivedHistory.objects.get(history_id=no_op)
+        self.assertEqual('testcases.historicaltestcase', archived.model)
+        self.assertEqual(self.case.pk, archived.object_id)
+        self.assertEqual('Changed summary', json.loads(archived.data)['summary'])
+        self.assertIsNone(archived.schema_name)
+
+    def test_archive_records_schema_name(self):
+        with patch.object(connection, 'schema_name', 'tenant', create=True):
+            prune_history(TestCaseModel, archive=True)
+
+        self.assertEqual(['tenant', 'tenant'], list(
+            ArchivedHistory.objects.values_list('schema_name', flat=True)))
+
+    def test_dry_run(self):
+        history_ids = self.history_ids()
+
+        stats = prune_history(TestCaseModel, dry_run=True)
+
+        self.assertEqual(2, stats['deleted'])
+        self.assertEqual(history_ids, self.history_ids())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('prune_history', stdout=out)
+
+        self.assertIn('test cases: 2 historical records deleted, 2 of them no-op', out.getvalue())
+        self.assertNotIn('Tenant', out.getvalue())
+        self.assertEqual(3, len(self.history_ids()))
+
+    def test_command_prunes_all_tenants(self):
+        out = StringIO()
+        with patch('tcms.core.management.commands.prune_history.tenant_schema_names',
+                   return_value=['public', 'tenant']), \
+                patch('tcms.core.management.commands.prune_history.schema_context',
+                      return_value=nullcontext()) as schema_context:
+            call_command('prune_history', stdout=out)
+
+        self.assertEqual([(('public',),), (('tenant',),)], schema_context.call_args_list)
+        self.assertIn('Tenant public', out.getvalue())
+        self.assertIn('Tenant tenant', out.getvalue())
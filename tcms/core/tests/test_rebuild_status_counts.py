@@ -0,0 +1,38 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from tcms.testruns.models import TestRunStatusCount
+from tcms.tests.factories import TestExecutionFactory
+
+
+class TestRebuildStatusCountsCommand(TestCase):
+    """Test manage.py rebuild_status_counts command"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.execution_1 = TestExecutionFactory()
+        cls.execution_2 = TestExecutionFactory()
+
+    def test_rebuild_all_test_runs(self):
+        TestRunStatusCount.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_status_counts', stdout=out)
+
+        self.assertEqual('2 counters rebuilt.\n', out.getvalue())
+        for execution in (self.execution_1, self.execution_2):
+            counter = TestRunStatusCount.objects.get(run=execution.run)
+            self.assertEqual(execution.status, counter.status)
+            self.assertEqual(1, counter.count)
+
+    def test_rebuild_selected_test_runs(self):
+        TestRunStatusCount.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_status_counts', self.execution_1.run.pk, stdout=out)
+
+        self.assertEqual('1 counters rebuilt.\n', out.getvalue())
+        self.assertTrue(TestRunStatusCount.objects.filter(run=self.execution_1.run).exists())
+        self.assertFalse(TestRunStatusCount.objects.filter(run=self.execution_2.run).exists())
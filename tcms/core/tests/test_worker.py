@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import threading
+from contextlib import nullcontext
+
+from django import test
+from django.db import connection
+from mock import patch
+
+from tcms.core.utils.worker import BackgroundWorker
+
+
+class TestBackgroundWorker(test.SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.processed = threading.Event()
+        self.schema_names = []
+
+    def process(self):
+        self.processed.set()
+        return 0
+
+    def schema_context(self, schema_name):
+        self.schema_names.append(schema_name)
+        return nullcontext()
+
+    def test_processes_items_inside_the_schema_where_they_were_queued(self):
+        worker = BackgroundWorker('test-worker', self.process, per_schema=True)
+
+        with patch('tcms.core.utils.worker.schema_context', self.schema_context):
+            # e.g. a tenant when kiwitcms-tenants is installed
+            with patch.object(connection, 'schema_name', 'tenant', create=True):
+                worker.wake_up()
+
+            self.assertTrue(self.processed.wait(5))
+
+        self.assertEqual(['tenant'], self.schema_names)
+
+    def test_shared_items_are_processed_without_schema(self):
+        worker = BackgroundWorker('test-worker', self.process)
+
+        with patch('tcms.core.utils.worker.schema_context', self.schema_context):
+            with patch.object(connection, 'schema_name', 'tenant', create=True):
+                worker.wake_up()
+
+            self.assertTrue(self.processed.wait(5))
+
+        self.assertEqual([None], self.schema_names)
@@ -3,6 +3,10 @@
 
 import sys
 
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.db import connection
+
 
 def string_to_list(strs, spliter=','):
     """Convert the string to list"""
@@ -47,6 +51,45 @@ def request_host_link(request, domain_name=None):
     return protocol + domain_name
 
 
+# schema name -> Site
+_CURRENT_SITE = {}
+
+
+def current_site():
+    """
+        Return the Site object for ``settings.SITE_ID``.
+
+        It is cached for the lifetime of the process b/c it is needed for
+        every full URL, e.g. in notification emails and issue tracker
+        comments, but changes only when the admin updates the base URL!
+
+        Unlike ``Site.objects.get_current()`` the cache is aware of the
+        current DB schema so it returns the correct result when
+        kiwitcms-tenants is installed.
+
+        .. warning::
+
+            Don't modify the returned object, fetch it from the DB instead!
+    """
+    schema_name = getattr(connection, 'schema_name', None)
+
+    site = _CURRENT_SITE.get(schema_name)
+    if site is None:
+        site = Site.objects.get(pk=settings.SITE_ID)
+        _CURRENT_SITE[schema_name] = site
+
+    return site
+
+
+def reset_current_site(**kwargs):  # pylint: disable=unused-argument
+    """
+        Connected to the ``post_save`` and ``post_delete`` signals
+        for Site so that the next call to ``current_site()`` will
+        query the database again!
+    """
+    _CURRENT_SITE.clear()
+
+
 # todo: remove this
 def clean_request(request, keys=None):
     """
@@ -1,9 +1,20 @@
 # -*- coding: utf-8 -*-
-import threading
+from datetime import timedelta
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Min, Q, Value
+from django.db.models.functions import Concat
 from django.template.loader import render_to_string
+from django.utils import timezone
+
+from tcms.core.models import QueuedEmail
+from tcms.core.utils.worker import BackgroundWorker
+
+# emails which are being delivered, or failed to be delivered,
+# are claimed for this long before anyone tries again
+RETRY_AFTER = timedelta(minutes=10)
 
 
 def mailto(template_name, subject, recipients=None,  # pylint: disable=invalid-name
@@ -30,12 +41,136 @@ def mailto(template_name, subject, recipients=None,  # pylint: disable=invalid-n
     else:
         body = context
 
-    sender = settings.DEFAULT_FROM_EMAIL
-    email_thread = threading.Thread(
-        target=send_mail,
-        args=(settings.EMAIL_SUBJECT_PREFIX + subject, body, sender, recipients),
-        kwargs={'fail_silently': False}
+    queue_email(settings.EMAIL_SUBJECT_PREFIX + subject, body,
+                settings.DEFAULT_FROM_EMAIL, recipients)
+
+
+def queue_email(subject, body, sender, recipients):
+    """
+        Store an email into the outbox and schedule its delivery.
+
+        Notifications with the same subject and recipients, which haven't
+        been picked up for delivery yet, are merged into a single email!
+    """
+    recipients = ','.join(sorted(set(filter(None, recipients))))
+    if not recipients:
+        return
+
+    subject = str(subject)
+    body = str(body)
+
+    pending = QueuedEmail.objects.filter(subject=subject,
+                                         sender=sender,
+                                         recipients=recipients,
+                                         claimed_on__isnull=True)
+
+    # skip notifications repeating the last one which was merged
+    if not pending.filter(Q(body=body) | Q(body__endswith='\n\n' + body)).exists():
+        # the filter on claimed_on makes sure the worker hasn't picked up
+        # this email in the meantime, otherwise create a new one
+        merged = pending.update(  # pylint: disable=objects-update-used
+            body=Concat(F('body'), Value('\n\n' + body))
+        )
+        if not merged:
+            QueuedEmail.objects.create(subject=subject,
+                                       body=body,
+                                       sender=sender,
+                                       recipients=recipients)
+
+    if settings.EMAIL_QUEUE_WORKER == 'sync':
+        send_queued_mail()
+    elif settings.EMAIL_QUEUE_WORKER == 'thread':
+        transaction.on_commit(WORKER.wake_up)
+
+
+def _deliverable():
+    return QueuedEmail.objects.filter(
+        Q(claimed_on__isnull=True) | Q(claimed_on__lt=timezone.now() - RETRY_AFTER),
+        attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
     )
-    # This is to tell Python not to wait for the thread to return
-    email_thread.setDaemon(True)
-    email_thread.start()
+
+
+def send_queued_mail():
+    """
+        Deliver the next batch of queued emails over a single
+        connection to the email backend.
+
+        :return: Number of emails which were processed, both
+                 delivered and failed
+        :rtype: int
+    """
+    email_ids = list(_deliverable().order_by('pk').values_list(
+        'pk', flat=True
+    )[:settings.EMAIL_QUEUE_BATCH_SIZE])
+    if not email_ids:
+        return 0
+
+    # claim emails so that other workers will not deliver them again
+    claimed_on = timezone.now()
+    _deliverable().filter(pk__in=email_ids).update(  # pylint: disable=objects-update-used
+        claimed_on=claimed_on
+    )
+    emails = QueuedEmail.objects.filter(pk__in=email_ids, claimed_on=claimed_on)
+
+    delivered, failed = _deliver(emails)
+    QueuedEmail.objects.filter(pk__in=delivered).delete()
+    # retry after RETRY_AFTER b/c emails remain claimed
+    for error, pks in failed.items():
+        QueuedEmail.objects.filter(pk__in=pks).update(  # pylint: disable=objects-update-used
+            attempts=F('attempts') + 1,
+            last_error=error,
+        )
+
+    return len(delivered) + sum(len(pks) for pks in failed.values())
+
+
+def _deliver(emails):
+    """
+        Send emails one by one over a shared connection so that
+        a failure doesn't cause already delivered emails to be sent again.
+
+        :return: PKs of delivered emails and a mapping between
+                 error messages and PKs of emails which failed
+        :rtype: tuple
+    """
+    delivered = []
+    failed = {}
+    pending = list(emails)
+    try:
+        with get_connection(fail_silently=False) as email_connection:
+            while pending:
+                email = pending.pop(0)
+                try:
+                    email_connection.send_messages([
+                        EmailMessage(email.subject, email.body,
+                                     email.sender, email.recipients.split(','))
+                    ])
+                    delivered.append(email.pk)
+                except Exception as err:  # pylint: disable=broad-except
+                    failed.setdefault(str(err), []).append(email.pk)
+    except Exception as err:  # pylint: disable=broad-except
+        # connecting to the email backend failed
+        failed.setdefault(str(err), []).extend(email.pk for email in pending)
+
+    return delivered, failed
+
+
+def queue_stats():
+    """
+        Return metrics about the email queue: the number of emails
+        waiting to be delivered, the number of emails which
+        failed permanently and when the oldest waiting email was queued.
+    """
+    max_attempts = settings.EMAIL_QUEUE_MAX_ATTEMPTS
+    pending = QueuedEmail.objects.filter(attempts__lt=max_attempts)
+
+    return {
+        'pending': pending.count(),
+        'failed': QueuedEmail.objects.filter(attempts__gte=max_attempts).count(),
+        'oldest': pending.aggregate(oldest=Min('created_on'))['oldest'],
+    }
+
+
+# a single background thread delivers emails, which limits
+# the number of concurrent connections to the email backend
+WORKER = BackgroundWorker('kiwitcms-mailto', send_queued_mail)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import hashlib
+from functools import lru_cache
+
+import bleach
+import bleach_allowlist
+import markdown
+from django.core.cache import cache
+
+MARKDOWN_EXTENSIONS = [
+    'markdown.extensions.fenced_code',
+    'markdown.extensions.nl2br',
+    'markdown.extensions.tables',
+]
+ALLOWED_TAGS = bleach_allowlist.markdown_tags + bleach_allowlist.print_tags
+ALLOWED_ATTRIBUTES = bleach_allowlist.markdown_attrs
+
+# changes whenever the output of markdown_to_html() may change, e.g. the
+# allowlist is updated, so that previously rendered HTML is not used anymore
+MARKDOWN_VERSION = hashlib.sha256(repr((
+    markdown.__version__,
+    bleach.__version__,
+    MARKDOWN_EXTENSIONS,
+    ALLOWED_TAGS,
+    sorted(ALLOWED_ATTRIBUTES.items()),
+)).encode()).hexdigest()[:32]
+
+# number of rendered texts kept in memory by every process
+MARKDOWN_CACHE_SIZE = 1024
+
+
+def render_markdown(md_str):
+    """
+        Convert a markdown string into sanitized HTML, without caching!
+    """
+    rendered_md = markdown.markdown(md_str, extensions=MARKDOWN_EXTENSIONS)
+    return bleach.clean(rendered_md, ALLOWED_TAGS, ALLOWED_ATTRIBUTES)
+
+
+@lru_cache(maxsize=MARKDOWN_CACHE_SIZE)
+def markdown_to_html(md_str):
+    """
+        Same as :func:`render_markdown` but the result is cached in memory
+        and in the Django cache, shared between processes. Cache keys are
+        based on the content so there's nothing to invalidate when texts
+        are edited!
+    """
+    if not md_str:
+        return ''
+
+    key = 'markdown2html:%s:%s' % (
+        MARKDOWN_VERSION, hashlib.sha256(md_str.encode()).hexdigest())
+    html = cache.get(key)
+    if html is None:
+        html = render_markdown(md_str)
+        cache.set(key, html)
+
+    return html
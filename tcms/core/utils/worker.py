@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+from contextlib import nullcontext
+
+from django.apps import apps
+from django.db import connection
+
+
+def schema_context(schema_name):
+    """
+        Activate the DB schema *schema_name* when kiwitcms-tenants
+        is installed. ``None`` means that there are no DB schemas!
+    """
+    if schema_name is None:
+        return nullcontext()
+
+    from django_tenants import utils  # pylint: disable=E0401, C0415
+    return utils.schema_context(schema_name)
+
+
+def tenant_schema_names():
+    """
+        Return the names of all DB schemas when kiwitcms-tenants
+        is installed, ``[None]`` otherwise.
+    """
+    if not apps.is_installed('django_tenants'):
+        return [None]
+
+    from django_tenants.utils import get_tenant_model  # pylint: disable=E0401, C0415
+    return list(get_tenant_model().objects.values_list('schema_name', flat=True))
+
+
+class BackgroundWorker:  # pylint: disable=too-few-public-methods, too-many-instance-attributes
+    """
+        A single daemon thread which calls ``process()`` every time it is
+        woken up, until there's nothing left to process. A single thread
+        limits the number of concurrent connections to remote systems!
+
+        The thread has its own DB connection, without a DB schema being
+        active, so workers for items stored in tenant tables, when
+        kiwitcms-tenants is installed, must be created with ``per_schema``!
+
+        :param name: Name of the thread
+        :type name: str
+        :param process: Called without arguments, returns the number of
+                        items which were processed
+        :type process: callable
+        :param poll_interval: If set, also wake up after this many seconds
+                              to process items which were postponed
+        :type poll_interval: int
+        :param per_schema: Call ``process()`` inside every DB schema from which
+                           the worker has been woken up, and inside all tenant
+                           schemas when polling
+        :type per_schema: bool
+    """
+    def __init__(self, name, process, poll_interval=None, per_schema=False):
+        self.name = name
+        self.process = process
+        self.poll_interval = poll_interval
+        self.per_schema = per_schema
+
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake_up = threading.Event()
+        # where items have been queued, see per_schema
+        self._schema_names = set()
+
+    def wake_up(self):
+        with self._lock:
+            if self.per_schema:
+                self._schema_names.add(getattr(connection, 'schema_name', None))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+
+        self._wake_up.set()
+
+    def _loop(self):
+        if self.per_schema and self.poll_interval:
+            # retry items postponed before the process was restarted
+            try:
+                schema_names = set(tenant_schema_names())
+            except Exception:  # pylint: disable=broad-except
+                logging.getLogger(__name__).exception('%s failed', self.name)
+                schema_names = set()
+            finally:
+                connection.close()
+
+            with self._lock:
+                self._schema_names |= schema_names
+
+        while True:
+            self._wake_up.wait(self.poll_interval)
+            # clear before processing so that items queued
+            # in the meantime are picked up on the next iteration
+            self._wake_up.clear()
+
+            with self._lock:
+                schema_names = list(self._schema_names) or [None]
+
+            for schema_name in schema_names:
+                try:
+                    with schema_context(schema_name):
+                        while self.process():
+                            pass
+                except Exception:  # pylint: disable=broad-except
+                    logging.getLogger(__name__).exception('%s failed', self.name)
+                finally:
+                    connection.close()
@@ -1,37 +1,144 @@
 # coding: utf-8
 import html
+from functools import lru_cache
+from itertools import chain, islice
+from json import encoder as json_encoder
+from types import GeneratorType
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from modernrpc.exceptions import RPCInternalError
 from modernrpc.handlers import JSONRPCHandler
+from modernrpc.handlers import XMLRPCHandler as ModernXMLRPCHandler
 
+from tcms.rpc.serializer import CHUNK_SIZE
 
-class SafeJSONRPCHandler(JSONRPCHandler):
-    @staticmethod
-    def escape_dict(result_dict):
-        for (key, value) in result_dict.items():
-            if isinstance(value, str):
-                result_dict[key] = html.escape(value)
-
-    @staticmethod
-    def escape_list(result_list):
-        for (index, item) in enumerate(result_list):
-            if isinstance(item, str):
-                result_list[index] = html.escape(item)
-            elif isinstance(item, dict):
-                SafeJSONRPCHandler.escape_dict(item)
+# dictionary keys and values like usernames, statuses, etc. repeat
+# for every row so they are escaped only once per response
+ESCAPE_CACHE_SIZE = 4096
+
+
+def escape_json_string(value):
+    return json_encoder.encode_basestring_ascii(html.escape(value))
+
+
+def _floatstr(value):
+    """
+        Same as the default float formatting of the pure Python
+        JSON encoder, used only when the C encoder isn't available.
+    """
+    if value != value:  # pylint: disable=comparison-with-itself
+        return 'NaN'
+    if value == json_encoder.INFINITY:
+        return 'Infinity'
+    if value == -json_encoder.INFINITY:
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+class SafeJSONEncoder(DjangoJSONEncoder):
+    """
+        HTML escape every string, including dictionary keys, at any nesting
+        level while encoding it. This will prevent XSS attacks for pages
+        which display whatever is in the DB (e.g. tags, components).
+
+        Escaping is part of the encoding process so there's no need to
+        walk the result before it is serialized!
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.escape = lru_cache(maxsize=ESCAPE_CACHE_SIZE)(escape_json_string)
 
+    def encode(self, o):
+        if isinstance(o, str):
+            return self.escape(o)
+        return ''.join(self.iterencode(o, _one_shot=True))
+
+    def iterencode(self, o, _one_shot=False):
+        markers = {} if self.check_circular else None
+
+        if json_encoder.c_make_encoder is not None and self.indent is None:
+            _iterencode = json_encoder.c_make_encoder(
+                markers, self.default, self.escape, self.indent,
+                self.key_separator, self.item_separator, self.sort_keys,
+                self.skipkeys, self.allow_nan)
+        else:
+            _iterencode = json_encoder._make_iterencode(  # pylint: disable=protected-access
+                markers, self.default, self.escape, self.indent, _floatstr,
+                self.key_separator, self.item_separator, self.sort_keys,
+                self.skipkeys, _one_shot)
+        return _iterencode(o, 0)
+
+
+class XMLRPCHandler(ModernXMLRPCHandler):
     def execute_procedure(self, name, args=None, kwargs=None):
         """
-            HTML escape every string before returning it to
-            the client, which may as well be the webUI. This will
-            prevent XSS attacks for pages which display whatever
-            is in the DB (e.g. tags, components)
+            XML-RPC responses can't be streamed, convert results
+            returned by generators into lists!
         """
         result = super().execute_procedure(name, args, kwargs)
 
-        if isinstance(result, str):
-            result = html.escape(result)
-        elif isinstance(result, dict):
-            self.escape_dict(result)
-        elif isinstance(result, list):
-            self.escape_list(result)
+        if isinstance(result, GeneratorType):
+            result = list(result)
 
         return result
+
+
+class SafeJSONRPCHandler(JSONRPCHandler):
+    def dumps(self, obj):
+        """
+            HTML escape every string before returning it to
+            the client, which may as well be the webUI.
+
+            .. warning::
+
+                Uses :class:`SafeJSONEncoder` regardless of the
+                ``MODERNRPC_JSON_ENCODER`` setting!
+        """
+        try:
+            return SafeJSONEncoder().encode(obj)
+        except Exception as err:
+            raise RPCInternalError('Unable to serialize result as valid JSON: ' + str(err))
+
+    def json_success_response(self, data, override_id=None):
+        # results of batch requests are not streamed
+        if isinstance(data, GeneratorType):
+            data = list(data)
+
+        return super().json_success_response(data, override_id)
+
+    def result_success(self, data):
+        """
+            Results returned by generators, e.g. from ``*.filter()`` methods,
+            are streamed to the client in chunks so that memory usage stays
+            constant regardless of how many rows are returned!
+        """
+        if not isinstance(data, GeneratorType) or self.request_id is None:
+            return super().result_success(data)
+
+        # fetch the first item before the response is started so that
+        # DB errors are still reported as a JSON-RPC error
+        try:
+            data = chain([next(data)], data)
+        except StopIteration:
+            data = iter([])
+
+        return self.json_http_response(self.stream_json(data), StreamingHttpResponse)
+
+    def stream_json(self, items):
+        """
+            Generate a JSON-RPC success response for a list of items,
+            one chunk at a time.
+        """
+        encoder = SafeJSONEncoder()
+
+        yield '{"id": %s, "jsonrpc": "2.0", "result": [' % encoder.encode(self.request_id)
+
+        separator = ''
+        chunk = list(islice(items, CHUNK_SIZE))
+        while chunk:
+            yield separator + ', '.join(encoder.encode(item) for item in chunk)
+            separator = ', '
+            chunk = list(islice(items, CHUNK_SIZE))
+
+        yield ']}'
@@ -1,12 +1,96 @@
+import hashlib
 import re
 import threading
 import warnings
 
+from django.db import connection
 from opengraph.opengraph import OpenGraph
 
+from tcms.issuetracker.comments import queue_comment
+
 RE_ENDS_IN_INT = re.compile(r'[\d]+$')
 
 
+class ClientRegistry:
+    """
+        Thread-safe cache for the objects returned by
+        :meth:`IssueTrackerType._rpc_connection`. Connecting to a remote
+        system may be slow and most client libraries keep an HTTP session
+        open so clients are reused for the lifetime of the process.
+
+        Clients are keyed by DB schema, BugSystem PK and a hash of its
+        credentials so that changes made by other processes are picked up
+        as well and PKs of different tenants don't collide.
+    """
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+        # serialize connecting to the same system, not to all of them
+        self._key_locks = {}
+
+    @staticmethod
+    def key(tracker):
+        bug_system = tracker.bug_system
+        credentials = '\0'.join(str(value) for value in (
+            tracker.__class__.__module__ + '.' + tracker.__class__.__name__,
+            bug_system.base_url,
+            bug_system.api_url,
+            bug_system.api_username,
+            bug_system.api_password,
+        ))
+        return (getattr(connection, 'schema_name', None),
+                bug_system.pk,
+                hashlib.sha256(credentials.encode()).hexdigest())
+
+    def get(self, tracker):
+        """
+            Return the client for *tracker*, connecting if necessary!
+        """
+        key = self.key(tracker)
+        try:
+            return self._clients[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # another thread may have connected while we were waiting
+            if key in self._clients:
+                return self._clients[key]
+
+            client = tracker._rpc_connection()  # pylint: disable=protected-access
+            with self._lock:
+                # clients for previous credentials are not needed anymore
+                self._evict(key[0], key[1])
+                self._clients[key] = client
+
+        return client
+
+    def _evict(self, schema_name, bug_system_id):
+        for key in list(self._clients.keys()):
+            if key[:2] == (schema_name, bug_system_id):
+                del self._clients[key]
+                self._key_locks.pop(key, None)
+
+    def evict(self, bug_system_id):
+        """
+            Forget all clients for the BugSystem with *bug_system_id*
+            in the current DB schema.
+        """
+        with self._lock:
+            self._evict(getattr(connection, 'schema_name', None), bug_system_id)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._key_locks.clear()
+
+
+CLIENTS = ClientRegistry()
+
+
 class IntegrationThread(threading.Thread):
     """
         Used as a base class for everything else.
@@ -27,22 +111,35 @@ class IntegrationThread(threading.Thread):
         self.bug_system = bug_system
         self.execution = execution
         self.bug_id = bug_id
+        # text of a queued comment, see :mod:`tcms.issuetracker.comments`
+        self.comment = None
 
         super().__init__()
 
-    def text(self):
+    @staticmethod
+    def text_for(execution):
         """
             Returns the text that will be posted as a comment to
-            the reported bug!
+            the reported bug for *execution*!
         """
         return """---- Confirmed via test execution ----
 TR-%d: %s
 %s
-TE-%d: %s""" % (self.execution.run.pk,
-                self.execution.run.summary,
-                self.execution.run.get_full_url(),
-                self.execution.pk,
-                self.execution.case.summary)
+TE-%d: %s""" % (execution.run.pk,
+                execution.run.summary,
+                execution.run.get_full_url(),
+                execution.pk,
+                execution.case.summary)
+
+    def text(self):
+        """
+            Returns the text that will be posted as a comment to
+            the reported bug!
+        """
+        if self.comment is not None:
+            return self.comment
+
+        return self.text_for(self.execution)
 
     def post_comment(self):
         raise NotImplementedError()
@@ -67,7 +164,6 @@ class IssueTrackerType:
         supports!
     """
     it_class = IntegrationThread
-    rpc_cache = {}
 
     def __init__(self, bug_system, request):
         """
@@ -154,14 +250,15 @@ class IssueTrackerType:
             defect back to the TE/TR which reproduced it.
 
             Usually this is implemented by adding a new comment pointing
-            back to the TR/TE via the internal RPC object.
+            back to the TR/TE via the internal RPC object. Comments are queued
+            and posted in the background by :attr:`it_class`, see
+            :mod:`tcms.issuetracker.comments`.
 
             :executions: - iterable of TestExecution objects
             :issue_url: - the URL of the existing defect
         """
-        bug_id = self.bug_id_from_url(issue_url)
         for execution in executions:
-            self.it_class(self.rpc, self.bug_system, execution, bug_id).start()
+            queue_comment(self.bug_system, issue_url, self.it_class.text_for(execution))
 
     def is_adding_testcase_to_issue_disabled(self):  # pylint: disable=invalid-name
         """
@@ -188,14 +285,11 @@ class IssueTrackerType:
             Returns an object which is used to communicate to the external system.
             This property is meant to be used by the rest of the integration code
             and provides caching b/c connecting to a remote system may be a slow
-            operation.
+            operation, see :class:`ClientRegistry`.
         """
         # b/c jira.JIRA tries to connect when object is created
         # see https://github.com/kiwitcms/Kiwi/issues/100
         if self.is_adding_testcase_to_issue_disabled():
             return None
 
-        if self.bug_system.base_url not in self.rpc_cache:
-            self.rpc_cache[self.bug_system.base_url] = self._rpc_connection()
-
-        return self.rpc_cache[self.bug_system.base_url]
+        return CLIENTS.get(self)
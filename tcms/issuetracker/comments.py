@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+    Comments posted to issue trackers are stored in a queue inside the
+    database and delivered one at a time so that linking a defect to
+    hundreds of test executions doesn't flood the remote system!
+"""
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from itertools import groupby
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from tcms.core.utils.worker import BackgroundWorker
+from tcms.testcases.models import QueuedComment
+
+# comments which are being delivered are claimed for this long
+# before anyone tries again, e.g. if the worker was killed
+RETRY_AFTER = timedelta(minutes=10)
+
+# wait this long after the first failed attempt, doubled after each next one
+RETRY_BACKOFF = timedelta(minutes=1)
+
+# how long to wait when the issue tracker responds with
+# HTTP 429 Too Many Requests without telling us for how long
+RATE_LIMIT_BACKOFF = timedelta(minutes=1)
+
+
+def queue_comment(bug_system, url, text):
+    """
+        Store a comment for the issue at *url* and schedule its delivery.
+
+        Comments for the same issue, which haven't been picked up for
+        delivery yet, are merged into a single comment!
+    """
+    text = str(text)
+    pending = QueuedComment.objects.filter(bug_system=bug_system,
+                                           url=url,
+                                           status=QueuedComment.PENDING,
+                                           claimed_on__isnull=True)
+
+    # skip comments repeating the last one which was merged
+    if not pending.filter(Q(text=text) | Q(text__endswith='\n\n' + text)).exists():
+        # the filter on claimed_on makes sure the worker hasn't picked up
+        # this comment in the meantime, otherwise create a new one
+        merged = pending.update(  # pylint: disable=objects-update-used
+            text=Concat(F('text'), Value('\n\n' + text))
+        )
+        if not merged:
+            QueuedComment.objects.create(bug_system=bug_system, url=url, text=text)
+
+    if settings.ISSUE_TRACKER_QUEUE_WORKER == 'sync':
+        send_queued_comments()
+    elif settings.ISSUE_TRACKER_QUEUE_WORKER == 'thread':
+        transaction.on_commit(WORKER.wake_up)
+
+
+def _deliverable():
+    now = timezone.now()
+    return QueuedComment.objects.filter(
+        Q(claimed_on__isnull=True) | Q(claimed_on__lt=now - RETRY_AFTER),
+        Q(retry_on__isnull=True) | Q(retry_on__lte=now),
+        status=QueuedComment.PENDING,
+    )
+
+
+def _rate_limited(err):
+    """
+        Did the issue tracker respond with HTTP 429 Too Many Requests?
+        Client libraries store the status code under different names.
+    """
+    for source in (err, getattr(err, 'response', None)):
+        for attr in ('status_code', 'status', 'response_code', 'errcode'):
+            if getattr(source, attr, None) == 429:
+                return True
+
+    # e.g. github.RateLimitExceededException which is HTTP 403
+    return 'RateLimit' in err.__class__.__name__
+
+
+def _retry_after(err):
+    """
+        Return how long to wait before the next request as
+        specified by the ``Retry-After`` header, if available.
+    """
+    for source in (err, getattr(err, 'response', None)):
+        headers = getattr(source, 'headers', None)
+        if not hasattr(headers, 'get'):
+            continue
+
+        value = headers.get('Retry-After', headers.get('retry-after'))
+        if value is None:
+            continue
+
+        try:
+            return timedelta(seconds=int(value))
+        except ValueError:
+            pass
+
+        try:
+            return max(parsedate_to_datetime(value) - timezone.now(), timedelta(0))
+        except (TypeError, ValueError):
+            pass
+
+    return RATE_LIMIT_BACKOFF
+
+
+def _post_comment(tracker, comment):
+    thread = tracker.it_class(tracker.rpc, tracker.bug_system, None,
+                              tracker.bug_id_from_url(comment.url))
+    thread.comment = comment.text
+    thread.post_comment()
+
+
+def _deliver(bug_system, comments):
+    """
+        Post *comments* to *bug_system* one after the other. Stop as soon as
+        the issue tracker asks us to slow down and postpone all comments for it.
+    """
+    tracker = import_string(bug_system.tracker_type)(bug_system, None)
+    if tracker.is_adding_testcase_to_issue_disabled():
+        for comment in comments:
+            comment.status = QueuedComment.FAILED
+            comment.last_error = 'Issue tracker API is not configured'
+            comment.save(update_fields=['status', 'last_error'])
+        return
+
+    for comment in comments:
+        comment.claimed_on = None
+        try:
+            _post_comment(tracker, comment)
+        except Exception as err:  # pylint: disable=broad-except
+            comment.last_error = '%s: %s' % (err.__class__.__name__, err)
+
+            if _rate_limited(err):
+                # not counted as an attempt, the comment wasn't rejected
+                retry_on = timezone.now() + _retry_after(err)
+                QueuedComment.objects.filter(  # pylint: disable=objects-update-used
+                    Q(retry_on__isnull=True) | Q(retry_on__lt=retry_on),
+                    bug_system=bug_system,
+                    status=QueuedComment.PENDING,
+                ).update(retry_on=retry_on)
+                QueuedComment.objects.filter(  # pylint: disable=objects-update-used
+                    pk__in=list(item.pk for item in comments if item.pk != comment.pk),
+                    status=QueuedComment.PENDING,
+                ).update(claimed_on=None, retry_on=retry_on)
+                comment.retry_on = retry_on
+                comment.save(update_fields=['claimed_on', 'retry_on', 'last_error'])
+                return
+
+            comment.attempts += 1
+            if comment.attempts >= settings.ISSUE_TRACKER_QUEUE_MAX_ATTEMPTS:
+                comment.status = QueuedComment.FAILED
+            else:
+                comment.retry_on = timezone.now() + RETRY_BACKOFF * 2 ** (comment.attempts - 1)
+        else:
+            comment.status = QueuedComment.DELIVERED
+            comment.delivered_on = timezone.now()
+            comment.last_error = ''
+
+        comment.save(update_fields=['status', 'claimed_on', 'retry_on', 'delivered_on',
+                                    'attempts', 'last_error'])
+
+
+def send_queued_comments():
+    """
+        Post the next batch of queued comments to their issue trackers.
+
+        :return: Number of comments which were processed, including
+                 the ones which failed or were postponed
+        :rtype: int
+    """
+    comment_ids = list(_deliverable().order_by('pk').values_list(
+        'pk', flat=True
+    )[:settings.ISSUE_TRACKER_QUEUE_BATCH_SIZE])
+    if not comment_ids:
+        return 0
+
+    # claim comments so that other workers will not deliver them again
+    claimed_on = timezone.now()
+    _deliverable().filter(pk__in=comment_ids).update(  # pylint: disable=objects-update-used
+        claimed_on=claimed_on
+    )
+    comments = list(QueuedComment.objects.filter(
+        pk__in=comment_ids, claimed_on=claimed_on
+    ).select_related('bug_system').order_by('bug_system', 'pk'))
+
+    for _, group in groupby(comments, attrgetter('bug_system_id')):
+        group = list(group)
+        try:
+            _deliver(group[0].bug_system, group)
+        except Exception as err:  # pylint: disable=broad-except
+            # e.g. invalid tracker_type, these remain claimed
+            # and will be retried after RETRY_AFTER
+            QueuedComment.objects.filter(  # pylint: disable=objects-update-used
+                pk__in=list(comment.pk for comment in group),
+                status=QueuedComment.PENDING,
+                claimed_on=claimed_on,
+            ).update(last_error=str(err))
+
+    return len(comments)
+
+
+def queue_stats():
+    """
+        Return metrics about the comment queue: the number of comments
+        in each status and when the oldest pending comment was queued.
+    """
+    stats = dict.fromkeys([QueuedComment.PENDING, QueuedComment.DELIVERED,
+                           QueuedComment.FAILED], 0)
+    for row in QueuedComment.objects.values('status').annotate(count=Count('pk')):
+        stats[row['status']] = row['count']
+
+    stats['oldest'] = QueuedComment.objects.filter(
+        status=QueuedComment.PENDING
+    ).aggregate(oldest=Min('created_on'))['oldest']
+
+    return stats
+
+
+# a single background thread posts comments which limits the number of
+# concurrent requests to issue trackers. It also wakes up periodically
+# to retry comments which were postponed. Comments are stored in tenant tables
+WORKER = BackgroundWorker('kiwitcms-issue-comments', send_queued_comments,
+                          poll_interval=60, per_schema=True)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=attribute-defined-outside-init
+import threading
+import time
+
+from django import test
+from django.db import connection
+from mock import patch
+
+from tcms.issuetracker.base import CLIENTS, ClientRegistry, IssueTrackerType
+from tcms.testcases.models import BugSystem
+
+
+class CountingTracker(IssueTrackerType):  # pylint: disable=abstract-method
+    connections = 0
+
+    def _rpc_connection(self):
+        CountingTracker.connections += 1
+        # simulate a slow remote system
+        time.sleep(0.01)
+        return object()
+
+
+class TestClientRegistry(test.TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bug_system = BugSystem.objects.create(  # nosec:B106:hardcoded_password_funcarg
+            name='Tracker with credentials',
+            tracker_type='tcms.issuetracker.tests.test_base.CountingTracker',
+            base_url='https://tracker.example.com/',
+            api_url='https://tracker.example.com/api',
+            api_username='kiwi',
+            api_password='secret',
+        )
+
+    def setUp(self):
+        super().setUp()
+        CountingTracker.connections = 0
+        CLIENTS.clear()
+
+    def test_client_is_reused(self):
+        client = CountingTracker(self.bug_system, None).rpc
+
+        self.assertIs(client, CountingTracker(self.bug_system, None).rpc)
+        self.assertEqual(1, CountingTracker.connections)
+
+    def test_changed_credentials_create_new_client(self):
+        client = CountingTracker(self.bug_system, None).rpc
+
+        # e.g. modified by another process
+        bug_system = BugSystem.objects.get(pk=self.bug_system.pk)
+        bug_system.api_password = 'changed'
+
+        registry = ClientRegistry()
+        self.assertNotEqual(registry.key(CountingTracker(self.bug_system, None)),
+                            registry.key(CountingTracker(bug_system, None)))
+        self.assertIsNot(client, CountingTracker(bug_system, None).rpc)
+        self.assertEqual(2, CountingTracker.connections)
+
+    def test_clients_are_kept_per_schema(self):
+        client = CountingTracker(self.bug_system, None).rpc
+
+        # PKs of BugSystem objects in different tenants may be the same
+        with patch.object(connection, 'schema_name', 'tenant', create=True):
+            self.assertIsNot(client, CountingTracker(self.bug_system, None).rpc)
+        self.assertEqual(2, CountingTracker.connections)
+
+    def test_client_is_evicted_when_bug_system_is_saved(self):
+        client = CountingTracker(self.bug_system, None).rpc
+
+        bug_system = BugSystem.objects.get(pk=self.bug_system.pk)
+        bug_system.name = 'Renamed tracker'
+        bug_system.save()
+
+        self.assertIsNot(client, CountingTracker(bug_system, None).rpc)
+        self.assertEqual(2, CountingTracker.connections)
+
+    def test_concurrent_access_connects_once(self):
+        clients = []
+        threads = []
+        for _number in range(5):
+            threads.append(threading.Thread(
+                target=lambda: clients.append(CountingTracker(self.bug_system, None).rpc)))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, CountingTracker.connections)
+        self.assertEqual(1, len(set(id(client) for client in clients)))
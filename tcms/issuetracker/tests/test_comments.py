@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from contextlib import nullcontext
+from datetime import timedelta
+from io import StringIO
+
+from django import test
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from mock import patch
+
+from tcms.issuetracker.base import IntegrationThread, IssueTrackerType
+from tcms.issuetracker.comments import queue_comment, queue_stats, send_queued_comments
+from tcms.testcases.models import BugSystem, QueuedComment
+from tcms.tests.factories import TestExecutionFactory
+
+
+class TooManyRequests(Exception):
+    status_code = 429
+    headers = {'Retry-After': '120'}
+
+
+class RecordingThread(IntegrationThread):
+    posted = []
+    errors = []
+
+    def post_comment(self):
+        if RecordingThread.errors:
+            raise RecordingThread.errors.pop(0)
+        RecordingThread.posted.append((self.bug_id, self.text()))
+
+
+class RecordingTracker(IssueTrackerType):  # pylint: disable=abstract-method
+    it_class = RecordingThread
+
+    def _rpc_connection(self):
+        return object()
+
+
+@override_settings(ISSUE_TRACKER_QUEUE_WORKER=None)
+class TestCommentQueue(test.TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bug_system = BugSystem.objects.create(  # nosec:B106:hardcoded_password_funcarg
+            name='Recording tracker',
+            tracker_type='tcms.issuetracker.tests.test_comments.RecordingTracker',
+            base_url='https://tracker.example.com/',
+            api_url='https://tracker.example.com/api',
+            api_username='kiwi',
+            api_password='secret',
+        )
+
+    def setUp(self):
+        super().setUp()
+        RecordingThread.posted = []
+        RecordingThread.errors = []
+
+    def test_merges_comments_for_the_same_issue(self):
+        executions = [TestExecutionFactory(), TestExecutionFactory()]
+        tracker = RecordingTracker(self.bug_system, None)
+        tracker.add_testexecution_to_issue(executions, 'https://tracker.example.com/issue/1')
+        # exact duplicates are posted only once
+        tracker.add_testexecution_to_issue(executions[1:], 'https://tracker.example.com/issue/1')
+        tracker.add_testexecution_to_issue(executions[:1], 'https://tracker.example.com/issue/2')
+
+        self.assertEqual(2, QueuedComment.objects.count())
+        self.assertEqual(2, send_queued_comments())
+
+        self.assertEqual([1, 2], list(bug_id for bug_id, _ in RecordingThread.posted))
+        text = RecordingThread.posted[0][1]
+        self.assertEqual(2, text.count('Confirmed via test execution'))
+        for execution in executions:
+            self.assertIn('TE-%d: ' % execution.pk, text)
+
+        self.assertEqual(2, QueuedComment.objects.filter(
+            status=QueuedComment.DELIVERED, delivered_on__isnull=False).count())
+        self.assertEqual(0, send_queued_comments())
+
+    def test_postpones_all_comments_when_rate_limited(self):
+        for number in range(3):
+            queue_comment(self.bug_system, 'https://tracker.example.com/issue/%d' % number,
+                          'Comment')
+        RecordingThread.errors = [TooManyRequests('Slow down')]
+
+        self.assertEqual(3, send_queued_comments())
+        self.assertEqual([], RecordingThread.posted)
+
+        for comment in QueuedComment.objects.all():
+            self.assertEqual(QueuedComment.PENDING, comment.status)
+            self.assertEqual(0, comment.attempts)
+            self.assertIsNone(comment.claimed_on)
+            self.assertGreater(comment.retry_on, timezone.now() + timedelta(seconds=60))
+        self.assertIn('TooManyRequests',
+                      QueuedComment.objects.order_by('pk').first().last_error)
+
+        # nothing to do until Retry-After has passed
+        self.assertEqual(0, send_queued_comments())
+
+        QueuedComment.objects.update(  # pylint: disable=objects-update-used
+            retry_on=timezone.now()
+        )
+        self.assertEqual(3, send_queued_comments())
+        self.assertEqual(3, len(RecordingThread.posted))
+
+    def test_failed_comment_is_retried_with_backoff(self):
+        queue_comment(self.bug_system, 'https://tracker.example.com/issue/1', 'Comment')
+        RecordingThread.errors = [ConnectionRefusedError('Connection refused')] * 2
+
+        self.assertEqual(1, send_queued_comments())
+        comment = QueuedComment.objects.get()
+        self.assertEqual(QueuedComment.PENDING, comment.status)
+        self.assertEqual(1, comment.attempts)
+        self.assertEqual('ConnectionRefusedError: Connection refused', comment.last_error)
+        self.assertIsNotNone(comment.retry_on)
+
+        QueuedComment.objects.update(  # pylint: disable=objects-update-used
+            retry_on=timezone.now()
+        )
+        with self.settings(ISSUE_TRACKER_QUEUE_MAX_ATTEMPTS=2):
+            self.assertEqual(1, send_queued_comments())
+
+        comment = QueuedComment.objects.get()
+        self.assertEqual(QueuedComment.FAILED, comment.status)
+        self.assertEqual(2, comment.attempts)
+        self.assertEqual(0, send_queued_comments())
+        self.assertEqual({'pending': 0, 'delivered': 0, 'failed': 1, 'oldest': None},
+                         queue_stats())
+
+    def test_does_not_merge_with_claimed_comments(self):
+        queue_comment(self.bug_system, 'https://tracker.example.com/issue/1', 'First')
+        QueuedComment.objects.update(  # pylint: disable=objects-update-used
+            claimed_on=timezone.now()
+        )
+        queue_comment(self.bug_system, 'https://tracker.example.com/issue/1', 'Second')
+
+        self.assertEqual(2, QueuedComment.objects.count())
+
+    def test_comments_for_disabled_tracker_fail(self):
+        bug_system = BugSystem.objects.create(
+            name='Tracker without credentials',
+            tracker_type='tcms.issuetracker.tests.test_comments.RecordingTracker',
+            base_url='https://other.example.com/',
+        )
+        queue_comment(bug_system, 'https://other.example.com/issue/1', 'Comment')
+
+        self.assertEqual(1, send_queued_comments())
+        self.assertEqual([], RecordingThread.posted)
+        self.assertEqual(QueuedComment.FAILED, QueuedComment.objects.get().status)
+
+    def test_command(self):
+        for number in range(3):
+            queue_comment(self.bug_system, 'https://tracker.example.com/issue/%d' % number,
+                          'Comment')
+
+        out = StringIO()
+        call_command('send_queued_comments', '--stats', stdout=out)
+        self.assertIn('Pending: 3\n', out.getvalue())
+
+        out = StringIO()
+        with self.settings(ISSUE_TRACKER_QUEUE_BATCH_SIZE=2):
+            call_command('send_queued_comments', stdout=out)
+
+        self.assertEqual('3 comments processed.\n', out.getvalue())
+        self.assertEqual(3, len(RecordingThread.posted))
+
+    def test_command_delivers_comments_for_all_tenants(self):
+        queue_comment(self.bug_system, 'https://tracker.example.com/issue/1', 'Comment')
+
+        out = StringIO()
+        with patch('tcms.core.management.commands.send_queued_comments.tenant_schema_names',
+                   return_value=['public', 'tenant']), \
+                patch('tcms.core.management.commands.send_queued_comments.schema_context',
+                      return_value=nullcontext()) as schema_context:
+            call_command('send_queued_comments', stdout=out)
+
+        self.assertEqual([(('public',),), (('tenant',),)], schema_context.call_args_list)
+        self.assertEqual('1 comments processed.\n', out.getvalue())
@@ -6,6 +6,7 @@ import datetime
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
+from django.core import mail
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
@@ -125,8 +126,7 @@ class TestRegistration(TestCase):
         self.assertEqual(1, signal_mock.call_count)
 
     @override_settings(ADMINS=[('Test Admin', 'admin@kiwitcms.org')])
-    @patch('tcms.core.utils.mailto.send_mail')
-    def test_signal_handler_notifies_admins(self, send_mail):
+    def test_signal_handler_notifies_admins(self):
         # connect the handler b/c it is not connected by default
         signals.USER_REGISTERED_SIGNAL.connect(signals.notify_admins)
 
@@ -135,11 +135,10 @@ class TestRegistration(TestCase):
             self.assertRedirects(response, reverse('core-views-index'), target_status_code=302)
 
             # 1 - verification mail, 2 - email to admin
-            self.assertTrue(send_mail.called)
-            self.assertEqual(2, send_mail.call_count)
+            self.assertEqual(2, len(mail.outbox))
 
             # verify we've actually sent the admin email
-            self.assertIn(str(_('New user awaiting approval')), send_mail.call_args_list[0][0][0])
+            self.assertIn(str(_('New user awaiting approval')), mail.outbox[0].subject)
             values = {
                 'username': 'signal-handler',
                 'user_url': 'http://testserver/admin/auth/user/%d/change/' % user.pk,
@@ -149,13 +148,12 @@ somebody just registered an account with username %(username)s at your
 Kiwi TCMS instance and is awaiting your approval!
 
 Go to %(user_url)s to activate the account!""") % values
-            self.assertEqual(expected.strip(), send_mail.call_args_list[0][0][1].strip())
-            self.assertIn('admin@kiwitcms.org', send_mail.call_args_list[0][0][-1])
+            self.assertEqual(expected.strip(), mail.outbox[0].body.strip())
+            self.assertIn('admin@kiwitcms.org', mail.outbox[0].to)
         finally:
             signals.USER_REGISTERED_SIGNAL.disconnect(signals.notify_admins)
 
-    @patch('tcms.core.utils.mailto.send_mail')
-    def test_register_user_by_email_confirmation(self, send_mail):
+    def test_register_user_by_email_confirmation(self):
         response, user = self.assert_user_registration('new-tester', follow=True)
         self.assertContains(
             response,
@@ -179,10 +177,11 @@ thank you for signing up for an %(site_domain)s account!
 
 To activate your account, click this link:
 %(confirm_url)s""") % values + "\n"
-        send_mail.assert_called_once_with(expected_subject, expected_body,
-                                          settings.DEFAULT_FROM_EMAIL,
-                                          ['new-tester@example.com'],
-                                          fail_silently=False)
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual(expected_subject, mail.outbox[0].subject)
+        self.assertEqual(expected_body, mail.outbox[0].body)
+        self.assertEqual(settings.DEFAULT_FROM_EMAIL, mail.outbox[0].from_email)
+        self.assertEqual(['new-tester@example.com'], mail.outbox[0].to)
 
     @override_settings(AUTO_APPROVE_NEW_USERS=False,
                        ADMINS=[('admin1', 'admin1@example.com'),
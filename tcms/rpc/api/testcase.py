@@ -280,22 +280,43 @@ def create(values, **kwargs):
 
 
 @rpc_method(name='TestCase.filter')
-def filter(query=None):  # pylint: disable=redefined-builtin
+def filter(query=None, limit=None,  # pylint: disable=redefined-builtin,too-many-arguments
+           after_pk=None, fields=None, search=None, start=0):
     """
-    .. function:: XML-RPC TestCase.filter(query)
+    .. function:: XML-RPC TestCase.filter(query, limit, after_pk, fields, search, start)
 
         Perform a search and return the resulting list of test cases
         augmented with their latest ``text``.
 
         :param query: Field lookups for :class:`tcms.testcases.models.TestCase`
         :type query: dict
+        :param limit: Return a single page with at most this many objects
+        :type limit: int
+        :param after_pk: Return only objects with PK greater than this value
+        :type after_pk: int
+        :param fields: Names of the fields to return, all fields if not specified
+        :type fields: list(str)
+        :param search: Return only test cases containing these words, ordered by
+                       relevance instead of by PK. See :mod:`tcms.search.fulltext`
+        :type search: str
+        :param start: Index of the first object on the page, used to page
+                      through search results when ``limit`` is specified
+        :type start: int
         :return: Serialized list of :class:`tcms.testcases.models.TestCase` objects.
-        :rtype: list(dict)
+                 When ``limit`` is specified returns ``{'data': [...], 'next': pk}``,
+                 use ``next`` as ``after_pk`` to fetch the next page until it is ``None``.
+                 When searching ``next`` is always ``None``, use ``next_start``
+                 as ``start`` instead
+        :rtype: list(dict) or dict
+        :raises ValueError: if ``limit`` or ``fields`` are not valid or
+                            if ``after_pk`` is used together with ``search``
+                            or if ``start`` is not valid
     """
     if query is None:
         query = {}
 
-    return TestCase.to_xmlrpc(query)
+    return TestCase.to_xmlrpc(query, stream=True, limit=limit,
+                              after_pk=after_pk, fields=fields, search=search, start=start)
 
 
 @permissions_required('testcases.change_testcase')
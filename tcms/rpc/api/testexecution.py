@@ -1,17 +1,23 @@
 # -*- coding: utf-8 -*-
 
+from copy import copy
+
 from django.conf import settings
+from django.db import transaction
 from django.forms.models import model_to_dict
 from modernrpc.core import REQUEST_KEY, rpc_method
+from simple_history.utils import bulk_update_with_history
 
 from tcms.core.contrib.linkreference.models import LinkReference
 from tcms.core.helpers import comments
+from tcms.core.history import diff_objects
 from tcms.core.utils import form_errors_to_list
 from tcms.rpc.api.forms.testrun import NewTestExecutionForm, UpdateExecutionForm
 from tcms.rpc.api.utils import tracker_from_url
 from tcms.rpc.decorators import permissions_required
 from tcms.rpc.serializer import Serializer
-from tcms.testruns.models import TestExecution
+from tcms.testcases.models import TestCase
+from tcms.testruns.models import TestExecution, TestRunStatusCount
 
 
 # conditional import b/c this App can be disabled
@@ -25,6 +31,7 @@ else:
 __all__ = (
     'create',
     'update',
+    'bulk_update',
     'filter',
 
     'add_comment',
@@ -117,18 +124,28 @@ def create(values):
 
 
 @rpc_method(name='TestExecution.filter')
-def filter(values):  # pylint: disable=redefined-builtin
+def filter(values, limit=None, after_pk=None, fields=None):  # pylint: disable=redefined-builtin
     """
-    .. function:: XML-RPC TestExecution.filter(values)
+    .. function:: XML-RPC TestExecution.filter(values, limit, after_pk, fields)
 
         Perform a search and return the resulting list of test case executions.
 
         :param values: Field lookups for :class:`tcms.testruns.models.TestExecution`
         :type values: dict
-        :return: List of serialized :class:`tcms.testruns.models.TestExecution` objects
-        :rtype: list(dict)
+        :param limit: Return a single page with at most this many objects
+        :type limit: int
+        :param after_pk: Return only objects with PK greater than this value
+        :type after_pk: int
+        :param fields: Names of the fields to return, all fields if not specified
+        :type fields: list(str)
+        :return: Serialized list of :class:`tcms.testruns.models.TestExecution` objects.
+                 When ``limit`` is specified returns ``{'data': [...], 'next': pk}``,
+                 use ``next`` as ``after_pk`` to fetch the next page until it is ``None``
+        :rtype: list(dict) or dict
+        :raises ValueError: if ``limit`` or ``fields`` are not valid
     """
-    return TestExecution.to_xmlrpc(values)
+    return TestExecution.to_xmlrpc(values, stream=True, limit=limit,
+                                   after_pk=after_pk, fields=fields)
 
 
 @permissions_required('testruns.change_testexecution')
@@ -155,22 +172,7 @@ def update(execution_id, values, **kwargs):
     form = UpdateExecutionForm(values)
 
     if form.is_valid():
-        if form.cleaned_data['build']:
-            execution.build = form.cleaned_data['build']
-
-        if form.cleaned_data['assignee']:
-            execution.assignee = form.cleaned_data['assignee']
-
-        if form.cleaned_data['status']:
-            execution.status = form.cleaned_data['status']
-            request = kwargs.get(REQUEST_KEY)
-            execution.tested_by = request.user
-
-        if form.cleaned_data['sortkey'] is not None:
-            execution.sortkey = form.cleaned_data['sortkey']
-
-        if form.cleaned_data['tested_by']:
-            execution.tested_by = form.cleaned_data['tested_by']
+        _update_fields(execution, form.cleaned_data, kwargs.get(REQUEST_KEY).user)
 
         case_text_version = form.cleaned_data['case_text_version']
         if case_text_version:
@@ -184,6 +186,108 @@ def update(execution_id, values, **kwargs):
     return execution.serialize()
 
 
+@permissions_required('testruns.change_testexecution')
+@rpc_method(name='TestExecution.bulk_update')
+def bulk_update(execution_ids, values, **kwargs):
+    """
+    .. function:: XML-RPC TestExecution.bulk_update(execution_ids, values)
+
+        Update multiple TestExecution objects with the same values. Data is
+        validated once and all objects, together with their history, are
+        updated in a single transaction.
+
+        :param execution_ids: PKs of TestExecution objects to modify
+        :type execution_ids: list(int)
+        :param values: Field values for :class:`tcms.testruns.models.TestExecution`
+        :type values: dict
+        :param kwargs: Dict providing access to the current request, protocol
+                entry point name and handler instance from the rpc method
+        :return: List of ``{'id': int, 'updated': bool}`` objects, one for each
+                 of the specified PKs. Non-existing PKs are reported as not updated!
+        :rtype: list(dict)
+        :raises ValueError: if data validations fail
+        :raises PermissionDenied: if missing *testruns.change_testexecution* permission
+    """
+    form = UpdateExecutionForm(values)
+    if not form.is_valid():
+        raise ValueError(form_errors_to_list(form))
+
+    user = kwargs.get(REQUEST_KEY).user
+    execution_ids = list(map(int, execution_ids))
+    executions = list(TestExecution.objects.filter(pk__in=execution_ids))
+
+    case_text_version = form.cleaned_data['case_text_version']
+    latest_case_text_versions = {}
+    if case_text_version == 'latest':
+        latest_case_text_versions = TestCase.get_latest_history_ids(
+            set(execution.case_id for execution in executions))
+
+    fields = set()
+    changes = []
+    for execution in executions:
+        previous = copy(execution)
+        changes.append((previous, execution))
+        fields.update(  # pylint: disable=objects-update-used
+            _update_fields(execution, form.cleaned_data, user))
+
+        if case_text_version == 'latest':
+            execution.case_text_version = latest_case_text_versions[execution.case_id]
+            fields.add('case_text_version')
+        elif case_text_version:
+            execution.case_text_version = int(case_text_version)
+            fields.add('case_text_version')
+
+        # note: the same changelog KiwiHistoricalRecords.post_save() would produce
+        execution._change_reason = diff_objects(  # pylint: disable=protected-access
+            previous, execution, TestExecution._meta.fields)
+
+    if fields:
+        with transaction.atomic():
+            bulk_update_with_history(executions, TestExecution, fields, default_user=user)
+            # bulk updates don't send signals
+            TestRunStatusCount.record_changes(changes)
+
+    updated_ids = set(execution.pk for execution in executions)
+    result = []
+    for execution_id in execution_ids:
+        result.append({
+            'id': execution_id,
+            'updated': execution_id in updated_ids,
+        })
+    return result
+
+
+def _update_fields(execution, cleaned_data, user):
+    """
+        Assign validated values, except case_text_version, to execution and
+        return the names of the fields which were modified.
+    """
+    fields = []
+
+    if cleaned_data['build']:
+        execution.build = cleaned_data['build']
+        fields.append('build')
+
+    if cleaned_data['assignee']:
+        execution.assignee = cleaned_data['assignee']
+        fields.append('assignee')
+
+    if cleaned_data['status']:
+        execution.status = cleaned_data['status']
+        execution.tested_by = user
+        fields.extend(['status', 'tested_by'])
+
+    if cleaned_data['sortkey'] is not None:
+        execution.sortkey = cleaned_data['sortkey']
+        fields.append('sortkey')
+
+    if cleaned_data['tested_by']:
+        execution.tested_by = cleaned_data['tested_by']
+        fields.append('tested_by')
+
+    return fields
+
+
 def _update_case_text_version(execution, case_text_version):
     if case_text_version == 'latest':
         execution.case_text_version = execution.case.history.latest().history_id
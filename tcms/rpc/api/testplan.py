@@ -7,13 +7,28 @@ from tcms.management.models import Tag
 from tcms.rpc import utils
 from tcms.rpc.api.forms.testplan import EditPlanForm, NewPlanForm
 from tcms.rpc.decorators import permissions_required
+from tcms.search import fulltext
 from tcms.testcases.models import TestCase, TestCasePlan
 from tcms.testplans.models import TestPlan
 
+# keys returned by TestPlan.search() and the fields they come from
+SEARCH_FIELDS = {
+    'id': 'pk',
+    'name': 'name',
+    'is_active': 'is_active',
+    'create_date': 'create_date',
+    'product_id': 'product_id',
+    'product': 'product__name',
+    'product_version': 'product_version__value',
+    'type': 'type__name',
+    'author': 'author__username',
+}
+
 __all__ = (
     'create',
     'update',
     'filter',
+    'search',
 
     'add_case',
     'remove_case',
@@ -72,22 +87,84 @@ def create(values, **kwargs):
 
 
 @rpc_method(name='TestPlan.filter')
-def filter(query=None):  # pylint: disable=redefined-builtin
+def filter(query=None, limit=None,  # pylint: disable=redefined-builtin,too-many-arguments
+           after_pk=None, fields=None,
+           search=None, start=0):  # pylint: disable=redefined-outer-name
     """
-    .. function:: XML-RPC TestPlan.filter(query)
+    .. function:: XML-RPC TestPlan.filter(query, limit, after_pk, fields, search, start)
 
         Perform a search and return the resulting list of test plans.
 
         :param query: Field lookups for :class:`tcms.testplans.models.TestPlan`
         :type query: dict
-        :return: List of serialized :class:`tcms.testplans.models.TestPlan` objects
-        :rtype: list(dict)
+        :param limit: Return a single page with at most this many objects
+        :type limit: int
+        :param after_pk: Return only objects with PK greater than this value
+        :type after_pk: int
+        :param fields: Names of the fields to return, all fields if not specified
+        :type fields: list(str)
+        :param search: Return only test plans containing these words, ordered by
+                       relevance instead of by PK. See :mod:`tcms.search.fulltext`
+        :type search: str
+        :param start: Index of the first object on the page, used to page
+                      through search results when ``limit`` is specified
+        :type start: int
+        :return: Serialized list of :class:`tcms.testplans.models.TestPlan` objects.
+                 When ``limit`` is specified returns ``{'data': [...], 'next': pk}``,
+                 use ``next`` as ``after_pk`` to fetch the next page until it is ``None``.
+                 When searching ``next`` is always ``None``, use ``next_start``
+                 as ``start`` instead
+        :rtype: list(dict) or dict
+        :raises ValueError: if ``limit`` or ``fields`` are not valid or
+                            if ``after_pk`` is used together with ``search``
+                            or if ``start`` is not valid
     """
 
     if query is None:
         query = {}
 
-    return TestPlan.to_xmlrpc(query)
+    return TestPlan.to_xmlrpc(query, limit=limit, after_pk=after_pk, fields=fields,
+                              search=search, start=start)
+
+
+@rpc_method(name='TestPlan.search')
+def search(query=None, order_by=None, start=0, length=None, terms=None):
+    """
+    .. function:: XML-RPC TestPlan.search(query, order_by, start, length, terms)
+
+        Return a single page of test plans, sorted on the server, together
+        with the number of all matching test plans. Names of the related
+        product, version, type and author are included.
+
+        :param query: Field lookups for :class:`tcms.testplans.models.TestPlan`
+        :type query: dict
+        :param order_by: Keys of the result to sort by, prefixed with ``-``
+                         for descending order, e.g. ``['-create_date']``.
+                         Sorted by relevance when searching for ``terms``,
+                         otherwise by PK, if not specified
+        :type order_by: list(str)
+        :param start: Index of the first test plan to return
+        :type start: int
+        :param length: Maximum number of test plans to return,
+                       ``DEFAULT_PAGE_SIZE`` if not specified
+        :type length: int
+        :param terms: Return only test plans containing these words,
+                      see :mod:`tcms.search.fulltext`
+        :type terms: str
+        :return: ``{'total': int, 'data': [...]}`` where every item
+                 contains the names of its tags under ``tag``
+        :rtype: dict
+        :raises ValueError: if ``order_by``, ``start`` or ``length`` are not valid
+    """
+    query_set = utils.unique_filter(TestPlan, query or {}).order_by('pk')
+    query_set = fulltext.search(query_set, terms)
+    result = utils.search_page(query_set, SEARCH_FIELDS, order_by, start, length)
+
+    tags = utils.related_names(TestPlan, 'tag', list(plan['id'] for plan in result['data']))
+    for plan in result['data']:
+        plan['tag'] = tags.get(plan['id'], [])
+
+    return result
 
 
 @permissions_required('testplans.add_testplantag')
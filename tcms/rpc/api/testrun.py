@@ -1,22 +1,57 @@
 # -*- coding: utf-8 -*-
+from copy import copy
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
 from modernrpc.core import REQUEST_KEY, rpc_method
+from simple_history.utils import bulk_update_with_history
 
+from tcms.core.contrib.linkreference.models import LinkReference
+from tcms.core.helpers import comments
+from tcms.core.history import diff_objects
 from tcms.core.utils import form_errors_to_list
-from tcms.management.models import Tag
+from tcms.management.models import Build, Tag
 from tcms.rpc.api.forms.testrun import NewForm, UpdateForm
+from tcms.rpc.api.utils import parse_junit_xml
 from tcms.rpc.decorators import permissions_required
+from tcms.rpc.utils import related_names, search_page, unique_filter
 from tcms.testcases.models import TestCase
-from tcms.testruns.models import TestExecution, TestRun
+from tcms.testruns.models import (TestExecution, TestExecutionStatus, TestRun,
+                                  TestRunStatusCount)
+
+# how many JUnit test results are resolved & ingested at once
+JUNIT_BATCH_SIZE = 500
+
+# keys returned by TestRun.search() and the fields they come from
+SEARCH_FIELDS = {
+    'id': 'pk',
+    'summary': 'summary',
+    'start_date': 'start_date',
+    'stop_date': 'stop_date',
+    'plan_id': 'plan_id',
+    'plan': 'plan__name',
+    'product_id': 'plan__product_id',
+    'product': 'plan__product__name',
+    'product_version': 'product_version__value',
+    'build': 'build__name',
+    'manager': 'manager__username',
+    'default_tester': 'default_tester__username',
+}
 
 __all__ = (
     'create',
     'update',
     'filter',
+    'search',
 
     'add_case',
     'get_cases',
     'remove_case',
 
+    'ingest_results',
+    'ingest_junit_xml',
+
     'add_tag',
     'remove_tag',
 )
@@ -39,12 +74,327 @@ def add_case(run_id, case_id):
         :raises DoesNotExist: if objects specified by the PKs don't exist
         :raises PermissionDenied: if missing *testruns.add_testexecution* permission
     """
-    execution = TestRun.objects.get(pk=run_id).add_case_run(
-        case=TestCase.objects.get(pk=case_id)
-    )
+    execution = TestRun.objects.get(pk=run_id).add_cases(
+        [TestCase.objects.get(pk=case_id)]
+    )[0]
     return execution.serialize()
 
 
+@permissions_required(('testruns.add_testexecution', 'testruns.change_testexecution'))
+@rpc_method(name='TestRun.ingest_results')
+def ingest_results(run_id, results, **kwargs):
+    """
+    .. function:: XML-RPC TestRun.ingest_results(run_id, results)
+
+        Record the results of an automated test run in bulk. For every
+        result, the latest TestExecution for the same TestCase in this
+        TestRun is updated or a new one is created if it doesn't exist.
+        The entire batch is processed with a fixed number of queries.
+
+        :param run_id: PK of TestRun to modify
+        :type run_id: int
+        :param results: List of results with the following keys:
+
+            - ``case`` (int, required) - PK of TestCase
+            - ``status`` (int or str, required) - PK or name of TestExecutionStatus
+            - ``build`` (int) - PK of Build, defaults to the build of the TestRun
+            - ``tested_by`` (int or str) - PK or username of the tester,
+              defaults to the current user
+            - ``comment`` (str) - text added as a comment to the TestExecution
+            - ``links`` (list) - URLs, or dicts with ``url``, ``name`` and ``is_defect``
+              keys, attached to the TestExecution. Issue trackers are not updated!
+        :type results: list(dict)
+        :param kwargs: Dict providing access to the current request, protocol
+                entry point name and handler instance from the rpc method
+        :return: One item for every result, in the same order, with keys
+                 ``case``, ``execution_id`` and ``created`` or with keys
+                 ``case`` and ``error`` if this result was not recorded.
+        :rtype: list(dict)
+        :raises DoesNotExist: if TestRun specified by PK doesn't exist
+        :raises PermissionDenied: if missing *testruns.add_testexecution*
+                                  or *testruns.change_testexecution* permission
+    """
+    test_run = TestRun.objects.select_related('build').get(pk=run_id)
+    return _ingest_results(test_run, results, kwargs.get(REQUEST_KEY).user,
+                           _load_statuses())
+
+
+@permissions_required(('testruns.add_testexecution', 'testruns.change_testexecution'))
+@rpc_method(name='TestRun.ingest_junit_xml')
+def ingest_junit_xml(run_id, junit_xml, **kwargs):
+    """
+    .. function:: XML-RPC TestRun.ingest_junit_xml(run_id, junit_xml)
+
+        Record the results from a JUnit XML report via
+        :func:`TestRun.ingest_results`. Each ``<testcase>`` element is matched
+        against the summary, ``classname.name``, of a TestCase inside the
+        TestPlan of this TestRun. The report is parsed incrementally and
+        results are recorded in batches, inside a single transaction so that
+        nothing is recorded if the report turns out to be invalid.
+
+        :param run_id: PK of TestRun to modify
+        :type run_id: int
+        :param junit_xml: The contents of a JUnit XML report
+        :type junit_xml: str
+        :param kwargs: Dict providing access to the current request, protocol
+                entry point name and handler instance from the rpc method
+        :return: One item for every ``<testcase>`` element, see
+                 :func:`TestRun.ingest_results`. Items have an additional
+                 ``summary`` key.
+        :rtype: list(dict)
+        :raises DoesNotExist: if TestRun specified by PK doesn't exist
+        :raises ValueError: if *junit_xml* is not a valid XML document
+        :raises PermissionDenied: if missing *testruns.add_testexecution*
+                                  or *testruns.change_testexecution* permission
+    """
+    test_run = TestRun.objects.select_related('build').get(pk=run_id)
+    user = kwargs.get(REQUEST_KEY).user
+    statuses = _load_statuses()
+
+    result = []
+    batch = []
+    with transaction.atomic():
+        for junit_result in parse_junit_xml(junit_xml):
+            batch.append(junit_result)
+            if len(batch) == JUNIT_BATCH_SIZE:
+                result.extend(_ingest_junit_results(test_run, batch, user, statuses))
+                batch = []
+
+        result.extend(_ingest_junit_results(test_run, batch, user, statuses))
+    return result
+
+
+def _load_statuses():
+    """
+        Return a mapping between the PKs and the names of all
+        TestExecutionStatus objects and the objects themselves.
+    """
+    statuses = {}
+    for status in TestExecutionStatus.objects.all():
+        statuses[status.pk] = status
+        statuses[status.name.upper()] = status
+    return statuses
+
+
+def _ingest_junit_results(test_run, junit_results, user, statuses):
+    if not junit_results:
+        return []
+
+    case_ids = {}
+    for case in TestCase.objects.filter(
+            plan=test_run.plan_id,
+            summary__in=set(junit_result['summary'] for junit_result in junit_results)
+    ).only('pk', 'summary'):
+        case_ids[case.summary] = case.pk
+
+    results = []
+    for junit_result in junit_results:
+        results.append({
+            'case': case_ids.get(junit_result['summary']),
+            'status': junit_result['status'],
+            'comment': junit_result['comment'],
+        })
+
+    result = _ingest_results(test_run, results, user, statuses)
+    for junit_result, item in zip(junit_results, result):
+        item['summary'] = junit_result['summary']
+        if item['case'] is None:
+            item['error'] = 'TestCase with this summary not found in TestPlan'
+    return result
+
+
+def _ingest_results(test_run, results, user, statuses):  # pylint: disable=too-many-locals
+    """
+        Validate all results using a fixed number of queries and
+        then create or update TestExecution objects in bulk.
+    """
+    parsed_results = list(_parse_pks(item) for item in results)
+    cases, builds, testers = _load_related_objects(
+        list(item for item, _error in parsed_results))
+
+    latest_executions = {}
+    for execution in test_run.case_run.filter(case__in=cases.keys()).order_by('pk'):
+        latest_executions[execution.case_id] = execution
+    latest_history_ids = TestCase.get_latest_history_ids(
+        set(cases.keys()).difference(latest_executions.keys()))
+
+    result = []
+    new_executions = {}
+    changed_executions = {}
+    new_comments = []
+    new_links = []
+    for raw_item, (item, error) in zip(results, parsed_results):
+        error = error or _validate_result(item, cases, builds, testers, statuses)
+        if error:
+            result.append({'case': raw_item.get('case'), 'error': error})
+            continue
+
+        case = cases[item['case']]
+        execution = latest_executions.get(case.pk)
+        if execution is None:
+            execution = new_executions.get(case.pk)
+            if execution is None:
+                execution = TestExecution(
+                    run=test_run,
+                    case=case,
+                    case_text_version=latest_history_ids[case.pk],
+                    assignee_id=case.default_tester_id or test_run.default_tester_id,
+                    sortkey=0,
+                    close_date=None)
+                new_executions[case.pk] = execution
+        elif case.pk not in changed_executions:
+            changed_executions[case.pk] = (copy(execution), execution)
+
+        execution.status = statuses[_status_key(item['status'])]
+        execution.build = builds.get(item.get('build'), test_run.build)
+        execution.tested_by = testers.get(item.get('tested_by'), user)
+
+        if item.get('comment'):
+            new_comments.append((case.pk, item['comment']))
+        for link in item.get('links') or []:
+            new_links.append((case.pk, link))
+
+        result.append({
+            'case': case.pk,
+            'execution_id': None,
+            'created': case.pk in new_executions,
+        })
+
+    with transaction.atomic():
+        executions = _save_executions(test_run, new_executions, changed_executions, user)
+        _add_links(executions, new_links)
+        comments.add_comments(
+            list((executions[case_id], comment) for case_id, comment in new_comments),
+            user)
+
+    for item in result:
+        if 'error' not in item:
+            item['execution_id'] = executions[item['case']].pk
+
+    return result
+
+
+def _parse_pks(item):
+    """
+        Return a copy of item with integer ``case`` and ``build`` values,
+        or an empty dict and an error message if they are not valid PKs!
+    """
+    parsed = dict(item)
+    for field in ('case', 'build'):
+        if item.get(field) is None:
+            continue
+
+        try:
+            parsed[field] = int(item[field])
+        except (TypeError, ValueError):
+            return {}, 'Invalid %s: %r' % (field, item[field])
+
+    return parsed, None
+
+
+def _load_related_objects(results):
+    """
+        Return mappings of all TestCase, Build and User objects
+        referenced in results, using a single query for each model.
+    """
+    case_ids = set()
+    build_ids = set()
+    tester_ids = set()
+    tester_usernames = set()
+    for item in results:
+        case_ids.add(item.get('case'))
+        build_ids.add(item.get('build'))
+
+        tested_by = item.get('tested_by')
+        if isinstance(tested_by, int):
+            tester_ids.add(tested_by)
+        elif tested_by:
+            tester_usernames.add(tested_by)
+
+    cases = TestCase.objects.only(
+        'pk', 'default_tester'
+    ).in_bulk(case_ids.difference({None}))
+    builds = Build.objects.in_bulk(build_ids.difference({None}))
+    testers = {}
+    for tester in get_user_model().objects.filter(
+            Q(pk__in=tester_ids) | Q(username__in=tester_usernames)):
+        testers[tester.pk] = tester
+        testers[tester.username] = tester
+
+    return cases, builds, testers
+
+
+def _save_executions(test_run, created, changed, user):
+    """
+        Save everything in bulk and return a mapping between
+        TestCase PKs and the corresponding TestExecution objects.
+    """
+    executions = {}
+    for execution in test_run.add_case_runs(list(created.values()), user):
+        executions[execution.case_id] = execution
+
+    for previous, execution in changed.values():
+        # note: the same changelog KiwiHistoricalRecords.post_save() would produce
+        execution._change_reason = diff_objects(  # pylint: disable=protected-access
+            previous, execution, TestExecution._meta.fields)
+        executions[execution.case_id] = execution
+
+    if changed:
+        bulk_update_with_history(
+            list(executions[case_id] for case_id in changed),
+            TestExecution, ['status', 'build', 'tested_by'], default_user=user)
+        # bulk updates don't send signals
+        TestRunStatusCount.record_changes(changed.values())
+
+    return executions
+
+
+def _status_key(status):
+    if isinstance(status, str):
+        return status.upper()
+    return status
+
+
+def _validate_result(item, cases, builds, testers, statuses):
+    """
+        Return an error message if this result can't be recorded!
+    """
+    if item.get('case') not in cases:
+        return 'TestCase matching query does not exist.'
+
+    if _status_key(item.get('status')) not in statuses:
+        return 'TestExecutionStatus matching query does not exist.'
+
+    if item.get('build') is not None and item['build'] not in builds:
+        return 'Build matching query does not exist.'
+
+    if item.get('tested_by') and item['tested_by'] not in testers:
+        return 'User matching query does not exist.'
+
+    for link in item.get('links') or []:
+        if not isinstance(link, (str, dict)) or \
+                isinstance(link, dict) and not link.get('url'):
+            return 'Links must be URLs or dicts with an "url" key.'
+
+    return None
+
+
+def _add_links(executions, new_links):
+    links = []
+    for case_id, link in new_links:
+        if isinstance(link, str):
+            link = {'url': link}
+
+        links.append(LinkReference(
+            execution=executions[case_id],
+            url=link['url'],
+            name=link.get('name', ''),
+            is_defect=link.get('is_defect', False)))
+
+    # links don't keep history
+    LinkReference.objects.bulk_create(links)  # pylint: disable=bulk-create-used
+
+
 @permissions_required('testruns.delete_testexecution')
 @rpc_method(name='TestRun.remove_case')
 def remove_case(run_id, case_id):
@@ -184,22 +534,68 @@ def create(values):
 
 
 @rpc_method(name='TestRun.filter')
-def filter(query=None):  # pylint: disable=redefined-builtin
+def filter(query=None, limit=None, after_pk=None, fields=None):  # pylint: disable=redefined-builtin
     """
-    .. function:: XML-RPC TestRun.filter(query)
+    .. function:: XML-RPC TestRun.filter(query, limit, after_pk, fields)
 
         Perform a search and return the resulting list of test runs.
 
         :param query: Field lookups for :class:`tcms.testruns.models.TestRun`
         :type query: dict
-        :return: List of serialized :class:`tcms.testruns.models.TestRun` objects
-        :rtype: list(dict)
+        :param limit: Return a single page with at most this many objects
+        :type limit: int
+        :param after_pk: Return only objects with PK greater than this value
+        :type after_pk: int
+        :param fields: Names of the fields to return, all fields if not specified
+        :type fields: list(str)
+        :return: Serialized list of :class:`tcms.testruns.models.TestRun` objects.
+                 When ``limit`` is specified returns ``{'data': [...], 'next': pk}``,
+                 use ``next`` as ``after_pk`` to fetch the next page until it is ``None``
+        :rtype: list(dict) or dict
+        :raises ValueError: if ``limit`` or ``fields`` are not valid
     """
 
     if query is None:
         query = {}
 
-    return TestRun.to_xmlrpc(query)
+    return TestRun.to_xmlrpc(query, stream=True, limit=limit,
+                             after_pk=after_pk, fields=fields)
+
+
+@rpc_method(name='TestRun.search')
+def search(query=None, order_by=None, start=0, length=None):
+    """
+    .. function:: XML-RPC TestRun.search(query, order_by, start, length)
+
+        Return a single page of test runs, sorted on the server, together
+        with the number of all matching test runs. Names of the related
+        test plan, product, version, build and users are included so that
+        search pages don't need to query them separately.
+
+        :param query: Field lookups for :class:`tcms.testruns.models.TestRun`
+        :type query: dict
+        :param order_by: Keys of the result to sort by, prefixed with ``-``
+                         for descending order, e.g. ``['-stop_date']``.
+                         Sorted by PK if not specified
+        :type order_by: list(str)
+        :param start: Index of the first test run to return
+        :type start: int
+        :param length: Maximum number of test runs to return,
+                       ``DEFAULT_PAGE_SIZE`` if not specified
+        :type length: int
+        :return: ``{'total': int, 'data': [...]}`` where every item
+                 contains the names of its tags under ``tag``
+        :rtype: dict
+        :raises ValueError: if ``order_by``, ``start`` or ``length`` are not valid
+    """
+    query_set = unique_filter(TestRun, query or {}).order_by('pk')
+    result = search_page(query_set, SEARCH_FIELDS, order_by, start, length)
+
+    tags = related_names(TestRun, 'tag', list(run['id'] for run in result['data']))
+    for run in result['data']:
+        run['tag'] = tags.get(run['id'], [])
+
+    return result
 
 
 @permissions_required('testruns.change_testrun')
@@ -2,19 +2,128 @@
 
 # Licensed under the GPL 2.0: https://www.gnu.org/licenses/old-licenses/gpl-2.0.html
 
+import time
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from defusedxml.ElementTree import ParseError, iterparse
+from django.db import connection
 from django.utils.module_loading import import_string
 
 from tcms.testcases.models import BugSystem
 
 
+# schema name -> (timestamp, BugSystem objects indexed
+# by the scheme and host of their base_url)
+_TRACKER_INDEX = {}
+
+# BugSystem objects may be modified by other processes so the
+# index is rebuilt from time to time
+TRACKER_INDEX_TIMEOUT = 60
+
+
+def _url_prefix(url):
+    parts = urlsplit(url.strip())
+    return '%s://%s' % (parts.scheme.lower(), parts.netloc.lower())
+
+
+def _tracker_index():
+    """
+        The index is kept separately for every DB schema so that
+        URLs are never matched against BugSystem objects, and their
+        credentials, of another tenant when kiwitcms-tenants is installed!
+    """
+    schema_name = getattr(connection, 'schema_name', None)
+
+    index = _TRACKER_INDEX.get(schema_name)
+    if index is None or time.monotonic() - index[0] > TRACKER_INDEX_TIMEOUT:
+        systems = {}
+        for bug_system in BugSystem.objects.exclude(base_url=None).exclude(base_url=''):
+            systems.setdefault(_url_prefix(bug_system.base_url), []).append(bug_system)
+
+        # longer, i.e. more specific, base_url takes precedence
+        for candidates in systems.values():
+            candidates.sort(key=lambda bug_system: (-len(bug_system.base_url), bug_system.pk))
+
+        index = (time.monotonic(), systems)
+        _TRACKER_INDEX[schema_name] = index
+
+    return index[1]
+
+
+def reset_tracker_index():
+    """
+        Called when a BugSystem is modified so that the next call to
+        :func:`tracker_from_url` will rebuild its index!
+    """
+    _TRACKER_INDEX.clear()
+
+
 def tracker_from_url(url, request):
     """
         Return the IssueTrackerType object for the system
         where ``base_url`` is part of ``url``. Usually we pass
         URLs to pre-existing defects to this method.
+
+        All BugSystem objects are kept in memory, indexed by scheme and
+        host, so there's no need to query the database for every URL!
     """
-    for bug_system in BugSystem.objects.all():
-        if bug_system.base_url and url.startswith(bug_system.base_url):
+    for bug_system in _tracker_index().get(_url_prefix(url), []):
+        if url.startswith(bug_system.base_url):
             return import_string(bug_system.tracker_type)(bug_system, request)
 
     return None
+
+
+# JUnit element => TestExecutionStatus name
+JUNIT_STATUSES = {
+    'failure': 'FAILED',
+    'error': 'ERROR',
+    'skipped': 'WAIVED',
+}
+
+
+def parse_junit_xml(junit_xml):
+    """
+        Parse a JUnit XML report incrementally and yield a dict with
+        ``summary``, ``status`` and ``comment`` keys for each ``<testcase>``.
+        Parsed ``<testcase>`` elements are removed from their parent
+        immediately so that large reports don't have to be kept in memory
+        as a tree.
+    """
+    if isinstance(junit_xml, str):
+        junit_xml = junit_xml.encode()
+
+    # elements which have been opened but not closed yet
+    parents = []
+    try:
+        for event, element in iterparse(BytesIO(junit_xml), events=('start', 'end')):
+            if event == 'start':
+                parents.append(element)
+                continue
+
+            parents.pop()
+            if element.tag != 'testcase':
+                continue
+
+            summary = element.get('name', '')
+            if element.get('classname'):
+                summary = '%s.%s' % (element.get('classname'), summary)
+
+            status = 'PASSED'
+            comment = None
+            for child in element:
+                if child.tag in JUNIT_STATUSES:
+                    status = JUNIT_STATUSES[child.tag]
+                    comment = child.get('message') or child.text
+                    break
+
+            if parents:
+                parents[-1].remove(element)
+            yield {
+                'summary': summary[:255],
+                'status': status,
+                'comment': comment,
+            }
+    except ParseError as err:
+        raise ValueError('Invalid JUnit XML: %s' % err)
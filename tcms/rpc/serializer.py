@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime, timedelta
-from itertools import groupby
+from itertools import islice
 
 from django.db.models import ObjectDoesNotExist
 from django.db.models.fields.related import ForeignKey
@@ -11,6 +11,13 @@ SECONDS_PER_MIN = 60
 SECONDS_PER_HOUR = 3600
 SECONDS_PER_DAY = 86400
 
+# number of rows serialized at once by QuerySetBasedRPCSerializer, also
+# the size of the IN clause when querying ManyToManyField values
+CHUNK_SIZE = 500
+
+# (serializer class, model class) -> CompiledMapping
+_COMPILED_MAPPINGS = {}
+
 # ## Data format conversion functions ###
 
 
@@ -125,50 +132,68 @@ class Serializer:
         return response
 
 
-def _get_single_field_related_object_pks(m2m_field_query, model_pk, field_name):
-    field_names = []
-    for item in m2m_field_query[model_pk]:
-        if item[field_name]:
-            field_names.append(item[field_name])
-    return field_names
-
-
-def _get_related_object_pks(m2m_fields_query, model_pk, field_name):
-    """Return related object pks from query result via ManyToManyFields
-
-    Any object pk with value 0 or None values will be excluded in the final
-    list.
-
-    :param m2m_fields_query: the result returned from _query_m2m_fields
-    :type m2m_fields_query: dict
-    :param model_pk: whose object's related object pks will be retrieved
-    :type model_pk: int or long
-    :param field_name: field name of the related object
-    :type field_name: str
-    :return: list of related objects' pks
-    :rtype: list
+class CompiledMapping:  # pylint: disable=too-few-public-methods
     """
-    data = m2m_fields_query[field_name]
-    return _get_single_field_related_object_pks(data, model_pk, field_name)
-
-
-def _serialize_names(row, values_fields_mapping):
-    """Replace name from ORM side to the serialization side as expected"""
-    new_serialized_data = {}
-
-    if not values_fields_mapping:
-        # If no fields mapping, just use the original row as the
-        # serialization result, and no data format conversion is
-        # required obviously
-        new_serialized_data.update(row)  # pylint: disable=objects-update-used
-        return new_serialized_data
-
-    for orm_name, serialize_info in values_fields_mapping.items():
-        serialize_name, conv_func = serialize_info
-        value = conv_func(row[orm_name])
-        new_serialized_data[serialize_name] = value
-
-    return new_serialized_data
+        Values fields mapping of a serializer class compiled into
+        tuples so that rows returned by ``QuerySet.values_list()`` can be
+        converted without looking up names and converters for every row.
+    """
+    def __init__(self, values_fields, values_fields_mapping,  # pylint: disable=too-many-arguments
+                 primary_key_field, m2m_fields, extra_fields, fields=None):
+        self.values_fields = tuple(values_fields)
+        if values_fields_mapping:
+            self.names = tuple(values_fields_mapping[orm_name][0]
+                               for orm_name in self.values_fields)
+        else:
+            self.names = self.values_fields
+        self.m2m_fields = tuple(m2m_fields)
+        self.aliases = tuple(extra_fields.get('alias', {}).items())
+
+        if fields is not None:
+            self._select(fields)
+
+        # do_nothing() is skipped b/c it is the most common converter
+        self.converters = tuple(
+            (serialize_name, conv_func)
+            for serialize_name, conv_func in values_fields_mapping.values()
+            if conv_func is not do_nothing and serialize_name in self.names
+        )
+
+        # the primary key is queried even if not present in the mapping
+        if primary_key_field not in self.values_fields:
+            self.values_fields += (primary_key_field, )
+        self.pk_index = self.values_fields.index(primary_key_field)
+
+    def _select(self, fields):
+        """
+            Keep only the requested fields, using their serialized names.
+            Aliased fields are queried if their alias is requested.
+        """
+        fields = set(fields)
+        requested = fields.union(original for original, alias in self.aliases
+                                 if alias in fields)
+        unknown = requested.difference(self.names, self.m2m_fields,
+                                       (alias for _original, alias in self.aliases))
+        if unknown:
+            raise ValueError(_('Unknown fields: %s') % ', '.join(sorted(unknown)))
+
+        selected = tuple(index for index, name in enumerate(self.names) if name in requested)
+        self.values_fields = tuple(self.values_fields[index] for index in selected)
+        self.names = tuple(self.names[index] for index in selected)
+        self.m2m_fields = tuple(name for name in self.m2m_fields if name in requested)
+        self.aliases = tuple((original, alias) for original, alias in self.aliases
+                             if alias in fields)
+
+    def transform(self, row):
+        """
+            Convert a single row into the serialized dictionary,
+            without ManyToManyField values and aliases.
+        """
+        # note: zip() ignores the primary key when it isn't part of the mapping
+        data = dict(zip(self.names, row))
+        for serialize_name, conv_func in self.converters:
+            data[serialize_name] = conv_func(data[serialize_name])
+        return data
 
 
 class QuerySetBasedRPCSerializer(Serializer):
@@ -177,8 +202,8 @@ class QuerySetBasedRPCSerializer(Serializer):
     To configure the serialization, developer can specify following class
     attribute, values_fields_mapping, m2m_fields, and primary_key.
 
-    An unknown issue is that the primary key must appear in the
-    values_fields_mapping. If doesn't, error would happen.
+    The configuration is compiled once per serializer class, see
+    :class:`CompiledMapping`, so it must not change at runtime!
     """
 
     # Define the mapping relationship of names from ORM side to XMLRPC output
@@ -193,7 +218,7 @@ class QuerySetBasedRPCSerializer(Serializer):
 
     m2m_fields = ()
 
-    def __init__(self, model_class, queryset):
+    def __init__(self, model_class, queryset, fields=None):
         super().__init__(model_class, queryset)
         if model_class is None:
             raise ValueError('model_class should not be None')
@@ -202,6 +227,10 @@ class QuerySetBasedRPCSerializer(Serializer):
 
         self.model_class = model_class
         self.queryset = queryset
+        # serialized names of the fields to return, None for all fields
+        self.fields = fields
+        # PK of the last serialized object
+        self.last_pk = None
 
     def get_extra_fields(self):
         """Get definition of extra fields mappings
@@ -287,36 +316,78 @@ class QuerySetBasedRPCSerializer(Serializer):
             _('Model %s has no primary key. You have to specify such '
               'field manually.') % self.model_class.__name__)
 
-    def _query_m2m_field(self, field_name):
-        """Query ManyToManyField order by model's pk
+    def _compile(self):
+        """
+            Compile the serialization configuration once per serializer
+            class and model. Configurations limited to specific fields
+            are compiled every time b/c there are too many combinations!
+
+            :return: the compiled mapping
+            :rtype: :class:`CompiledMapping`
+        """
+        key = (self.__class__, self.model_class)
+        if self.fields is None and key in _COMPILED_MAPPINGS:
+            return _COMPILED_MAPPINGS[key]
+
+        compiled = CompiledMapping(
+            self._get_values_fields(),
+            self._get_values_fields_mapping(),
+            self._get_primary_key_field(),
+            self._get_m2m_fields(),
+            self.get_extra_fields(),
+            self.fields,
+        )
+        if self.fields is None:
+            _COMPILED_MAPPINGS[key] = compiled
+        return compiled
+
+    def _query_m2m_field(self, field_name, object_pks):
+        """Query the through table of a ManyToManyField for the given objects
 
         Return value's format:
         {
-            object_pk1: ({'pk': object_pk1, 'field_name': related_object_pk1},
-                         {'pk': object_pk1, 'field_name': related_object_pk2},
-                        ),
-            object_pk2: ({'pk': object_pk2, 'field_name': related_object_pk3},
-                         {'pk': object_pk2, 'field_name': related_object_pk4},
-                         {'pk': object_pk3, 'field_name': related_object_pk5},
-                        ),
+            object_pk1: [related_object_pk1, related_object_pk2],
+            object_pk2: [related_object_pk3],
             ...
         }
 
-        :param str field_name: field name of a ManyToManyField
-        :return: dictionary mapping between model's pk and related object's pk
+        :param field_name: field name of a ManyToManyField, either
+                           forward or reverse
+        :type field_name: str
+        :param object_pks: PKs of the serialized objects
+        :type object_pks: list
+        :return: dictionary mapping between model's pk and related objects' pks
         :rtype: dict
         """
-        qs = self.queryset.values('pk', field_name).order_by('pk')
-        return dict((pk, tuple(values)) for pk, values in
-                    groupby(qs.iterator(), lambda item: item['pk']))
-
-    def _query_m2m_fields(self):
-        m2m_fields = self._get_m2m_fields()
-        result = ((field_name, self._query_m2m_field(field_name))
-                  for field_name in m2m_fields)
-        return dict(result)
-
-    def _handle_extra_fields(self, data):
+        field = self.model_class._meta.get_field(field_name)
+        if field.auto_created:
+            # reverse relationship, e.g. TestPlan.case
+            through = field.through
+            source = field.field.m2m_reverse_field_name()
+            target = field.field.m2m_field_name()
+        else:
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+
+        result = {}
+        rows = through.objects.filter(
+            **{'%s__in' % source: object_pks}
+        ).values_list(
+            through._meta.get_field(source).attname,
+            through._meta.get_field(target).attname,
+        ).order_by('pk')
+
+        for object_pk, related_object_pk in rows:
+            if related_object_pk:
+                result.setdefault(object_pk, []).append(related_object_pk)
+        return result
+
+    def _query_m2m_fields(self, object_pks):
+        return dict((field_name, self._query_m2m_field(field_name, object_pks))
+                    for field_name in self._get_m2m_fields())
+
+    def _handle_extra_fields(self, data, compiled=None):
         """Add extra fields
 
         Currently, alias is supported.
@@ -324,21 +395,63 @@ class QuerySetBasedRPCSerializer(Serializer):
             - alias: add alias for any other serialized field name. If the
               specified field name does not exist in serialization result, it
               will be ignored.
+
+        :param data: serialized object
+        :type data: dict
+        :param compiled: mapping compiled by the caller, compiled on demand if omitted
+        :type compiled: :class:`CompiledMapping`
         """
-        extra_fields = self.get_extra_fields()
+        if compiled is None:
+            compiled = self._compile()
 
-        for handle_name, value in extra_fields.items():
-            if handle_name == 'alias':
-                for original_name, alias in value.items():
-                    if original_name in data:
-                        data[alias] = data[original_name]
+        for original_name, alias in compiled.aliases:
+            if original_name in data:
+                data[alias] = data[original_name]
+
+    def iterate(self, chunk_size=CHUNK_SIZE):
+        """Serialize the queryset one row at a time
+
+        Rows are fetched from the database in chunks of ``chunk_size``.
+        ManyToManyField values are queried with a single query per field
+        for each chunk so that memory usage stays bounded.
+
+        :param chunk_size: number of rows fetched at once
+        :type chunk_size: int
+        :return: generator of serialized objects
+        :rtype: generator
+        """
+        compiled = self._compile()
+        pk_index = compiled.pk_index
+        rows = self.queryset.values_list(*compiled.values_fields).iterator(chunk_size)
+
+        chunk = list(islice(rows, chunk_size))
+        while chunk:
+            m2m_fields_query = {}
+            if compiled.m2m_fields:
+                m2m_fields_query = self._query_m2m_fields(
+                    list(row[pk_index] for row in chunk)
+                )
+
+            for row in chunk:
+                data = compiled.transform(row)
+
+                for field_name in compiled.m2m_fields:
+                    data[field_name] = m2m_fields_query[field_name].get(row[pk_index], [])
+
+                if compiled.aliases:
+                    self._handle_extra_fields(data, compiled)
+
+                yield data
+
+            self.last_pk = chunk[-1][pk_index]
+            chunk = list(islice(rows, chunk_size))
 
     def serialize_queryset(self):
         """Core of QuerySet based serialization
 
         The process of serialization has following steps
 
-        - Get data from database using QuerySet.values method
+        - Get data from database using QuerySet.values_list method
         - Transfer data to the output destiation according to serialization
           standard, where two things must be done:
 
@@ -350,41 +463,45 @@ class QuerySetBasedRPCSerializer(Serializer):
         - During the process of the above transfer, data associated with
           ManyToManyField should be retrieved from database and attached to
           each serialized data object.
+        - Finally, there might be some extra fields, e.g. aliases, added to
+          the result to provide more information besides data from database.
         """
-        queryset = self.queryset.values(*self._get_values_fields())
-        primary_key_field = self._get_primary_key_field()
-        values_fields_mapping = self._get_values_fields_mapping()
-        m2m_fields = self._get_m2m_fields()
-        m2m_not_queried = True
-        serialize_result = []
-
-        # Handle ManyToManyFields, add such fields' values to final
-        # serialization
-        for row in queryset.iterator():
-            new_serialized_data = _serialize_names(row, values_fields_mapping)
-
-            # Attach values of each ManyToManyField field
-            # Lazy ManyToManyField query, to avoid query on ManyToManyFields if
-            # serialization data is empty from database.
-            if m2m_not_queried:
-                m2m_fields_query = self._query_m2m_fields()
-                m2m_not_queried = False
-            model_pk = row[primary_key_field]
-            for field_name in m2m_fields:
-                related_object_pks = _get_related_object_pks(
-                    m2m_fields_query, model_pk, field_name)
-                new_serialized_data[field_name] = related_object_pks
-
-            # Finally, there might be some extra fields to added to final JSON
-            # result to provide more custom information besides those data from
-            # database. Add such extra fields in various ways that developers
-            # define. This should be determined during the development
-            # according to requirement.
-            self._handle_extra_fields(new_serialized_data)
-
-            serialize_result.append(new_serialized_data)
-
-        return serialize_result
+        return list(self.iterate())
+
+    def serialize(self, stream=False, limit=None, start=0):
+        """Serialize the queryset as a list, a generator or a single page
+
+        :param stream: Return a generator instead of a list
+        :type stream: bool
+        :param limit: Return a page with at most this many objects in the
+                      format ``{'data': [...], 'next': pk}``. Pass ``next``
+                      as ``after_pk`` to the next query in order to fetch
+                      the next page, it is ``None`` after the last page!
+                      The queryset must be ordered by PK.
+        :type limit: int
+        :param start: Index of the first object on the page
+        :type start: int
+        :return: Serialized objects
+        :rtype: list, generator or dict
+        :raises ValueError: if limit or start are not valid
+        """
+        if limit is not None:
+            if not isinstance(limit, int) or limit < 1:
+                raise ValueError(_('limit must be a positive integer'))
+            if not isinstance(start, int) or start < 0:
+                raise ValueError(_('start must be a non-negative integer'))
+
+            self.queryset = self.queryset[start:start + limit]
+            data = self.serialize_queryset()
+            return {
+                'data': data,
+                'next': self.last_pk if len(data) == limit else None,
+            }
+
+        if stream:
+            return self.iterate()
+
+        return self.serialize_queryset()
 
 
 class TestPlanRPCSerializer(QuerySetBasedRPCSerializer):
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=bulk-create-used
+"""
+    Tests for the RPC layer using large data sets. They are slow and are
+    skipped by default, execute them with:
+
+        KIWI_BENCHMARK=1 ./manage.py test tcms.rpc.tests.test_benchmark
+"""
+import html
+import json
+import os
+import unittest
+
+from django import test
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tcms.handlers import SafeJSONEncoder
+from tcms.rpc.serializer import CHUNK_SIZE
+from tcms.testcases.models import TestCase, TestCasePlan, TestCaseTag
+from tcms.testruns.models import TestExecution
+from tcms.tests.factories import (TagFactory, TestCaseFactory,
+                                  TestExecutionFactory, TestPlanFactory)
+
+BENCHMARK_ROWS = 50000
+ESCAPING_BENCHMARK_ROWS = 100000
+
+
+@unittest.skipUnless(os.environ.get('KIWI_BENCHMARK'), 'KIWI_BENCHMARK is not set')
+class SerializerBenchmark(test.TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        case = TestCaseFactory()
+        plan = TestPlanFactory()
+        tag = TagFactory()
+
+        cases = []
+        for number in range(BENCHMARK_ROWS - 1):
+            cases.append(TestCase(summary='Benchmark %d' % number,
+                                  text='Given-When-Then %d' % number,
+                                  case_status=case.case_status,
+                                  priority=case.priority,
+                                  category=case.category,
+                                  author=case.author,
+                                  default_tester=case.default_tester,
+                                  reviewer=case.reviewer))
+        TestCase.objects.bulk_create(cases, batch_size=CHUNK_SIZE)
+
+        plans = []
+        tags = []
+        for case_id in TestCase.objects.values_list('pk', flat=True):
+            plans.append(TestCasePlan(case_id=case_id, plan=plan))
+            tags.append(TestCaseTag(case_id=case_id, tag=tag))
+        TestCasePlan.objects.bulk_create(plans, batch_size=CHUNK_SIZE)
+        TestCaseTag.objects.bulk_create(tags, batch_size=CHUNK_SIZE)
+
+    def test_testcase_filter(self):
+        with CaptureQueriesContext(connection) as context:
+            result = TestCase.to_xmlrpc({})
+
+        self.assertEqual(BENCHMARK_ROWS, len(result))
+        # 1 query for all cases, 1 query per ManyToManyField for each chunk
+        chunks = -(-BENCHMARK_ROWS // CHUNK_SIZE)
+        self.assertEqual(1 + chunks * 3, len(context.captured_queries))
+
+
+def escape_rows(rows):
+    """
+        Escape strings by walking the result before encoding it,
+        the way SafeJSONRPCHandler used to do it!
+    """
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, str):
+                row[key] = html.escape(value)
+    return rows
+
+
+@unittest.skipUnless(os.environ.get('KIWI_BENCHMARK'), 'KIWI_BENCHMARK is not set')
+class SafeJSONEncoderBenchmark(test.TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        execution = TestExecutionFactory()
+        execution.case.summary = '<b>Escape me</b> & "quote" me'
+        execution.case.save()
+
+        executions = []
+        for number in range(ESCAPING_BENCHMARK_ROWS - 1):
+            executions.append(TestExecution(assignee=execution.assignee,
+                                            tested_by=execution.tested_by,
+                                            case_text_version=number + 1000,
+                                            run=execution.run,
+                                            case=execution.case,
+                                            status=execution.status,
+                                            build=execution.build))
+        TestExecution.objects.bulk_create(executions, batch_size=CHUNK_SIZE)
+
+    def test_testexecution_filter_response(self):
+        rows = TestExecution.to_xmlrpc({})
+        self.assertEqual(ESCAPING_BENCHMARK_ROWS, len(rows))
+
+        walked = json.dumps(escape_rows(list(dict(row) for row in rows)),
+                            cls=DjangoJSONEncoder)
+        encoded = SafeJSONEncoder().encode(rows)
+
+        self.assertEqual(json.loads(walked), json.loads(encoded))
+        self.assertIn('&lt;b&gt;Escape me&lt;/b&gt; &amp; &quot;quote&quot; me', encoded)
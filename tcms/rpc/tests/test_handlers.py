@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=too-many-ancestors
+import json
+import unittest
+from datetime import date
+
+from django.http import StreamingHttpResponse
+from django.utils.translation import override
+from django.utils.translation import gettext_lazy as _
+from mock import patch
+
+from tcms.handlers import SafeJSONEncoder
+from tcms.tests import BasePlanCase, user_should_have_perm
+from tcms.tests.factories import TestCaseFactory
+
+
+class TestSafeJSONRPCHandlerStreaming(BasePlanCase):
+    """Test streaming of *.filter() results via JSON-RPC"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        user_should_have_perm(cls.tester, 'testcases.view_testcase')
+
+        cls.xss_case = TestCaseFactory(summary='<script>alert("XSS")</script>', plan=[cls.plan])
+
+    def json_rpc(self, payload):
+        return self.client.post('/json-rpc/', json.dumps(payload),
+                                content_type='application/json')
+
+    @staticmethod
+    def streamed_json(response):
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_filter_result_is_streamed_and_escaped(self):
+        with patch('tcms.handlers.CHUNK_SIZE', 2):
+            response = self.json_rpc({
+                'jsonrpc': '2.0', 'id': 'filter', 'method': 'TestCase.filter',
+                'params': [{'plan': self.plan.pk}],
+            })
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual('application/json', response['Content-Type'])
+
+        result = self.streamed_json(response)
+        self.assertEqual('filter', result['id'])
+        self.assertEqual('2.0', result['jsonrpc'])
+
+        expected = list(self.plan.case.order_by('pk').values_list('pk', flat=True))
+        self.assertEqual(expected, list(case['id'] for case in result['result']))
+        for case in result['result']:
+            if case['id'] == self.xss_case.pk:
+                self.assertEqual('&lt;script&gt;alert(&quot;XSS&quot;)&lt;/script&gt;',
+                                 case['summary'])
+
+    def test_empty_filter_result(self):
+        response = self.json_rpc({
+            'jsonrpc': '2.0', 'id': 1, 'method': 'TestCase.filter',
+            'params': [{'pk': -1}],
+        })
+
+        self.assertEqual({'id': 1, 'jsonrpc': '2.0', 'result': []},
+                         self.streamed_json(response))
+
+    def test_invalid_query_returns_error(self):
+        response = self.json_rpc({
+            'jsonrpc': '2.0', 'id': 1, 'method': 'TestCase.filter',
+            'params': [{'non_existing_field': 1}],
+        })
+
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+        self.assertIn('non_existing_field', json.loads(response.content)['error']['message'])
+
+    def test_nested_results_are_escaped(self):
+        response = self.json_rpc({
+            'jsonrpc': '2.0', 'id': 1, 'method': 'TestCase.filter',
+            'params': [{'pk': self.xss_case.pk}, 1],
+        })
+
+        result = json.loads(response.content)['result']
+        self.assertEqual('&lt;script&gt;alert(&quot;XSS&quot;)&lt;/script&gt;',
+                         result['data'][0]['summary'])
+
+    def test_batch_request_is_not_streamed(self):
+        response = self.json_rpc([{
+            'jsonrpc': '2.0', 'id': 1, 'method': 'TestCase.filter',
+            'params': [{'pk': self.xss_case.pk}],
+        }])
+
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+        result = json.loads(response.content)
+        self.assertEqual(self.xss_case.pk, result[0]['result'][0]['id'])
+
+
+class TestSafeJSONEncoder(unittest.TestCase):
+    def test_escapes_strings_at_any_level(self):
+        result = SafeJSONEncoder().encode({
+            '<key>': '<b>',
+            'nested': [['<i>', {'deep': ['"quoted" & \'single\'']}], 1, 2.5, None, True],
+        })
+
+        self.assertEqual({
+            '&lt;key&gt;': '&lt;b&gt;',
+            'nested': [['&lt;i&gt;',
+                        {'deep': ['&quot;quoted&quot; &amp; &#x27;single&#x27;']}],
+                       1, 2.5, None, True],
+        }, json.loads(result))
+
+    def test_escapes_top_level_string(self):
+        self.assertEqual('"&lt;script&gt;"', SafeJSONEncoder().encode('<script>'))
+
+    def test_encodes_non_ascii_and_django_types(self):
+        with override('en'):
+            result = SafeJSONEncoder().encode({'text': 'кирилица', 'date': date(2020, 8, 1),
+                                               'lazy': _('Case')})
+
+        self.assertEqual({'text': 'кирилица', 'date': '2020-08-01', 'lazy': 'Case'},
+                         json.loads(result))
+
+    @patch('json.encoder.c_make_encoder', None)
+    def test_escapes_without_c_encoder(self):
+        result = SafeJSONEncoder().encode({'nested': [{'deep': '<b>'}], 'float': 1.5})
+
+        self.assertEqual({'nested': [{'deep': '&lt;b&gt;'}], 'float': 1.5}, json.loads(result))
@@ -9,8 +9,7 @@ from django.utils import timezone
 
 from tcms.management.models import Product
 from tcms.rpc.serializer import (QuerySetBasedRPCSerializer, Serializer,
-                                 _get_related_object_pks, datetime_to_str,
-                                 do_nothing, to_str)
+                                 datetime_to_str, do_nothing, to_str)
 from tcms.testcases.models import TestCase
 from tcms.testplans.models import TestPlan
 from tcms.tests.factories import (ComponentFactory, ProductFactory,
@@ -93,6 +92,15 @@ class MockTestCaseSerializer(QuerySetBasedRPCSerializer):
     }
 
 
+class MockTestCaseWithoutPKSerializer(QuerySetBasedRPCSerializer):
+    values_fields_mapping = {
+        'author': ('author_id', do_nothing),
+        'author__username': ('author', to_str),
+    }
+
+    m2m_fields = ('plan',)
+
+
 class TestQuerySetBasedSerializer(test.TestCase):
     """Test QuerySetBasedRPCSerializer"""
 
@@ -203,53 +211,45 @@ class TestQuerySetBasedSerializer(test.TestCase):
 
         self.assertEqual(expected_field_name, field_name)
 
-    def verify_m2m_field_query_result(self, m2m_field_name, result):
-        for object_pk, objects in result.items():
-            self.assertTrue(isinstance(objects, tuple))
-            for object_value in objects:
-                self.assertEqual(object_pk, object_value['pk'])
-                self.assertTrue(m2m_field_name in object_value)
-
     def test_query_m2m_field(self):
-        m2m_field_name = 'case'
+        plan_pks = list(self.plans.values_list('pk', flat=True))
 
-        result = self.plan_serializer._query_m2m_field(m2m_field_name)
+        with self.assertNumQueries(1):
+            result = self.plan_serializer._query_m2m_field('case', plan_pks)
 
         self.assertEqual(len(result), len(self.plans),
                          'There are cases in database, but not serialized.')
-        self.verify_m2m_field_query_result(m2m_field_name, result)
+        for plan in self.plans:
+            self.assertEqual(sorted(plan.case.values_list('pk', flat=True)),
+                             sorted(result[plan.pk]))
 
-    def test_query_m2m_fields(self):
-        result = self.plan_serializer._query_m2m_fields()
-        self.assertTrue(isinstance(result, dict))
-        self.assertEqual(len(result), len(MockTestPlanSerializer.m2m_fields))
-
-        for m2m_field_name, this_query_result in result.items():
-            self.assertTrue(m2m_field_name in MockTestPlanSerializer.m2m_fields)
-            self.assertTrue(isinstance(this_query_result, dict))
+    def test_query_m2m_field_for_subset_of_objects(self):
+        result = self.plan_serializer._query_m2m_field('case', [self.plans[0].pk])
 
-            # Method to verify object_values is same with test case
-            # test_query_m2m_field
-            self.verify_m2m_field_query_result(m2m_field_name,
-                                               this_query_result)
+        self.assertEqual([self.plans[0].pk], list(result.keys()))
 
-    def test_get_related_object_pks(self):
-        m2m_field_name = 'case'
+    def test_query_forward_m2m_field(self):
+        case_pks = list(self.cases.values_list('pk', flat=True))
+        plan = TestPlanFactory()
+        for case in self.cases:
+            plan.add_case(case)
 
-        m2m_query_result = self.plan_serializer._query_m2m_fields()
+        result = self.case_serializer._query_m2m_field('plan', case_pks)
 
-        result = _get_related_object_pks(m2m_query_result,
-                                         self.plans[0].pk,
-                                         m2m_field_name)
-        result.sort()
+        self.assertEqual(set(case_pks), set(result.keys()))
+        for plans in result.values():
+            self.assertEqual([plan.pk], plans)
 
-        expected_values = []
+    def test_query_m2m_fields(self):
+        plan_pks = list(self.plans.values_list('pk', flat=True))
 
-        for case in self.plans[0].case.all():
-            expected_values.append(case.pk)
+        result = self.plan_serializer._query_m2m_fields(plan_pks)
+        self.assertTrue(isinstance(result, dict))
+        self.assertEqual(len(result), len(MockTestPlanSerializer.m2m_fields))
 
-        expected_values.sort()
-        self.assertEqual(expected_values, result)
+        for m2m_field_name, this_query_result in result.items():
+            self.assertTrue(m2m_field_name in MockTestPlanSerializer.m2m_fields)
+            self.assertTrue(isinstance(this_query_result, dict))
 
     # ####### Test cases for extra_fields #######
 
@@ -303,3 +303,58 @@ class TestQuerySetBasedSerializer(test.TestCase):
         serializer = MockTestCaseSerializer(TestCase, cases)
         result = serializer.serialize_queryset()
         self.assertTrue(len(result) == 0)
+
+    def test_serialize_queryset_in_chunks(self):
+        # 1 query for the plans, 1 query for the cases of each chunk
+        with self.assertNumQueries(3):
+            result = list(self.plan_serializer.iterate(chunk_size=2))
+
+        self.assertEqual(len(self.plans), len(result))
+        for plan in result:
+            expected_cases = TestPlan.objects.get(pk=plan['id']).case.values_list('pk', flat=True)
+            self.assertEqual(sorted(expected_cases), sorted(plan['case']))
+            self.assertEqual(plan['product_version'], plan['default_product_version'])
+
+    def test_serialize_selected_fields(self):
+        serializer = MockTestPlanSerializer(TestPlan, self.plans,
+                                            fields=['name', 'default_product_version'])
+
+        # the M2M field isn't queried b/c it wasn't requested
+        with self.assertNumQueries(1):
+            result = serializer.serialize_queryset()
+
+        self.assertEqual(len(self.plans), len(result))
+        for plan in result:
+            self.assertEqual(['default_product_version', 'name', 'product_version'],
+                             sorted(plan.keys()))
+
+    def test_serialize_unknown_fields(self):
+        serializer = MockTestPlanSerializer(TestPlan, self.plans, fields=['name', 'unknown'])
+
+        with self.assertRaisesRegex(ValueError, 'Unknown fields: unknown'):
+            serializer.serialize_queryset()
+
+    def test_serialize_page(self):
+        plan_pks = sorted(self.plans.values_list('pk', flat=True))
+        serializer = MockTestPlanSerializer(TestPlan, self.plans.order_by('pk'), fields=['case'])
+
+        result = serializer.serialize(limit=2)
+
+        self.assertEqual(2, len(result['data']))
+        self.assertEqual(plan_pks[1], result['next'])
+
+        serializer = MockTestPlanSerializer(
+            TestPlan, self.plans.filter(pk__gt=result['next']).order_by('pk'))
+        result = serializer.serialize(limit=2)
+
+        self.assertEqual([plan_pks[2]], list(plan['id'] for plan in result['data']))
+        self.assertIsNone(result['next'])
+
+    def test_serialize_queryset_without_primary_key_in_mapping(self):
+        serializer = MockTestCaseWithoutPKSerializer(TestCase, self.cases)
+
+        result = serializer.serialize_queryset()
+
+        self.assertEqual(len(self.cases), len(result))
+        for case in result:
+            self.assertEqual(['author', 'author_id', 'plan'], sorted(case.keys()))
@@ -68,6 +68,71 @@ class TestFilterCases(APITestCase):
         self.assertIsNotNone(cases)
         self.assertEqual(len(cases), self.cases_count)
 
+    def test_filter_pages(self):
+        expected = sorted(case.pk for case in self.cases)
+        query = {'category__product': self.product.pk}
+
+        pks = []
+        after_pk = None
+        for _ in range(4):
+            result = self.rpc_client.TestCase.filter(query, 4, after_pk, ['summary', 'plan'])
+            for case in result['data']:
+                self.assertEqual(['plan', 'summary'], sorted(case.keys()))
+                self.assertEqual([self.plan.pk], case['plan'])
+            pks.extend(TestCase.objects.get(summary=case['summary']).pk
+                       for case in result['data'])
+
+            after_pk = result['next']
+            if after_pk is None:
+                break
+
+        self.assertEqual(expected, pks)
+
+    def test_filter_with_invalid_limit(self):
+        with self.assertRaisesRegex(Fault, 'limit must be a positive integer'):
+            self.rpc_client.TestCase.filter({}, 0)
+
+    def test_filter_with_search(self):
+        self.cases[3].text = 'Check the logs of the ssh server after the nightly backup'
+        self.cases[3].save()
+        self.cases[7].summary = 'Restart the ssh server'
+        self.cases[7].save()
+
+        result = self.rpc_client.TestCase.filter(
+            {'category__product': self.product.pk}, None, None, ['summary'], 'ssh server')
+        self.assertEqual(['Restart the ssh server', self.cases[3].summary],
+                         list(case['summary'] for case in result))
+
+    def test_filter_pages_with_search(self):
+        self.cases[3].text = 'Check the logs of the ssh server after the nightly backup'
+        self.cases[3].save()
+        self.cases[7].summary = 'Restart the ssh server'
+        self.cases[7].save()
+
+        result = self.rpc_client.TestCase.filter({}, 1, None, ['summary'], 'ssh')
+        self.assertEqual(['Restart the ssh server'],
+                         list(case['summary'] for case in result['data']))
+        self.assertIsNone(result['next'])
+        self.assertEqual(1, result['next_start'])
+
+        result = self.rpc_client.TestCase.filter({}, 1, None, ['summary'], 'ssh',
+                                                 result['next_start'])
+        self.assertEqual([self.cases[3].summary], list(case['summary'] for case in result['data']))
+        self.assertEqual(2, result['next_start'])
+
+        result = self.rpc_client.TestCase.filter({}, 1, None, ['summary'], 'ssh',
+                                                 result['next_start'])
+        self.assertEqual([], result['data'])
+        self.assertIsNone(result['next_start'])
+
+    def test_filter_with_invalid_start(self):
+        with self.assertRaisesRegex(Fault, 'start must be a non-negative integer'):
+            self.rpc_client.TestCase.filter({}, 1, None, None, 'ssh', -1)
+
+    def test_filter_with_search_and_after_pk(self):
+        with self.assertRaisesRegex(Fault, 'after_pk can not be used together with search'):
+            self.rpc_client.TestCase.filter({}, 4, self.cases[0].pk, None, 'ssh')
+
 
 class TestUpdate(APITestCase):
     non_existing_username = 'FakeUsername'
@@ -576,3 +576,82 @@ class TestExecutionUpdate(APITestCase):
         with self.assertRaisesRegex(ProtocolError, '403 Forbidden'):
             self.rpc_client.TestExecution.update(self.case_run_1.pk,
                                                  {"close_date": timezone.now()})
+
+
+@override_settings(LANGUAGE_CODE='en')
+class TestExecutionBulkUpdate(APITestCase):
+
+    def _fixture_setup(self):
+        super()._fixture_setup()
+
+        self.user = UserFactory()
+        self.build = BuildFactory()
+        self.execution_1 = TestExecutionFactory()
+        self.execution_2 = TestExecutionFactory()
+        self.status_positive = TestExecutionStatus.objects.filter(weight__gt=0).last()
+
+    def test_bulk_update(self):
+        result = self.rpc_client.TestExecution.bulk_update(
+            [self.execution_1.pk, self.execution_2.pk], {
+                "build": self.build.pk,
+                "assignee": self.user.pk,
+                "status": self.status_positive.pk,
+                "sortkey": 90
+            })
+
+        self.assertEqual(result, [
+            {'id': self.execution_1.pk, 'updated': True},
+            {'id': self.execution_2.pk, 'updated': True},
+        ])
+
+        for execution in (self.execution_1, self.execution_2):
+            execution.refresh_from_db()
+            self.assertEqual(execution.build, self.build)
+            self.assertEqual(execution.assignee, self.user)
+            self.assertEqual(execution.status, self.status_positive)
+            self.assertEqual(execution.tested_by, self.api_user)
+            self.assertEqual(execution.sortkey, 90)
+            self.assertEqual(
+                dict(execution.run.status_counts.filter(
+                    count__gt=0).values_list('status', 'count')),
+                {self.status_positive.pk: 1})
+
+            history = execution.history.latest()
+            self.assertEqual(history.history_user, self.api_user)
+            self.assertIn('+%d' % self.user.pk, history.history_change_reason)
+
+    def test_bulk_update_reports_non_existing_ids(self):
+        result = self.rpc_client.TestExecution.bulk_update(
+            [self.execution_1.pk, 1111111], {"sortkey": 10})
+
+        self.assertEqual(result, [
+            {'id': self.execution_1.pk, 'updated': True},
+            {'id': 1111111, 'updated': False},
+        ])
+        self.execution_1.refresh_from_db()
+        self.assertEqual(self.execution_1.sortkey, 10)
+
+    def test_bulk_update_when_case_text_version_is_string_latest(self):
+        initial_case_text_version = self.execution_1.case_text_version
+        self.execution_1.case.text = "Text Updated"
+        self.execution_1.case.save()
+
+        self.rpc_client.TestExecution.bulk_update(
+            [self.execution_1.pk, self.execution_2.pk], {"case_text_version": 'latest'})
+
+        for execution in (self.execution_1, self.execution_2):
+            execution.refresh_from_db()
+            self.assertEqual(execution.case.history.latest().history_id,
+                             execution.case_text_version)
+
+        self.assertNotEqual(initial_case_text_version, self.execution_1.case_text_version)
+
+    def test_bulk_update_validates_values(self):
+        with self.assertRaisesRegex(XmlRPCFault, 'Select a valid choice'):
+            self.rpc_client.TestExecution.bulk_update([self.execution_1.pk, self.execution_2.pk],
+                                                      {"status": 1111111})
+
+    def test_bulk_update_with_no_perm(self):
+        self.rpc_client.Auth.logout()
+        with self.assertRaisesRegex(ProtocolError, '403 Forbidden'):
+            self.rpc_client.TestExecution.bulk_update([self.execution_1.pk], {"sortkey": 10})
@@ -44,6 +44,22 @@ class TestFilter(APITestCase):
         self.assertEqual(plans_total, len(self.rpc_client.TestPlan.filter()))
         self.assertEqual(plans_total, len(self.rpc_client.TestPlan.filter({})))
 
+    def test_search_plans(self):
+        self.plan_2.text = 'Verify the installer on all platforms'
+        self.plan_2.save()
+
+        result = self.rpc_client.TestPlan.search({'product': self.product.pk}, ['-id'])
+        self.assertEqual(2, result['total'])
+        self.assertEqual([self.plan_2.pk, self.plan_1.pk],
+                         list(plan['id'] for plan in result['data']))
+        self.assertEqual('manual smoking', result['data'][0]['type'])
+        self.assertEqual(self.tester.username, result['data'][0]['author'])
+
+        result = self.rpc_client.TestPlan.search({'product': self.product.pk},
+                                                 None, 0, 10, 'installer')
+        self.assertEqual(1, result['total'])
+        self.assertEqual(self.plan_2.pk, result['data'][0]['id'])
+
 
 class TestAddTag(APITestCase):
 
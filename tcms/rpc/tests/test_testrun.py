@@ -1,15 +1,19 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=attribute-defined-outside-init, objects-update-used
 from datetime import datetime
+from xmlrpc.client import Fault as XmlRPCFault
 from xmlrpc.client import ProtocolError
 
 from django.contrib.auth.models import Permission
 from django.utils.translation import gettext_lazy as _
+from mock import patch
 
 from tcms_api import xmlrpc
 
+from tcms.core.contrib.linkreference.models import LinkReference
+from tcms.core.helpers.comments import get_comments
 from tcms.rpc.tests.utils import APITestCase
-from tcms.testruns.models import TestExecution, TestRun
+from tcms.testruns.models import TestExecution, TestExecutionStatus, TestRun
 from tcms.tests import remove_perm_from_user
 from tcms.tests.factories import (BuildFactory, ProductFactory, TagFactory,
                                   TestCaseFactory, TestExecutionFactory,
@@ -106,6 +110,54 @@ class TestRemovesCase(APITestCase):
         self.assertFalse(TestExecution.objects.filter(pk=self.test_execution.pk).exists())
 
 
+class TestSearch(APITestCase):
+    def _fixture_setup(self):
+        super()._fixture_setup()
+
+        self.product = ProductFactory()
+        self.version = VersionFactory(product=self.product)
+        self.plan = TestPlanFactory(name='Release plan', product=self.product,
+                                    product_version=self.version)
+        self.build = BuildFactory(name='nightly', product=self.product)
+        self.tags = [TagFactory(name='smoke'), TagFactory(name='regression')]
+        self.runs = []
+        for summary in ['Beta', 'Alpha', 'Gamma']:
+            self.runs.append(TestRunFactory(summary=summary, plan=self.plan, build=self.build,
+                                            product_version=self.version, tag=self.tags))
+
+    def test_search_returns_page_with_total(self):
+        result = self.rpc_client.TestRun.search({'plan__product': self.product.pk},
+                                                ['-summary'], 1, 1)
+
+        self.assertEqual(3, result['total'])
+        self.assertEqual(1, len(result['data']))
+        run = result['data'][0]
+        self.assertEqual(self.runs[0].pk, run['id'])
+        self.assertEqual('Beta', run['summary'])
+        self.assertEqual('Release plan', run['plan'])
+        self.assertEqual(self.product.name, run['product'])
+        self.assertEqual(self.version.value, run['product_version'])
+        self.assertEqual('nightly', run['build'])
+        self.assertEqual(self.runs[0].manager.username, run['manager'])
+        self.assertEqual(['smoke', 'regression'], run['tag'])
+
+    def test_search_does_not_count_duplicate_rows(self):
+        query = {'tag__name__in': ['smoke', 'regression']}
+        result = self.rpc_client.TestRun.search(query, None, 0, 2)
+
+        self.assertEqual(3, result['total'])
+        self.assertEqual([self.runs[0].pk, self.runs[1].pk],
+                         list(run['id'] for run in result['data']))
+
+        result = self.rpc_client.TestRun.search(query, None, 10, 2)
+        self.assertEqual(3, result['total'])
+        self.assertEqual([], result['data'])
+
+    def test_search_with_unknown_order_by(self):
+        with self.assertRaisesRegex(XmlRPCFault, 'Unknown field: notes'):
+            self.rpc_client.TestRun.search({}, ['-notes'])
+
+
 class TestAddTag(APITestCase):
     def _fixture_setup(self):
         super(TestAddTag, self)._fixture_setup()
@@ -312,3 +364,192 @@ class TestUpdateTestRun(APITestCase):
         self.assertNotEqual(update_fields['summary'], test_run.summary)
         self.assertNotEqual(datetime.strptime(update_fields['stop_date'], '%d-%m-%Y'),
                             test_run.stop_date)
+
+
+class TestIngestResults(APITestCase):
+    def _fixture_setup(self):
+        super()._fixture_setup()
+
+        self.plan = TestPlanFactory(author=self.api_user)
+        self.test_run = TestRunFactory(plan=self.plan)
+        self.tester = UserFactory()
+        self.status_passed = TestExecutionStatus.objects.get(name='PASSED')
+        self.status_failed = TestExecutionStatus.objects.get(name='FAILED')
+
+        self.cases = []
+        for _i in range(3):
+            case = TestCaseFactory()
+            case.save()  # generate history object
+            self.plan.add_case(case)
+            self.cases.append(case)
+
+        self.execution = TestExecutionFactory(run=self.test_run, case=self.cases[0])
+
+    def test_ingest_results(self):
+        build = BuildFactory()
+        result = self.rpc_client.TestRun.ingest_results(self.test_run.pk, [
+            {
+                'case': self.cases[0].pk,
+                'status': self.status_failed.pk,
+                'comment': 'Failed with a traceback',
+                'links': [
+                    'https://example.com/log.txt',
+                    {'url': 'https://example.com/bug/1', 'is_defect': True},
+                ],
+            },
+            {
+                'case': self.cases[1].pk,
+                'status': 'passed',
+                'build': build.pk,
+                'tested_by': self.tester.username,
+            },
+            {
+                'case': self.cases[2].pk,
+                'status': self.status_passed.pk,
+                'tested_by': self.tester.pk,
+            },
+        ])
+
+        self.assertEqual(3, len(result))
+        self.assertEqual(3, TestExecution.objects.filter(run=self.test_run).count())
+
+        # existing execution is updated
+        self.assertEqual(result[0], {
+            'case': self.cases[0].pk,
+            'execution_id': self.execution.pk,
+            'created': False,
+        })
+        self.execution.refresh_from_db()
+        self.assertEqual(self.execution.status, self.status_failed)
+        self.assertEqual(self.execution.tested_by, self.api_user)
+        self.assertEqual(self.execution.build, self.test_run.build)
+        history = self.execution.history.latest()
+        self.assertEqual(history.history_user, self.api_user)
+        self.assertIn('+%d' % self.status_failed.pk, history.history_change_reason)
+
+        self.assertEqual(['Failed with a traceback'],
+                         list(get_comments(self.execution).values_list('comment', flat=True)))
+        self.assertEqual(2, LinkReference.objects.filter(execution=self.execution).count())
+        self.assertTrue(LinkReference.objects.get(url='https://example.com/bug/1').is_defect)
+
+        # new executions are created, together with history
+        for item, case in zip(result[1:], self.cases[1:]):
+            self.assertTrue(item['created'])
+            execution = TestExecution.objects.get(pk=item['execution_id'])
+            self.assertEqual(execution.case, case)
+            self.assertEqual(execution.status, self.status_passed)
+            self.assertEqual(execution.tested_by, self.tester)
+            self.assertEqual(execution.case_text_version, case.history.latest().history_id)
+            self.assertEqual(execution.history.latest().history_user, self.api_user)
+
+        self.assertEqual(TestExecution.objects.get(pk=result[1]['execution_id']).build, build)
+
+        self.assertEqual(
+            dict(self.test_run.status_counts.filter(
+                count__gt=0).values_list('status', 'count')),
+            {self.status_failed.pk: 1, self.status_passed.pk: 2})
+
+    def test_ingest_results_reports_errors_per_item(self):
+        result = self.rpc_client.TestRun.ingest_results(self.test_run.pk, [
+            {'case': 9999999, 'status': self.status_passed.pk},
+            {'case': self.cases[1].pk, 'status': 'NO-SUCH-STATUS'},
+            {'case': self.cases[1].pk, 'status': 'PASSED', 'build': 9999999},
+            {'case': self.cases[1].pk, 'status': 'PASSED', 'tested_by': 'no-such-user'},
+            {'case': self.cases[2].pk, 'status': 'PASSED'},
+        ])
+
+        self.assertEqual(5, len(result))
+        for item in result[:4]:
+            self.assertIn('error', item)
+            self.assertNotIn('execution_id', item)
+        self.assertIn('TestExecutionStatus', result[1]['error'])
+
+        self.assertTrue(result[4]['created'])
+        self.assertFalse(TestExecution.objects.filter(case=self.cases[1]).exists())
+        self.assertTrue(TestExecution.objects.filter(case=self.cases[2]).exists())
+
+    def test_ingest_results_with_invalid_pks(self):
+        result = self.rpc_client.TestRun.ingest_results(self.test_run.pk, [
+            {'case': 'abc', 'status': 'PASSED'},
+            {'case': [self.cases[1].pk], 'status': 'PASSED'},
+            {'case': self.cases[1].pk, 'status': 'PASSED', 'build': 'x'},
+            {'case': str(self.cases[2].pk), 'status': 'PASSED'},
+        ])
+
+        self.assertEqual(4, len(result))
+        self.assertEqual({'case': 'abc', 'error': "Invalid case: 'abc'"}, result[0])
+        self.assertEqual([self.cases[1].pk], result[1]['case'])
+        self.assertIn('error', result[1])
+        self.assertEqual("Invalid build: 'x'", result[2]['error'])
+
+        self.assertTrue(result[3]['created'])
+        self.assertFalse(TestExecution.objects.filter(case=self.cases[1]).exists())
+        self.assertTrue(TestExecution.objects.filter(case=self.cases[2]).exists())
+
+    def test_ingest_junit_xml(self):
+        self.cases[0].summary = 'tests.test_module.TestClass.test_one'
+        self.cases[0].save()
+        self.cases[1].summary = 'tests.test_module.TestClass.test_two'
+        self.cases[1].save()
+
+        result = self.rpc_client.TestRun.ingest_junit_xml(self.test_run.pk, """<?xml version="1.0"?>
+<testsuites>
+    <testsuite name="tests">
+        <testcase classname="tests.test_module.TestClass" name="test_one"/>
+        <testcase classname="tests.test_module.TestClass" name="test_two">
+            <failure message="AssertionError: 1 != 2">Traceback</failure>
+        </testcase>
+        <testcase classname="tests.test_module.TestClass" name="test_unknown"/>
+    </testsuite>
+</testsuites>""")
+
+        self.assertEqual(3, len(result))
+        self.assertEqual(result[0]['execution_id'], self.execution.pk)
+        self.execution.refresh_from_db()
+        self.assertEqual(self.execution.status, self.status_passed)
+
+        execution = TestExecution.objects.get(pk=result[1]['execution_id'])
+        self.assertEqual(execution.status, self.status_failed)
+        self.assertEqual(['AssertionError: 1 != 2'],
+                         list(get_comments(execution).values_list('comment', flat=True)))
+
+        self.assertEqual(result[2]['summary'], 'tests.test_module.TestClass.test_unknown')
+        self.assertIn('error', result[2])
+
+    def test_ingest_junit_xml_is_atomic(self):
+        self.cases[1].summary = 'tests.test_module.TestClass.test_two'
+        self.cases[1].save()
+
+        # the first batch is recorded before the parse error is reached
+        with patch('tcms.rpc.api.testrun.JUNIT_BATCH_SIZE', 1):
+            with self.assertRaisesRegex(XmlRPCFault, 'Invalid JUnit XML'):
+                self.rpc_client.TestRun.ingest_junit_xml(self.test_run.pk, """<?xml version="1.0"?>
+<testsuite name="tests">
+    <testcase classname="tests.test_module.TestClass" name="test_two"/>
+    <testcase classname="tests.test_module.TestClass" name="test_three"/>
+    <testcase""")
+
+        self.assertFalse(TestExecution.objects.filter(case=self.cases[1]).exists())
+
+    def test_ingest_junit_xml_with_invalid_xml(self):
+        with self.assertRaisesRegex(XmlRPCFault, 'Invalid JUnit XML'):
+            self.rpc_client.TestRun.ingest_junit_xml(self.test_run.pk, '<testsuite>')
+
+    def test_ingest_results_without_permissions(self):
+        unauthorized_user = UserFactory()
+        unauthorized_user.set_password('api-testing')
+        unauthorized_user.save()
+
+        unauthorized_user.user_permissions.add(*Permission.objects.all())
+        remove_perm_from_user(unauthorized_user, 'testruns.change_testexecution')
+
+        rpc_client = xmlrpc.TCMSXmlrpc(unauthorized_user.username,
+                                       'api-testing',
+                                       '%s/xml-rpc/' % self.live_server_url).server
+
+        with self.assertRaisesRegex(ProtocolError, '403 Forbidden'):
+            rpc_client.TestRun.ingest_results(self.test_run.pk, [
+                {'case': self.cases[1].pk, 'status': 'PASSED'},
+            ])
+
+        self.assertFalse(TestExecution.objects.filter(case=self.cases[1]).exists())
@@ -2,9 +2,15 @@
 # pylint: disable=invalid-name
 
 from django import test
+from django.db import connection
 from django.db.models import ObjectDoesNotExist
+from mock import patch
 
 import tcms.rpc.utils as U
+from tcms.issuetracker.types import GitHub
+from tcms.rpc.api.utils import (parse_junit_xml, reset_tracker_index,
+                                tracker_from_url)
+from tcms.testcases.models import BugSystem
 from tcms.tests.factories import ProductFactory
 
 
@@ -42,3 +48,89 @@ class TestPreCheckProduct(test.TestCase):
     def test_pre_check_product_with_no_exist(self):
         self.assertRaises(ObjectDoesNotExist, U.pre_check_product, {"product": 9999})
         self.assertRaises(ObjectDoesNotExist, U.pre_check_product, {"product": "unknown name"})
+
+
+class TestTrackerFromUrl(test.TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.github = BugSystem.objects.create(
+            name='GitHub',
+            tracker_type='tcms.issuetracker.types.GitHub',
+            base_url='https://github.com/',
+        )
+        cls.kiwi_repo = BugSystem.objects.create(
+            name='GitHub for Kiwi TCMS',
+            tracker_type='tcms.issuetracker.types.GitHub',
+            base_url='https://github.com/kiwitcms/Kiwi',
+        )
+
+    def setUp(self):
+        super().setUp()
+        reset_tracker_index()
+        self.addCleanup(reset_tracker_index)
+
+    def test_most_specific_base_url_wins(self):
+        tracker = tracker_from_url('https://github.com/kiwitcms/Kiwi/issues/1', None)
+        self.assertIsInstance(tracker, GitHub)
+        self.assertEqual(self.kiwi_repo, tracker.bug_system)
+
+        tracker = tracker_from_url('https://github.com/kiwitcms/tcms-api/issues/1', None)
+        self.assertEqual(self.github, tracker.bug_system)
+
+    def test_unknown_url(self):
+        self.assertIsNone(tracker_from_url('https://gitlab.com/kiwitcms/Kiwi/issues/1', None))
+        self.assertIsNone(tracker_from_url('http://github.com/kiwitcms/Kiwi/issues/1', None))
+
+    def test_bug_systems_are_not_queried_for_every_url(self):
+        tracker_from_url('https://github.com/kiwitcms/Kiwi/issues/1', None)
+
+        with self.assertNumQueries(0):
+            for number in range(10):
+                tracker_from_url('https://github.com/kiwitcms/Kiwi/issues/%d' % number, None)
+
+    def test_index_is_kept_per_schema(self):
+        tracker_from_url('https://github.com/kiwitcms/Kiwi/issues/1', None)
+
+        # e.g. another tenant when kiwitcms-tenants is installed
+        with patch.object(connection, 'schema_name', 'tenant', create=True):
+            with self.assertNumQueries(1):
+                tracker_from_url('https://github.com/kiwitcms/Kiwi/issues/1', None)
+
+    def test_index_is_reset_when_bug_system_is_saved(self):
+        self.assertIsNone(tracker_from_url('https://bugzilla.example.com/show_bug.cgi?id=1',
+                                           None))
+
+        bugzilla = BugSystem.objects.create(
+            name='Bugzilla at example.com',
+            tracker_type='tcms.issuetracker.types.Bugzilla',
+            base_url='https://bugzilla.example.com/',
+        )
+
+        tracker = tracker_from_url('https://bugzilla.example.com/show_bug.cgi?id=1', None)
+        self.assertEqual(bugzilla, tracker.bug_system)
+
+
+class TestParseJUnitXML(test.SimpleTestCase):
+    def test_nested_test_suites(self):
+        results = list(parse_junit_xml("""<?xml version="1.0"?>
+<testsuites>
+    <testsuite name="outer">
+        <testcase classname="outer.Test" name="test_one"/>
+        <testsuite name="inner">
+            <testcase classname="inner.Test" name="test_two">
+                <skipped message="Not supported"/>
+            </testcase>
+        </testsuite>
+        <testcase name="test_three"><error>Traceback</error></testcase>
+    </testsuite>
+</testsuites>"""))
+
+        self.assertEqual([
+            {'summary': 'outer.Test.test_one', 'status': 'PASSED', 'comment': None},
+            {'summary': 'inner.Test.test_two', 'status': 'WAIVED', 'comment': 'Not supported'},
+            {'summary': 'test_three', 'status': 'ERROR', 'comment': 'Traceback'},
+        ], results)
+
+    def test_invalid_xml(self):
+        with self.assertRaisesRegex(ValueError, 'Invalid JUnit XML'):
+            list(parse_junit_xml('<testsuite><testcase name="test_one"/>'))
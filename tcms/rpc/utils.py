@@ -5,13 +5,17 @@ import time
 
 from attachments import views as attachment_views
 from attachments.models import Attachment
-from django.db.models import FieldDoesNotExist
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, FieldDoesNotExist, Window
 from django.http import HttpRequest
 from django.middleware.csrf import get_token
+from django.utils.translation import gettext_lazy as _
 from mock import MagicMock
 
 from tcms.core.utils import request_host_link
 from tcms.management.models import Product
+from tcms.search import fulltext
 
 QUERY_DISTINCT = 1
 
@@ -114,8 +118,171 @@ def distinct_m2m_rows(cls, values, op_type):
     raise TypeError('Not implement op type %s' % op_type)
 
 
-def distinct_filter(cls, values):
-    return distinct_m2m_rows(cls, values, op_type=QUERY_DISTINCT)
+def distinct_filter(cls, values, after_pk=None):
+    """
+        Filter objects of ``cls``, optionally only the ones with
+        PK greater than ``after_pk``, without duplicate rows.
+    """
+    query_set = distinct_m2m_rows(cls, values, op_type=QUERY_DISTINCT)
+    if after_pk is not None:
+        query_set = query_set.filter(pk__gt=after_pk)
+    return query_set
+
+
+def search_filter(cls, values, after_pk=None, search=None):
+    """
+        Same as :func:`distinct_filter`, ordered by PK. When ``search`` is
+        specified only objects matching these words are returned, ordered
+        by relevance, see :func:`tcms.search.fulltext.search`. Use
+        ``start`` instead of ``after_pk`` to page through them, see
+        :func:`search_filter_page`.
+
+        :return: Matching objects
+        :rtype: :class:`django.db.models.query.QuerySet`
+        :raises ValueError: if both ``after_pk`` and ``search`` are specified
+    """
+    query_set = distinct_filter(cls, values, after_pk).order_by('pk')
+    if not search or not search.strip():
+        return query_set
+
+    if after_pk is not None:
+        raise ValueError(_('after_pk can not be used together with search'))
+
+    return fulltext.search(query_set, search)
+
+
+def check_start(start):
+    """
+        :raises ValueError: if ``start`` is not a valid index of the first object
+    """
+    if not isinstance(start, int) or start < 0:
+        raise ValueError(_('start must be a non-negative integer'))
+
+
+def search_filter_page(result, search, start, limit):
+    """
+        Update the page returned for ``limit`` objects, starting at
+        ``start``, by filter methods. Search results are ordered by
+        relevance, not by PK, so ``next`` is ``None`` and ``next_start``
+        is the index of the first object on the next page instead.
+
+        :param result: ``{'data': [...], 'next': pk}``
+        :type result: dict
+        :param search: Words which the objects have been searched for
+        :type search: str
+        :param start: Index of the first object on the page
+        :type start: int
+        :param limit: Maximum number of objects on the page
+        :type limit: int
+        :return: ``result``
+        :rtype: dict
+    """
+    if search and search.strip():
+        result['next'] = None
+        result['next_start'] = start + limit if len(result['data']) == limit else None
+    return result
+
+
+def unique_filter(cls, values):
+    """
+        Same as :func:`distinct_filter` but without ``DISTINCT`` in the
+        outer query, which is evaluated after window functions.
+    """
+    query_set = distinct_m2m_rows(cls, values, op_type=QUERY_DISTINCT)
+    if query_set.query.distinct:
+        query_set = cls.objects.filter(pk__in=query_set.values('pk'))
+    return query_set
+
+
+def related_names(model, field_name, object_pks, name_field='name'):
+    """
+        Query the names of objects related via a ManyToManyField,
+        e.g. tags, for many objects at once.
+
+        :return: Mapping between object PKs and lists of names
+        :rtype: dict
+    """
+    field = model._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+
+    result = {}
+    for object_pk, name in through.objects.filter(
+            **{'%s__in' % source: object_pks}
+    ).values_list(
+        through._meta.get_field(source).attname,
+        '%s__%s' % (target, name_field),
+    ).order_by('pk'):
+        result.setdefault(object_pk, []).append(name)
+    return result
+
+
+def search_page(query_set, fields, order_by=None, start=0, length=None):
+    """
+        Return a single page of ``query_set`` together with the number of
+        all objects in it. The total is calculated by the same query, using
+        a window function, when the database supports them.
+
+        :param query_set: Objects to return, without duplicates,
+                          see :func:`unique_filter`
+        :type query_set: :class:`django.db.models.query.QuerySet`
+        :param fields: Mapping between returned keys and field lookups
+        :type fields: dict
+        :param order_by: Keys from ``fields`` to order by, prefixed with ``-``
+                         for descending order. The current order of
+                         ``query_set`` is used if not specified
+        :type order_by: list(str)
+        :param start: Index of the first object
+        :type start: int
+        :param length: Maximum number of objects, ``DEFAULT_PAGE_SIZE`` if not specified
+        :type length: int
+        :return: ``{'total': int, 'data': [...]}``
+        :rtype: dict
+        :raises ValueError: if any of the parameters is not valid
+    """
+    if length is None:
+        length = settings.DEFAULT_PAGE_SIZE
+
+    check_start(start)
+
+    if not isinstance(length, int) or length < 1:
+        raise ValueError(_('length must be a positive integer'))
+
+    ordering = []
+    for name in order_by or []:
+        descending = name.startswith('-')
+        key = name[1:] if descending else name
+        if key not in fields:
+            raise ValueError(_('Unknown field: %s') % key)
+        ordering.append(('-' if descending else '') + fields[key])
+    if ordering:
+        query_set = query_set.order_by(*ordering, 'pk')
+
+    lookups = list(fields.values())
+    page = query_set
+    if connection.features.supports_over_clause:
+        page = query_set.annotate(search_total=Window(expression=Count('pk')))
+        lookups.append('search_total')
+
+    rows = list(page.values(*lookups)[start:start + length])
+
+    if rows and connection.features.supports_over_clause:
+        total = rows[0]['search_total']
+    elif not rows and start == 0:
+        total = 0
+    else:
+        # the page is empty or window functions aren't supported
+        total = query_set.count()
+
+    data = []
+    for row in rows:
+        data.append(dict((key, row[lookup]) for key, lookup in fields.items()))
+
+    return {
+        'total': total,
+        'data': data,
+    }
 
 
 def get_attachments_for(request, obj):
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+    Full-text search for TestCase, TestPlan and Bug objects.
+
+    The searchable text of every object is stored in
+    :class:`tcms.search.models.SearchDocument`, which is kept up to date
+    by signal handlers, and indexed by the database itself:
+
+    - PostgreSQL: GIN index on ``to_tsvector()``
+    - MySQL/MariaDB: ``FULLTEXT`` index
+    - SQLite: FTS5 virtual table
+
+    Other databases fall back to ``LIKE`` queries without ranking.
+    Set ``FULLTEXT_SEARCH_BACKEND`` to the import path of a
+    :class:`SearchBackend` subclass to plug in a different implementation!
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from tcms.core.helpers.comments import get_comments
+from tcms.search.models import SearchDocument
+
+# fields which are indexed for each model
+INDEXED_FIELDS = {
+    'testcases.testcase': ('summary', 'text'),
+    'testplans.testplan': ('name', 'text'),
+    'bugs.bug': ('summary', ),
+}
+
+# comments are indexed as well, e.g. the description of a bug is its first comment
+INDEXED_COMMENTS = ('bugs.bug', )
+
+DOCUMENT_TABLE = SearchDocument._meta.db_table
+FTS5_TABLE = DOCUMENT_TABLE + '_fts'
+
+
+def is_indexed(model):
+    return model._meta.label_lower in INDEXED_FIELDS
+
+
+def searchable_text(instance):
+    """
+        Returns the text which is indexed for *instance*.
+    """
+    label = instance._meta.label_lower
+    values = list(str(getattr(instance, name) or '') for name in INDEXED_FIELDS[label])
+
+    if label in INDEXED_COMMENTS:
+        values.extend(get_comments(instance).order_by('pk').values_list('comment', flat=True))
+
+    return '\n'.join(values)
+
+
+def update_document(instance):
+    SearchDocument.objects.update_or_create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        defaults={'text': searchable_text(instance)},
+    )
+
+
+def update_documents(instances, batch_size=500):
+    """
+        Same as :func:`update_document` for many objects of the same model
+        at once, e.g. after a bulk operation which doesn't send signals.
+    """
+    instances = list(instances)
+    if not instances:
+        return
+
+    content_type = ContentType.objects.get_for_model(instances[0])
+    with transaction.atomic():
+        SearchDocument.objects.filter(
+            content_type=content_type,
+            object_id__in=list(instance.pk for instance in instances),
+        ).delete()
+        SearchDocument.objects.bulk_create(  # pylint: disable=bulk-create-used
+            (SearchDocument(content_type=content_type,
+                            object_id=instance.pk,
+                            text=searchable_text(instance)) for instance in instances),
+            batch_size=batch_size)
+
+
+def remove_document(instance):
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+    ).delete()
+
+
+def rebuild_index(model, batch_size=500):
+    """
+        Index all objects of *model* from scratch.
+
+        :return: Number of indexed objects
+        :rtype: int
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    count = 0
+    with transaction.atomic():
+        SearchDocument.objects.filter(content_type=content_type).delete()
+
+        rows = model.objects.order_by('pk').iterator(batch_size)
+        chunk = list(islice(rows, batch_size))
+        while chunk:
+            SearchDocument.objects.bulk_create(  # pylint: disable=bulk-create-used
+                SearchDocument(content_type=content_type,
+                               object_id=instance.pk,
+                               text=searchable_text(instance)) for instance in chunk)
+            count += len(chunk)
+            chunk = list(islice(rows, batch_size))
+
+    return count
+
+
+class SearchBackend:
+    """
+        Base class for full-text search implementations. Subclasses return
+        SQL which uses the full-text capabilities of the database.
+    """
+    def matching_sql(self, content_type_id, terms):
+        """
+            :return: SQL, and its parameters, which selects the ``object_id``
+                     of documents matching *terms*
+            :rtype: tuple
+        """
+        raise NotImplementedError()
+
+    def rank_sql(self, content_type_id, terms, object_id_column):
+        """
+            :return: SQL, and its parameters, which selects the relevance
+                     of the document for the object in *object_id_column*.
+                     Higher values mean more relevant documents!
+            :rtype: tuple
+        """
+        raise NotImplementedError()
+
+    def search(self, queryset, terms):
+        model = queryset.model
+        object_id_column = '%s.%s' % (connection.ops.quote_name(model._meta.db_table),
+                                      connection.ops.quote_name(model._meta.pk.column))
+        content_type_id = ContentType.objects.get_for_model(model).pk
+
+        sql, params = self.matching_sql(content_type_id, terms)
+        queryset = queryset.filter(pk__in=RawSQL(sql, params))
+
+        sql, params = self.rank_sql(content_type_id, terms, object_id_column)
+        return queryset.annotate(search_rank=RawSQL(sql, params))
+
+
+class LikeSearchBackend(SearchBackend):
+    """
+        Matches documents containing all of the words and doesn't rank them.
+    """
+    def matching_sql(self, content_type_id, terms):
+        condition = Q(content_type_id=content_type_id)
+        for word in terms.split():
+            condition &= Q(text__icontains=word)
+
+        return SearchDocument.objects.filter(condition).values(
+            'object_id'
+        ).query.sql_with_params()
+
+    def rank_sql(self, content_type_id, terms, object_id_column):
+        return 'SELECT 0', []
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    # must match the index created by search.0001_initial
+    config = 'simple'
+
+    def matching_sql(self, content_type_id, terms):
+        return ("SELECT object_id FROM {table} WHERE content_type_id = %s AND "
+                "to_tsvector('{config}', text) @@ plainto_tsquery('{config}', %s)".format(
+                    table=DOCUMENT_TABLE, config=self.config), [content_type_id, terms])
+
+    def rank_sql(self, content_type_id, terms, object_id_column):
+        return ("SELECT ts_rank(to_tsvector('{config}', text), "
+                "plainto_tsquery('{config}', %s)) FROM {table} "
+                "WHERE content_type_id = %s AND object_id = {column}".format(
+                    table=DOCUMENT_TABLE, config=self.config, column=object_id_column),
+                [terms, content_type_id])
+
+
+class MySQLSearchBackend(SearchBackend):
+    def matching_sql(self, content_type_id, terms):
+        return ("SELECT object_id FROM {table} WHERE content_type_id = %s AND "
+                "MATCH (text) AGAINST (%s IN NATURAL LANGUAGE MODE)".format(
+                    table=DOCUMENT_TABLE), [content_type_id, terms])
+
+    def rank_sql(self, content_type_id, terms, object_id_column):
+        return ("SELECT MATCH (text) AGAINST (%s IN NATURAL LANGUAGE MODE) FROM {table} "
+                "WHERE content_type_id = %s AND object_id = {column}".format(
+                    table=DOCUMENT_TABLE, column=object_id_column),
+                [terms, content_type_id])
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+        Uses an FTS5 table with external content, kept in sync with
+        :class:`tcms.search.models.SearchDocument` by triggers.
+    """
+    @staticmethod
+    def fts5_query(terms):
+        """
+            Quote every word so that FTS5 operators and punctuation
+            entered by the user are not interpreted.
+        """
+        return ' '.join('"%s"' % word.replace('"', '""') for word in terms.split())
+
+    def matching_sql(self, content_type_id, terms):
+        return ("SELECT d.object_id FROM {fts} JOIN {table} d ON d.id = {fts}.rowid "
+                "WHERE {fts} MATCH %s AND d.content_type_id = %s".format(
+                    table=DOCUMENT_TABLE, fts=FTS5_TABLE),
+                [self.fts5_query(terms), content_type_id])
+
+    def rank_sql(self, content_type_id, terms, object_id_column):
+        # bm25() returns lower values for more relevant documents
+        return ("SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = "
+                "(SELECT id FROM {table} WHERE content_type_id = %s AND object_id = {column})"
+                .format(table=DOCUMENT_TABLE, fts=FTS5_TABLE, column=object_id_column),
+                [self.fts5_query(terms), content_type_id])
+
+
+BACKENDS = {
+    'postgresql': PostgreSQLSearchBackend,
+    'mysql': MySQLSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_backend():
+    if settings.FULLTEXT_SEARCH_BACKEND:
+        return import_string(settings.FULLTEXT_SEARCH_BACKEND)()
+
+    return BACKENDS.get(connection.vendor, LikeSearchBackend)()
+
+
+def search_condition(model, terms):
+    """
+        Returns a ``Q`` object which matches objects of *model* containing
+        *terms*, e.g. to combine full-text search with other conditions.
+        The results are not ordered by relevance!
+    """
+    sql, params = get_backend().matching_sql(ContentType.objects.get_for_model(model).pk,
+                                             terms.strip())
+    return Q(pk__in=RawSQL(sql, params))
+
+
+def search(queryset, terms):
+    """
+        Limit *queryset* to objects matching *terms* and order
+        them by relevance, which is available as ``search_rank``.
+        Blank *terms* don't limit the results!
+    """
+    if not terms or not terms.strip():
+        return queryset
+
+    return get_backend().search(queryset, terms.strip()).order_by('-search_rank', 'pk')
@@ -0,0 +1,108 @@
+# Generated by Django 3.0.9 on 2026-10-17 09:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+FORWARD_SQL = {
+    'postgresql': [
+        "CREATE INDEX search_searchdocument_fts ON search_searchdocument "
+        "USING GIN (to_tsvector('simple', text))",
+    ],
+    'mysql': [
+        "ALTER TABLE search_searchdocument ADD FULLTEXT INDEX search_searchdocument_fts (text)",
+    ],
+    # external content FTS5 table, kept in sync by triggers
+    'sqlite': [
+        "CREATE VIRTUAL TABLE search_searchdocument_fts USING fts5("
+        "text, content='search_searchdocument', content_rowid='id')",
+        "CREATE TRIGGER search_searchdocument_ai AFTER INSERT ON search_searchdocument BEGIN "
+        "INSERT INTO search_searchdocument_fts(rowid, text) VALUES (new.id, new.text); END",
+        "CREATE TRIGGER search_searchdocument_ad AFTER DELETE ON search_searchdocument BEGIN "
+        "INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, text) "
+        "VALUES ('delete', old.id, old.text); END",
+        "CREATE TRIGGER search_searchdocument_au AFTER UPDATE ON search_searchdocument BEGIN "
+        "INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, text) "
+        "VALUES ('delete', old.id, old.text); "
+        "INSERT INTO search_searchdocument_fts(rowid, text) VALUES (new.id, new.text); END",
+    ],
+}
+
+REVERSE_SQL = {
+    'postgresql': [
+        "DROP INDEX search_searchdocument_fts",
+    ],
+    'mysql': [
+        "ALTER TABLE search_searchdocument DROP INDEX search_searchdocument_fts",
+    ],
+    'sqlite': [
+        "DROP TRIGGER search_searchdocument_au",
+        "DROP TRIGGER search_searchdocument_ad",
+        "DROP TRIGGER search_searchdocument_ai",
+        "DROP TABLE search_searchdocument_fts",
+    ],
+}
+
+
+def create_fulltext_index(apps, schema_editor):
+    for sql in FORWARD_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    for sql in REVERSE_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def index_objects(apps, schema_editor):
+    content_type_model = apps.get_model('contenttypes', 'ContentType')
+    search_document_model = apps.get_model('search', 'SearchDocument')
+
+    # bugs are indexed by bugs.0003_searchdocument b/c that app is optional
+    for app_label, model_name, fields in [
+            ('testcases', 'TestCase', ('summary', 'text')),
+            ('testplans', 'TestPlan', ('name', 'text')),
+    ]:
+        model = apps.get_model(app_label, model_name)
+        if not model.objects.exists():
+            continue
+
+        content_type, _ = content_type_model.objects.get_or_create(
+            app_label=app_label, model=model_name.lower())
+
+        documents = []
+        for row in model.objects.values_list('pk', *fields).iterator():
+            values = list(str(value or '') for value in row[1:])
+            documents.append(search_document_model(
+                content_type=content_type, object_id=row[0], text='\n'.join(values)))
+
+        search_document_model.objects.bulk_create(documents, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('testcases', '0016_testcase_rendered_text'),
+        ('testplans', '0008_remove_autofield'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                                                   to='contenttypes.ContentType')),
+            ],
+            options={
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(index_objects, migrations.RunPython.noop),
+    ]
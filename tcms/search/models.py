@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+        Searchable text of an object, indexed by the database for full-text
+        search. Kept up to date by signal handlers, see
+        :mod:`tcms.search.fulltext`.
+    """
+    content_type = models.ForeignKey('contenttypes.ContentType', on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        unique_together = ('content_type', 'object_id')
+
+    def __str__(self):
+        return self.text[:50]
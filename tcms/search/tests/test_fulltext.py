@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from tcms.bugs.models import Bug
+from tcms.bugs.tests.factory import BugFactory
+from tcms.core.helpers.comments import add_comment
+from tcms.search.models import SearchDocument
+from tcms.search.fulltext import search, update_documents
+from tcms.testcases.models import TestCase as TestCaseModel
+from tcms.testplans.models import TestPlan
+from tcms.tests.factories import TestCaseFactory, TestPlanFactory, UserFactory
+
+
+class TestFullTextSearch(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.login_case = TestCaseFactory(summary='Login with a valid password',
+                                         text='Open the login page and sign in')
+        cls.logout_case = TestCaseFactory(summary='Logout',
+                                          text='After login press the logout button')
+        cls.other_case = TestCaseFactory(summary='Upload attachment',
+                                         text='Upload a file which is larger than 5MB')
+        # note: TestCaseFactory doesn't send post_save
+        update_documents([cls.login_case, cls.logout_case, cls.other_case])
+
+    @staticmethod
+    def search_cases(terms):
+        return list(search(TestCaseModel.objects.all(), terms).values_list('pk', flat=True))
+
+    def test_results_are_ordered_by_relevance(self):
+        self.assertEqual([self.login_case.pk, self.logout_case.pk], self.search_cases('login'))
+        self.assertEqual([self.logout_case.pk], self.search_cases('logout button'))
+
+    def test_blank_terms_do_not_filter(self):
+        self.assertEqual(3, len(self.search_cases('  ')))
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual([], self.search_cases('login" OR NEAR(upload'))
+        self.assertEqual([self.other_case.pk], self.search_cases('5MB*'))
+
+    def test_index_is_updated_by_signals(self):
+        case = TestCaseModel.objects.get(pk=self.other_case.pk)
+        case.summary = 'Upload a password protected archive'
+        case.save()
+        self.assertCountEqual([self.login_case.pk, self.other_case.pk],
+                              self.search_cases('password'))
+
+        TestCaseModel.objects.filter(pk=self.login_case.pk).delete()
+        self.assertEqual([self.other_case.pk], self.search_cases('password'))
+        self.assertFalse(SearchDocument.objects.filter(object_id=self.login_case.pk,
+                                                       text__contains='login').exists())
+
+    def test_bulk_update_updates_index(self):
+        TestCaseModel.bulk_update([self.other_case.pk], {'summary': 'Reset forgotten password'})
+        self.assertCountEqual([self.login_case.pk, self.other_case.pk],
+                              self.search_cases('password'))
+
+    def test_cloned_cases_are_indexed(self):
+        TestCaseModel.clone_cases([self.other_case], self.user, [])
+        self.assertEqual(2, len(self.search_cases('attachment')))
+
+    def test_test_plans(self):
+        plan = TestPlanFactory(name='Release 2.0', text='Regression testing of the installer')
+        TestPlanFactory(name='Release 3.0', text='Smoke testing')
+
+        self.assertEqual([plan], list(search(TestPlan.objects.all(), 'installer')))
+
+    def test_bug_comments_are_indexed(self):
+        bug = BugFactory(summary='Crash on startup')
+        BugFactory(summary='Typo in the footer')
+        add_comment([bug], 'Segmentation fault in the config parser', self.user)
+
+        self.assertEqual([bug], list(search(Bug.objects.all(), 'segmentation fault')))
+
+        bug.delete()
+        self.assertEqual([], list(search(Bug.objects.all(), 'crash')))
+
+    @override_settings(FULLTEXT_SEARCH_BACKEND='tcms.search.fulltext.LikeSearchBackend')
+    def test_like_backend(self):
+        self.assertEqual([self.login_case.pk, self.logout_case.pk], self.search_cases('login'))
+        self.assertEqual([self.logout_case.pk], self.search_cases('LOGOUT butt'))
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+
+        self.assertIn('3 test cases indexed.\n', out.getvalue())
+        self.assertEqual([self.other_case.pk], self.search_cases('upload'))
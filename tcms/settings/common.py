@@ -63,6 +63,32 @@ EMAIL_SUBJECT_PREFIX = '[Kiwi-TCMS] '
 #  EMAIL_HOST_USER = 'smtp_username'
 #  EMAIL_HOST_PASSWORD = 'smtp_password'
 
+# Email notifications are stored in a queue inside the database.
+# 'thread' - deliver them in the background via a single worker thread
+# 'sync' - deliver them immediately, blocking the current request
+# None - deliver them by running `./manage.py send_queued_mail` periodically
+EMAIL_QUEUE_WORKER = 'thread'
+# how many emails are delivered over the same connection to the email backend
+EMAIL_QUEUE_BATCH_SIZE = 100
+# emails are discarded from delivery after failing this many times
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+
+# Comments for issue trackers, added when linking defects to test executions,
+# are stored in a queue inside the database and comments for the same
+# issue are merged. Same options as EMAIL_QUEUE_WORKER, use
+# `./manage.py send_queued_comments` periodically if set to None
+ISSUE_TRACKER_QUEUE_WORKER = 'thread'
+# how many comments are processed at once
+ISSUE_TRACKER_QUEUE_BATCH_SIZE = 50
+# comments are marked as failed after being rejected this many times
+ISSUE_TRACKER_QUEUE_MAX_ATTEMPTS = 5
+
+# Full-text search for test cases, test plans and bugs. When None the
+# implementation is selected based on the database: PostgreSQL, MySQL/MariaDB
+# or SQLite, other databases use slower LIKE queries. Otherwise the dotted
+# path to a subclass of tcms.search.fulltext.SearchBackend
+FULLTEXT_SEARCH_BACKEND = None
+
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # ~~ You may want to override the following settings as well
@@ -266,6 +292,7 @@ TENANT_APPS = [
     'tcms.testcases.apps.AppConfig',
     'tcms.testplans.apps.AppConfig',
     'tcms.testruns.apps.AppConfig',
+    'tcms.search',
 ]
 
 # if you wish to disable Kiwi TCMS bug tracker
@@ -286,7 +313,7 @@ INSTALLED_APPS = TENANT_APPS + [
     'colorfield',
     'vinaigrette',
 
-    'tcms.core',
+    'tcms.core.apps.AppConfig',
     'tcms.kiwi_auth',
     'tcms.telemetry',
     'tcms.rpc',
@@ -353,7 +380,7 @@ SESSION_SERIALIZER = 'django.contrib.sessions.serializers.JSONSerializer'
 SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 
 # WARNING: do not edit. The stock JSONRPC handler does not HTML escape !!!
-MODERNRPC_HANDLERS = ['modernrpc.handlers.XMLRPCHandler', 'tcms.handlers.SafeJSONRPCHandler']
+MODERNRPC_HANDLERS = ['tcms.handlers.XMLRPCHandler', 'tcms.handlers.SafeJSONRPCHandler']
 
 # in alphabetic order
 MODERNRPC_METHODS_MODULES = [
@@ -405,6 +432,12 @@ SET_ADMIN_AS_SUPERUSER = False
 # depend on this setting!
 SIMPLE_HISTORY_HISTORY_CHANGE_REASON_USE_TEXT_FIELD = True
 
+# Historical records older than this many days are deleted by
+# ./manage.py prune_history. The latest record of every object and
+# records referenced by test executions are always kept. None means
+# that only records which didn't change anything are deleted!
+HISTORY_RETENTION_DAYS = None
+
 # Default page size when paginating queries
 DEFAULT_PAGE_SIZE = 100
 
@@ -29,6 +29,11 @@ DATABASES = {
 }
 
 
+# deliver emails and issue tracker comments immediately so that tests can inspect them
+EMAIL_QUEUE_WORKER = 'sync'
+ISSUE_TRACKER_QUEUE_WORKER = 'sync'
+
+
 # for running localized tests, see f74c3c1
 # See https://code.djangoproject.com/ticket/29713
 LANGUAGE_CODE = os.environ.get('LANG', 'en-us').lower().replace('_', '-').split('.')[0]
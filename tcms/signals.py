@@ -35,6 +35,12 @@ __all__ = [
     'handle_emails_post_plan_save',
     'handle_emails_post_run_save',
     'handle_emails_post_bug_save',
+    'handle_status_counts_post_execution_save',
+    'handle_status_counts_post_execution_delete',
+    'handle_trackers_post_bug_system_save',
+    'handle_search_index_post_save',
+    'handle_search_index_post_delete',
+    'handle_search_index_post_comment_save',
 ]
 
 
@@ -195,3 +201,84 @@ def handle_emails_post_bug_save(sender, instance, created=False, **kwargs):
                                                        'summary': instance.summary},
         context={'bug': instance}
     )
+
+
+def handle_status_counts_post_execution_save(sender, instance, created=False, **kwargs):
+    """
+        Update the per-status counters of the TestRun after
+        a TestExecution has been created or updated!
+    """
+    from tcms.testruns.models import TestRunStatusCount
+
+    if kwargs.get('raw', False):
+        return
+
+    if created:
+        TestRunStatusCount.record_changes([(None, instance)])
+    # note: ``previous`` is loaded by KiwiHistoricalRecords.pre_save()
+    elif hasattr(instance, 'previous'):
+        TestRunStatusCount.record_changes([(instance.previous, instance)])
+
+
+def handle_status_counts_post_execution_delete(sender, instance, **kwargs):
+    """
+        Update the per-status counters of the TestRun after
+        a TestExecution has been deleted!
+    """
+    from tcms.testruns.models import TestRunStatusCount
+
+    TestRunStatusCount.record_changes([(instance, None)])
+
+
+def handle_trackers_post_bug_system_save(sender, instance, **kwargs):
+    """
+        Forget cached issue tracker clients and URL prefixes after
+        a BugSystem has been modified or deleted!
+    """
+    from tcms.issuetracker.base import CLIENTS
+    from tcms.rpc.api.utils import reset_tracker_index
+
+    CLIENTS.evict(instance.pk)
+    reset_tracker_index()
+
+
+def handle_search_index_post_save(sender, instance, **kwargs):
+    """
+        Update the full-text search index after a TestCase,
+        TestPlan or Bug has been created or updated!
+    """
+    from tcms.search.fulltext import update_document
+
+    if kwargs.get('raw', False):
+        return
+
+    update_document(instance)
+
+
+def handle_search_index_post_delete(sender, instance, **kwargs):
+    """
+        Remove a deleted TestCase, TestPlan or Bug from
+        the full-text search index!
+    """
+    from tcms.search.fulltext import remove_document
+
+    remove_document(instance)
+
+
+def handle_search_index_post_comment_save(sender, instance, **kwargs):
+    """
+        Update the full-text search index after a comment has been
+        added to, or removed from, an object whose comments are indexed!
+    """
+    from tcms.search.fulltext import INDEXED_COMMENTS, update_document
+
+    if kwargs.get('raw', False):
+        return
+
+    if '%s.%s' % (instance.content_type.app_label,
+                  instance.content_type.model) not in INDEXED_COMMENTS:
+        return
+
+    content_object = instance.content_object
+    if content_object is not None:
+        update_document(content_object)
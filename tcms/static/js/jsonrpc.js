@@ -47,6 +47,31 @@ function dataTableJsonRPC(rpc_method, rpc_params, callback, pre_process_data) {
 }
 
 
+// used with DataTables in serverSide mode, calls one of the *.search() methods
+// which return a single page, sorted by the columns selected in the table
+function dataTableSearchRPC(rpc_method, query, data, callback, terms) {
+    var order_by = [];
+    data.order.forEach(function(order) {
+        var name = data.columns[order.column].name;
+        order_by.push(order.dir === 'desc' ? '-' + name : name);
+    });
+
+    var rpc_params = [query, order_by, data.start, data.length];
+    if (terms !== undefined) {
+        rpc_params.push(terms);
+    }
+
+    jsonRPC(rpc_method, rpc_params, function(result) {
+        callback({
+            draw: data.draw,
+            recordsTotal: result.total,
+            recordsFiltered: result.total,
+            data: result.data,
+        });
+    });
+}
+
+
 // called from pre_process_data to fill local cache with values
 function addResourceToData(element, key, resource, cache) {
     var data = [];
@@ -538,7 +538,7 @@ function changeCaseRunAssignee() {
   if (!assignee) {
     return false;
   }
-  executions.forEach(execution_id => jsonRPC('TestExecution.update', [execution_id, {'assignee': assignee}], () => { }, sync=true));
+  jsonRPC('TestExecution.bulk_update', [executions, {'assignee': assignee}], () => { }, sync=true);
   window.location.reload();
 }
 
@@ -548,9 +548,7 @@ function updateExecutionText() {
     window.alert(default_messages.alert.no_case_selected);
     return false;
   }
-  executions.forEach(executionId =>
-    jsonRPC('TestExecution.update', [executionId, {'case_text_version': 'latest'}], () => { }, sync=true)
-  );
+  jsonRPC('TestExecution.bulk_update', [executions, {'case_text_version': 'latest'}], () => { }, sync=true);
   window.location.reload(true);
 }
 
@@ -633,12 +631,10 @@ jQ(document).ready(function(){
     if (!window.confirm(default_messages.confirm.change_case_status)) {
       return false;
     }
-    object_pks.forEach(executionId => {
-      jsonRPC('TestExecution.update', [executionId, {
-        'status': option,
-        'tested_by': Nitrate.User.pk
-      }], () => { }, true)
-    })
+    jsonRPC('TestExecution.bulk_update', [object_pks, {
+      'status': option,
+      'tested_by': Nitrate.User.pk
+    }], () => { }, true)
 
     reloadWindow();
   });
@@ -1,9 +1,9 @@
-from django.db.models import Count
+from django.db.models import Count, Q, Sum
 from django.utils.translation import gettext_lazy as _
 from modernrpc.core import rpc_method
 
-from tcms.testcases.models import TestCase, TestCaseStatus
-from tcms.testruns.models import TestExecution, TestExecutionStatus
+from tcms.testcases.models import TestCase
+from tcms.testruns.models import TestExecution, TestExecutionStatus, TestRunStatusCount
 
 
 @rpc_method(name='Testing.breakdown')
@@ -22,18 +22,46 @@ def breakdown(query=None):
     if query is None:
         query = {}
 
-    test_cases = TestCase.objects.filter(**query).filter()
+    # matched by name b/c PKs may be different in every DB schema
+    # when kiwitcms-tenants is installed, see TestCaseStatus.get_confirmed()
+    is_confirmed = Q(case_status__name='CONFIRMED')
+    # the same translation TestCaseStatus.name returns via vinaigrette
+    confirmed_name = str(_('CONFIRMED'))
 
-    manual_count = test_cases.filter(is_automated=False).count()
-    automated_count = test_cases.filter(is_automated=True).count()
     count = {
-        'manual': manual_count,
-        'automated': automated_count,
-        'all': manual_count + automated_count
+        'manual': 0,
+        'automated': 0,
+        'all': 0,
+    }
+    priorities = {
+        confirmed_name: {},
+        str(_('OTHER')): {},
+    }
+    categories = {
+        confirmed_name: {},
+        str(_('OTHER')): {},
     }
 
-    priorities = _get_field_count_map(test_cases, 'priority', 'priority__value')
-    categories = _get_field_count_map(test_cases, 'category', 'category__name')
+    # everything is counted by a single query, grouped by
+    # priority & category, and then summed up below
+    for row in TestCase.objects.filter(**query).values(
+            'priority__value', 'category__name'
+    ).annotate(
+        automated=Count('pk', filter=Q(is_automated=True)),
+        manual=Count('pk', filter=Q(is_automated=False)),
+        confirmed=Count('pk', filter=is_confirmed),
+        other=Count('pk', filter=~is_confirmed),
+    ).order_by():
+        count['automated'] += row['automated']
+        count['manual'] += row['manual']
+
+        for status_name, row_count in ((confirmed_name, row['confirmed']),
+                                       (str(_('OTHER')), row['other'])):
+            if row_count:
+                _add_count(priorities[status_name], row['priority__value'], row_count)
+                _add_count(categories[status_name], row['category__name'], row_count)
+
+    count['all'] = count['manual'] + count['automated']
 
     return {
         'count': count,
@@ -42,79 +70,87 @@ def breakdown(query=None):
     }
 
 
-def _get_field_count_map(test_cases, expression, field):
-    confirmed = TestCaseStatus.get_confirmed()
-
-    query_set_confirmed = test_cases.filter(
-        case_status=confirmed
-    ).values(field).annotate(
-        count=Count(expression)
-    )
-    query_set_not_confirmed = test_cases.exclude(
-        case_status=confirmed
-    ).values(field).annotate(
-        count=Count(expression)
-    )
-    return {
-        confirmed.name: _map_query_set(query_set_confirmed, field),
-        str(_('OTHER')): _map_query_set(query_set_not_confirmed, field)
-    }
+def _add_count(counts, key, value):
+    counts[key] = counts.get(key, 0) + value
 
 
-def _map_query_set(query_set, field):
-    return {entry[field]: entry['count'] for entry in query_set}
+# at most this many, most recent, test runs are shown as columns
+STATUS_MATRIX_MAX_RUNS = 100
 
 
 @rpc_method(name='Testing.status_matrix')
-def status_matrix(query=None):
+def status_matrix(query=None, after=0, limit=None, max_runs=STATUS_MATRIX_MAX_RUNS):
     """
-        .. function:: XML-RPC Testing.status_matrix(query)
+        .. function:: XML-RPC Testing.status_matrix(query, after, limit, max_runs)
 
             Perform a search and return data_set needed to visualize the status matrix
-            of test plans, test cases and test executions
+            of test plans, test cases and test executions. Results are paged by
+            test case, use the returned ``next`` value as ``after`` in order to
+            fetch the next page.
 
-            :param query: Field lookups for :class:`tcms.testcases.models.TestPlan`
+            :param query: Field lookups for :class:`tcms.testruns.models.TestExecution`
             :type query: dict
-            :return: List, containing the information about the test executions
-            :rtype: list
+            :param after: Return only test cases with PK greater than this value
+            :type after: int
+            :param limit: Return at most this many test cases (rows), ``None`` for all
+            :type limit: int
+            :param max_runs: Include only executions from this many,
+                             most recent, test runs (columns)
+            :type max_runs: int
+            :return: Object, containing the information about the test executions
+                     and PK of the last test case or ``None`` if this is the last page
+            :rtype: dict
         """
     if query is None:
         query = {}
 
-    data_set = []
+    test_executions = TestExecution.objects.filter(**query)
+
     columns = {}
+    for test_run in test_executions.values(
+            'run_id', 'run__summary'
+    ).distinct().order_by('-run_id')[:max_runs]:
+        columns[test_run['run_id']] = test_run['run__summary']
+
+    test_executions = test_executions.filter(run_id__in=columns.keys(), case_id__gt=after)
+
+    next_after = None
+    if limit:
+        case_ids = list(test_executions.values_list(
+            'case_id', flat=True
+        ).distinct().order_by('case_id')[:limit])
+        test_executions = test_executions.filter(case_id__in=case_ids)
+
+        if len(case_ids) == limit:
+            next_after = case_ids[-1]
+
+    data_set = []
     row = {'tc_id': 0}
-    for test_execution in TestExecution.objects.filter(**query).only(
-            'case_id', 'run_id', 'case__summary', 'status'
+    for test_execution in test_executions.values(
+            'pk', 'case_id', 'case__summary', 'run_id', 'run__plan_id', 'status__color'
     ).order_by('case_id', 'run_id'):
 
-        columns[test_execution.run_id] = test_execution.run.summary
         test_execution_response = {
-            'pk': test_execution.pk,
-            'color': test_execution.status.color,
-            'run_id': test_execution.run_id,
-            'plan_id': test_execution.run.plan_id,
+            'pk': test_execution['pk'],
+            'color': test_execution['status__color'],
+            'run_id': test_execution['run_id'],
+            'plan_id': test_execution['run__plan_id'],
         }
 
-        if test_execution.case_id == row['tc_id']:
+        if test_execution['case_id'] == row['tc_id']:
             row['executions'].append(test_execution_response)
         else:
-            data_set.append(row)
-
             row = {
-                'tc_id': test_execution.case_id,
-                'tc_summary': test_execution.case.summary,
+                'tc_id': test_execution['case_id'],
+                'tc_summary': test_execution['case__summary'],
                 'executions': [test_execution_response],
             }
-
-    # append the last row
-    data_set.append(row)
-
-    del data_set[0]
+            data_set.append(row)
 
     return {
         'data': data_set,
-        'columns': columns
+        'columns': columns,
+        'next': next_after,
     }
 
 
@@ -125,98 +161,84 @@ def execution_trends(query=None):
         query = {}
 
     data_set = {}
-    categories = []
     colors = []
-    count = {}
 
-    for status in TestExecutionStatus.objects.all():
+    statuses = list(TestExecutionStatus.objects.all())
+    for status in statuses:
         data_set[status.name] = []
         colors.append(status.color)
     data_set[str(_('TOTAL'))] = []
     colors.append('black')
 
+    # number of executions for each (run, status) pair, counted by the DB.
+    # Lookups which involve only TestRun fields are answered by the
+    # denormalized counters instead of aggregating all executions
+    if all(key.split('__')[0] in ('run', 'run_id') for key in query):
+        rows = TestRunStatusCount.objects.filter(**query).filter(
+            count__gt=0
+        ).values('run_id', 'status_id').annotate(total=Sum('count'))
+    else:
+        rows = TestExecution.objects.filter(**query).values(
+            'run_id', 'status_id'
+        ).annotate(total=Count('pk'))
+
+    counts_per_run = {}
+    for row in rows.order_by('run_id'):
+        counts_per_run.setdefault(row['run_id'], {})[row['status_id']] = row['total']
+
     status_count = {
         'positive': 0,
         'negative': 0,
         'neutral': 0,
     }
-    run_id = 0
-    for test_execution in TestExecution.objects.filter(**query).order_by('run_id'):
-        status = test_execution.status
-
-        if status.weight > 0:
-            status_count['positive'] += 1
-        elif status.weight < 0:
-            status_count['negative'] += 1
-        else:
-            status_count['neutral'] += 1
-
-        if test_execution.run_id == run_id:
-            if status.name in count:
-                count[status.name] += 1
+    for count in counts_per_run.values():
+        total = 0
+        for status in statuses:
+            executions_count = count.get(status.pk, 0)
+            data_set[status.name].append(executions_count)
+            total += executions_count
+
+            if status.weight > 0:
+                status_count['positive'] += executions_count
+            elif status.weight < 0:
+                status_count['negative'] += executions_count
             else:
-                count[status.name] = 1
+                status_count['neutral'] += executions_count
 
-        else:
-            _append_status_counts_to_result(count, data_set)
-
-            count = {status.name: 1}
-            run_id = test_execution.run_id
-            categories.append(run_id)
-
-    # append the last result
-    _append_status_counts_to_result(count, data_set)
-
-    for _key, value in data_set.items():
-        del value[0]
+        data_set[str(_('TOTAL'))].append(total)
 
     return {
-        'categories': categories,
+        'categories': list(counts_per_run.keys()),
         'data_set': data_set,
         'colors': colors,
         'status_count': status_count,
     }
 
 
-def _append_status_counts_to_result(count, result):
-    total = 0
-    for status in TestExecutionStatus.objects.all():
-        status_count = count.get(status.name, 0)
-        result.get(status.name).append(status_count)
-
-        total += status_count
-
-    result.get(str(_('TOTAL'))).append(total)
-
-
 @rpc_method(name='Testing.test_case_health')
 def test_case_health(query=None):
 
     if query is None:
         query = {}
 
-    all_test_executions = TestExecution.objects.filter(**query)
-
-    test_executions = _get_count_for(all_test_executions)
-    failed_test_executions = _get_count_for(all_test_executions.filter(status__weight__lt=0))
-
-    data = {}
-    for value in test_executions:
-        data[value['case_id']] = {
+    data = []
+    for value in TestExecution.objects.filter(**query).values(
+            'case_id', 'case__summary'
+    ).annotate(
+        count=Count('case_id'),
+        fail=Count('case_id', filter=Q(status__weight__lt=0)),
+    ).filter(fail__gt=0).order_by('case_id'):
+        # note: test cases with 100% success rate are not interesting
+        # so they have already been filtered out above
+        data.append({
             'case_id': value['case_id'],
             'case_summary': value['case__summary'],
             'count': {
                 'all': value['count'],
-                'fail': 0
+                'fail': value['fail'],
             }
-        }
-
-    _count_test_executions(data, failed_test_executions, 'fail')
+        })
 
-    # remove all with 100% success rate, because they are not interesting
-    _remove_all_excellent_executions(data)
-
-    data = list(data.values())
     data.sort(key=_sort_by_failing_rate, reverse=True)
 
     if len(data) > 30:
@@ -225,22 +247,5 @@ def test_case_health(query=None):
     return data
 
 
-def _remove_all_excellent_executions(data):
-    for key in dict.fromkeys(data):
-        if data[key]['count']['fail'] == 0:
-            data.pop(key)
-
-
-def _count_test_executions(data, test_executions, status):
-    for value in test_executions:
-        data[value['case_id']]['count'][status] = value['count']
-
-
 def _sort_by_failing_rate(element):
     return element['count']['fail'] / element['count']['all']
-
-
-def _get_count_for(test_executions):
-    return test_executions.values(
-        'case_id', 'case__summary'
-    ).annotate(count=Count('case_id')).order_by('case_id')
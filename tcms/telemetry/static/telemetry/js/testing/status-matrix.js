@@ -1,4 +1,5 @@
 let table;
+let drawGeneration = 0;
 let initial_column = {
     data: null,
     className: "table-view-pf-actions",
@@ -103,7 +104,17 @@ function drawTable() {
         query['close_date__gte'] = dateAfter.data('DateTimePicker').date().format('YYYY-MM-DD 00:00:00');
     }
 
-    jsonRPC('Testing.status_matrix', query, data => {
+    // rows are fetched page by page and appended to the table as they arrive.
+    // Changing the filters starts a new generation and stale pages are ignored
+    drawGeneration += 1;
+    const generation = drawGeneration;
+    const pageSize = Number($('#navbar').data('defaultpagesize')) || 100;
+
+    jsonRPC('Testing.status_matrix', [query, 0, pageSize], data => {
+        if (generation !== drawGeneration) {
+            return;
+        }
+
         const table_columns = [initial_column];
         const testRunIds = Object.keys(data.columns);
 
@@ -135,15 +146,36 @@ function drawTable() {
             dom: "t"
         });
 
-        const cells = $('.table > tbody > tr > td:has(.execution-status)');
-        Object.entries(cells).forEach(applyStyleToCell);
+        styleTable();
+        loadNextPage(query, data.next, pageSize, generation);
+    });
+}
+
+function loadNextPage(query, after, pageSize, generation) {
+    if (after === null) {
+        return;
+    }
+
+    jsonRPC('Testing.status_matrix', [query, after, pageSize], data => {
+        if (generation !== drawGeneration) {
+            return;
+        }
 
-        // initialize the tooltips by hand, because they are dinamically inserted
-        // and not handled by Bootstrap itself
-        $('span[data-toggle=tooltip]').tooltip();
+        table.rows.add(data.data).draw();
+        styleTable();
+        loadNextPage(query, data.next, pageSize, generation);
     });
 }
 
+function styleTable() {
+    const cells = $('.table > tbody > tr > td:has(.execution-status)');
+    Object.entries(cells).forEach(applyStyleToCell);
+
+    // initialize the tooltips by hand, because they are dinamically inserted
+    // and not handled by Bootstrap itself
+    $('span[data-toggle=tooltip]').tooltip();
+}
+
 function applyStyleToCell(cell) {
     const cellElement = cell[1];
     if (cellElement) {
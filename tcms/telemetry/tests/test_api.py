@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=too-many-ancestors
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tcms.telemetry import api
+from tcms.testruns.models import TestExecutionStatus
+from tcms.tests import BaseCaseRun
+from tcms.tests.factories import TestExecutionFactory
+
+
+class TestExecutionTrends(BaseCaseRun):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.status_passed = TestExecutionStatus.objects.get(name='PASSED')
+        cls.status_failed = TestExecutionStatus.objects.get(name='FAILED')
+
+        cls.execution_1.status = cls.status_passed
+        cls.execution_1.save()
+        cls.execution_4.status = cls.status_failed
+        cls.execution_4.save()
+        cls.execution_5.status = cls.status_failed
+        cls.execution_5.save()
+
+    def test_counts_executions_per_run_and_status(self):
+        result = api.execution_trends({'run__plan': self.plan.pk})
+
+        self.assertEqual(result['categories'], [self.test_run.pk, self.test_run_1.pk])
+        self.assertEqual(result['status_count'], {
+            'positive': 1,
+            'negative': 2,
+            'neutral': 3,
+        })
+
+        statuses = list(TestExecutionStatus.objects.all())
+        self.assertEqual(len(result['colors']), len(statuses) + 1)
+        self.assertEqual(len(result['data_set']), len(statuses) + 1)
+        for status in statuses:
+            self.assertEqual(len(result['data_set'][status.name]), 2)
+
+        self.assertEqual(result['data_set']['IDLE'], [2, 1])
+        self.assertEqual(result['data_set']['PASSED'], [1, 0])
+        self.assertEqual(result['data_set']['FAILED'], [0, 2])
+        self.assertEqual(result['data_set']['TOTAL'], [3, 3])
+
+    def test_without_executions(self):
+        result = api.execution_trends({'run__plan': -1})
+
+        self.assertEqual(result['categories'], [])
+        self.assertEqual(result['data_set']['TOTAL'], [])
+        self.assertEqual(result['status_count'], {
+            'positive': 0,
+            'negative': 0,
+            'neutral': 0,
+        })
+
+    def test_number_of_queries_does_not_depend_on_executions(self):
+        with CaptureQueriesContext(connection) as before:
+            api.execution_trends({'run__plan': self.plan.pk})
+
+        for _ in range(10):
+            TestExecutionFactory(run=self.test_run, status=self.status_failed)
+
+        with CaptureQueriesContext(connection) as after:
+            api.execution_trends({'run__plan': self.plan.pk})
+
+        self.assertEqual(len(before), 2)
+        self.assertEqual(len(after), len(before))
+
+
+class TestStatusMatrix(BaseCaseRun):
+
+    def test_returns_all_test_cases_by_default(self):
+        result = api.status_matrix({'run__plan': self.plan.pk})
+
+        self.assertIsNone(result['next'])
+        self.assertEqual(result['columns'], {
+            self.test_run.pk: self.test_run.summary,
+            self.test_run_1.pk: self.test_run_1.summary,
+        })
+        self.assertEqual(
+            list(row['tc_id'] for row in result['data']),
+            sorted([self.case_1.pk, self.case_2.pk, self.case_3.pk,
+                    self.case_4.pk, self.case_5.pk, self.case_6.pk]))
+
+        row = result['data'][0]
+        self.assertEqual(row['tc_summary'], self.case_1.summary)
+        self.assertEqual(row['executions'], [{
+            'pk': self.execution_1.pk,
+            'color': self.status_idle.color,
+            'run_id': self.test_run.pk,
+            'plan_id': self.plan.pk,
+        }])
+
+    def test_pages_by_test_case(self):
+        case_ids = []
+        after = 0
+        while after is not None:
+            result = api.status_matrix({'run__plan': self.plan.pk}, after, 4)
+            self.assertLessEqual(len(result['data']), 4)
+            case_ids.extend(row['tc_id'] for row in result['data'])
+            after = result['next']
+
+        self.assertEqual(
+            case_ids,
+            sorted([self.case_1.pk, self.case_2.pk, self.case_3.pk,
+                    self.case_4.pk, self.case_5.pk, self.case_6.pk]))
+
+    def test_shows_only_the_most_recent_test_runs(self):
+        result = api.status_matrix({'run__plan': self.plan.pk}, max_runs=1)
+
+        self.assertEqual(result['columns'], {self.test_run_1.pk: self.test_run_1.summary})
+        self.assertEqual(
+            list(row['tc_id'] for row in result['data']),
+            [self.case_4.pk, self.case_5.pk, self.case_6.pk])
+
+    def test_number_of_queries_does_not_depend_on_executions(self):
+        with CaptureQueriesContext(connection) as before:
+            api.status_matrix({'run__plan': self.plan.pk}, 0, 100)
+
+        for _ in range(10):
+            TestExecutionFactory(run=self.test_run)
+
+        with CaptureQueriesContext(connection) as after:
+            api.status_matrix({'run__plan': self.plan.pk}, 0, 100)
+
+        self.assertEqual(len(before), 3)
+        self.assertEqual(len(after), len(before))
+
+
+class TestBreakdown(BaseCaseRun):
+
+    def test_counts_test_cases(self):
+        result = api.breakdown({'plan': self.plan.pk})
+
+        # all test cases from BasePlanCase are CONFIRMED & manual
+        self.assertEqual(result['count'], {
+            'manual': 7,
+            'automated': 0,
+            'all': 7,
+        })
+        self.assertEqual(sum(result['priorities']['CONFIRMED'].values()), 7)
+        self.assertEqual(result['priorities']['OTHER'], {})
+        self.assertEqual(sum(result['categories']['CONFIRMED'].values()), 7)
+        self.assertEqual(result['categories']['OTHER'], {})
+
+    def test_issues_a_single_query(self):
+        with self.assertNumQueries(1):
+            api.breakdown({'plan': self.plan.pk})
+
+
+class TestTestCaseHealth(BaseCaseRun):
+
+    def test_reports_only_failing_test_cases(self):
+        status_failed = TestExecutionStatus.objects.get(name='FAILED')
+        self.execution_1.status = status_failed
+        self.execution_1.save()
+        TestExecutionFactory(run=self.test_run_1, case=self.case_1)
+
+        result = api.test_case_health({'run__plan': self.plan.pk})
+
+        self.assertEqual(result, [{
+            'case_id': self.case_1.pk,
+            'case_summary': self.case_1.summary,
+            'count': {
+                'all': 2,
+                'fail': 1,
+            },
+        }])
+
+    def test_issues_a_single_query(self):
+        with self.assertNumQueries(1):
+            api.test_case_health({'run__plan': self.plan.pk})
@@ -7,11 +7,15 @@ class AppConfig(DjangoAppConfig):
     name = 'tcms.testcases'
 
     def ready(self):
-        from django.db.models.signals import post_save, pre_delete, pre_save
-        from .models import TestCase
+        from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+        from .models import BugSystem, TestCase
         from tcms import signals
 
         pre_save.connect(signals.pre_save_clean, TestCase)
         post_save.connect(signals.handle_emails_post_case_save, TestCase)
         pre_delete.connect(signals.handle_emails_pre_case_delete, TestCase)
         pre_delete.connect(signals.handle_comments_pre_delete, TestCase)
+        post_save.connect(signals.handle_search_index_post_save, TestCase)
+        post_delete.connect(signals.handle_search_index_post_delete, TestCase)
+        post_save.connect(signals.handle_trackers_post_bug_system_save, BugSystem)
+        post_delete.connect(signals.handle_trackers_post_bug_system_save, BugSystem)
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
+from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from tcms.core.history import history_email_for
 from tcms.core.utils.mailto import mailto
+from tcms.testcases.models import TestCaseEmailSettings
+from tcms.testruns.models import TestExecution
 
 
 def email_case_update(case):
@@ -14,6 +18,54 @@ def email_case_update(case):
     mailto(None, subject, recipients, body, cc=cc_list)
 
 
+def email_cases_update(cases, user=None):
+    """
+        Notify about changes made by :meth:`TestCase.bulk_update`. Every
+        recipient receives a single email which lists all of the TestCase
+        objects they would've been notified about individually!
+    """
+    recipients = get_cases_notification_recipients(cases, user)
+
+    cases_for_recipient = {}
+    for case in cases:
+        for recipient in recipients.get(case.pk, []):
+            cases_for_recipient.setdefault(recipient, []).append(case)
+
+    # recipients interested in the same TestCases receive the same email
+    recipients_for_cases = {}
+    for recipient, recipient_cases in cases_for_recipient.items():
+        recipients_for_cases.setdefault(tuple(recipient_cases), []).append(recipient)
+
+    for recipient_cases, recipients_list in recipients_for_cases.items():
+        subject, body = _cases_update_email(recipient_cases, user)
+        mailto(None, subject, recipients_list, body)
+
+
+def _cases_update_email(cases, user):
+    if len(cases) == 1:
+        subject = _("UPDATE: %(model_name)s #%(pk)d - %(title)s") % {
+            'model_name': 'TestCase',
+            'pk': cases[0].pk,
+            'title': cases[0].summary,
+        }
+    else:
+        subject = _("UPDATE: %(count)d TestCases") % {'count': len(cases)}
+
+    body = [_("Updated on %(history_date)s\nUpdated by %(username)s") % {
+        'history_date': timezone.now().strftime('%c'),
+        'username': getattr(user, 'username', ''),
+    }]
+    for case in cases:
+        body.append(_("TestCase #%(pk)d - %(summary)s\n%(diff)s\n%(instance_url)s") % {
+            'pk': case.pk,
+            'summary': case.summary,
+            'diff': case._change_reason,  # pylint: disable=protected-access
+            'instance_url': case.get_full_url(),
+        })
+
+    return subject, '\n\n'.join(str(part) for part in body)
+
+
 def email_case_deletion(case):
     recipients = get_case_notification_recipients(case)
     cc_list = case.emailing.get_cc_list()
@@ -50,3 +102,61 @@ def get_case_notification_recipients(case):
     # don't email author of last change
     recipients.discard(getattr(case.history.latest().history_user, 'email', ''))
     return list(filter(None, recipients))
+
+
+def get_cases_notification_recipients(cases, user=None):
+    """
+        Same as :func:`get_case_notification_recipients`, including CC
+        lists, for multiple TestCase objects using a fixed number of queries.
+        *user* is the author of the last change and isn't notified.
+
+        :return: Mapping between TestCase PKs and lists of recipients for
+                 the TestCase objects which notify on update
+        :rtype: dict
+    """
+    case_ids = list(case.pk for case in cases)
+
+    email_settings = {}
+    for settings in TestCaseEmailSettings.objects.filter(case__in=case_ids):
+        email_settings[settings.case_id] = settings
+
+    user_ids = set()
+    for case in cases:
+        user_ids.add(case.author_id)
+        user_ids.add(case.default_tester_id)
+    emails = dict(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', 'email'))
+
+    execution_emails = {}
+    for case_id, manager, run_tester, assignee in TestExecution.objects.filter(
+            case__in=case_ids).values_list('case', 'run__manager__email',
+                                           'run__default_tester__email', 'assignee__email'):
+        execution_emails.setdefault(case_id, []).append((manager, run_tester, assignee))
+
+    result = {}
+    for case in cases:
+        # default values are used when the settings haven't been created yet
+        settings = email_settings.get(case.pk, TestCaseEmailSettings())
+        if not settings.notify_on_case_update:
+            continue
+
+        recipients = set(settings.get_cc_list())
+
+        if settings.auto_to_case_author:
+            recipients.add(emails.get(case.author_id))
+
+        if settings.auto_to_case_tester and case.default_tester_id:
+            recipients.add(emails.get(case.default_tester_id))
+
+        for manager, run_tester, assignee in execution_emails.get(case.pk, []):
+            if settings.auto_to_run_manager:
+                recipients.add(manager)
+            if settings.auto_to_run_tester:
+                recipients.add(run_tester)
+            if settings.auto_to_case_run_assignee:
+                recipients.add(assignee)
+
+        # don't email author of last change
+        recipients.discard(getattr(user, 'email', ''))
+        result[case.pk] = list(filter(None, recipients))
+
+    return result
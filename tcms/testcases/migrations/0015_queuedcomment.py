@@ -0,0 +1,32 @@
+# Generated by Django 3.0.9 on 2026-10-17 09:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0014_update_issutracker_types'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedComment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=1024)),
+                ('text', models.TextField()),
+                ('status', models.CharField(db_index=True, default='pending', max_length=16)),
+                ('created_on', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('claimed_on', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('retry_on', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('delivered_on', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('bug_system', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                                                 to='testcases.BugSystem')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.9 on 2026-10-17 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0015_queuedcomment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='rendered_text',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='rendered_version',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
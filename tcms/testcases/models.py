@@ -1,16 +1,21 @@
 # -*- coding: utf-8 -*-
+from copy import copy
+
 import vinaigrette
 from django.conf import settings
-from django.db import models
-from django.db.models import ObjectDoesNotExist
+from django.db import connection, models, transaction
+from django.db.models import Max, ObjectDoesNotExist, prefetch_related_objects
 from django.db.models import Q
 from django.urls import reverse
 from django.utils.translation import override
 
-from tcms.core.history import KiwiHistoricalRecords
+from tcms.core.history import KiwiHistoricalRecords, diff_objects
 from tcms.core.models import TCMSActionModel
+from tcms.core.utils.markup import MARKDOWN_VERSION, markdown_to_html
+from tcms.management.models import Component
 from tcms.rpc.serializer import TestCaseRPCSerializer
-from tcms.rpc.utils import distinct_filter
+from tcms.rpc.utils import search_filter, search_filter_page
+from tcms.search.fulltext import search_condition, update_documents
 from tcms.testcases.fields import MultipleEmailField
 
 
@@ -60,7 +65,7 @@ class Category(TCMSActionModel):
 
 
 class TestCase(TCMSActionModel):
-    history = KiwiHistoricalRecords()
+    history = KiwiHistoricalRecords(excluded_fields=['rendered_text', 'rendered_version'])
 
     create_date = models.DateTimeField(auto_now_add=True)
     is_automated = models.BooleanField(default=False)
@@ -71,6 +76,10 @@ class TestCase(TCMSActionModel):
     requirement = models.CharField(max_length=255, blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
     text = models.TextField(blank=True)
+    # HTML version of text, refreshed on save. Used only if rendered_version
+    # matches tcms.core.utils.markup.MARKDOWN_VERSION
+    rendered_text = models.TextField(null=True, blank=True, editable=False)
+    rendered_version = models.CharField(max_length=32, blank=True, editable=False)
 
     case_status = models.ForeignKey(TestCaseStatus, on_delete=models.CASCADE)
     category = models.ForeignKey(Category, related_name='category_case',
@@ -103,13 +112,93 @@ class TestCase(TCMSActionModel):
     def __str__(self):
         return self.summary
 
-    @classmethod
-    def to_xmlrpc(cls, query=None):
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        self.rendered_text = markdown_to_html(self.text)
+        self.rendered_version = MARKDOWN_VERSION
+        if update_fields is not None and 'text' in update_fields:
+            update_fields = list(update_fields) + ['rendered_text', 'rendered_version']
+
+        super().save(force_insert=force_insert,
+                     force_update=force_update,
+                     using=using,
+                     update_fields=update_fields)
 
+    @classmethod
+    def to_xmlrpc(cls, query=None,  # pylint: disable=arguments-differ,too-many-arguments
+                  stream=False, limit=None, after_pk=None, fields=None, search=None,
+                  start=0):
         _query = query or {}
-        qs = distinct_filter(TestCase, _query).order_by('pk')
-        serializer = TestCaseRPCSerializer(model_class=cls, queryset=qs)
-        return serializer.serialize_queryset()
+        qs = search_filter(TestCase, _query, after_pk, search)
+        serializer = TestCaseRPCSerializer(model_class=cls, queryset=qs, fields=fields)
+        result = serializer.serialize(stream, limit, start)
+        if limit is not None:
+            result = search_filter_page(result, search, start, limit)
+        return result
+
+    @classmethod
+    def get_latest_history_ids(cls, case_ids):
+        """
+            Return a mapping between TestCase PKs and the PK of their
+            latest historical record, aka case_text_version, using a
+            single query!
+        """
+        query_set = cls.history.filter(  # pylint: disable=no-member
+            id__in=case_ids
+        ).values('id').annotate(latest=Max('history_id')).order_by('id')
+
+        return dict((row['id'], row['latest']) for row in query_set)
+
+    @classmethod
+    def bulk_update(cls, case_ids, changes, user=None, batch_size=500):
+        """
+            Update multiple TestCase objects with a single UPDATE query and
+            record their history in batches, instead of calling ``save()``
+            for each one of them. Signals are not sent, use
+            :func:`tcms.testcases.helpers.email.email_cases_update` to
+            notify about the changes! The full-text search index is
+            updated here.
+
+            :param case_ids: PKs of TestCase objects to update
+            :type case_ids: iterable
+            :param changes: Mapping between field names (attnames) and new values
+            :type changes: dict
+            :param user: Recorded as the author of the historical records
+            :type user: User
+            :param batch_size: Number of historical records created at once
+            :type batch_size: int
+            :return: The TestCase objects which have been modified, with
+                     the changelog stored in ``_change_reason``
+            :rtype: list
+        """
+        changed = []
+        with transaction.atomic():
+            for case in cls.objects.filter(pk__in=case_ids).order_by('pk'):
+                previous = copy(case)
+                for attname, value in changes.items():
+                    setattr(case, attname, value)
+
+                # note: the same changelog KiwiHistoricalRecords.post_save() would produce
+                case._change_reason = diff_objects(  # pylint: disable=protected-access
+                    previous, case, cls._meta.fields)
+                if case._change_reason:  # pylint: disable=protected-access
+                    changed.append(case)
+
+            if changed:
+                if 'text' in changes:
+                    # not part of the changelog, see save()
+                    changes = dict(changes,
+                                   rendered_text=markdown_to_html(changes['text']),
+                                   rendered_version=MARKDOWN_VERSION)
+                cls.objects.filter(  # pylint: disable=objects-update-used
+                    pk__in=list(case.pk for case in changed)
+                ).update(**changes)
+                cls.history.bulk_history_create(  # pylint: disable=no-member
+                    changed, batch_size=batch_size, update=True, default_user=user)
+                if 'summary' in changes or 'text' in changes:
+                    update_documents(changed, batch_size=batch_size)
+
+        return changed
 
     @classmethod
     def list(cls, query, plan=None):
@@ -123,12 +212,13 @@ class TestCase(TCMSActionModel):
         if query.get('case_id_set'):
             queryset = queryset.filter(pk__in=query['case_id_set'])
 
-        if query.get('search'):
-            queryset = queryset.filter(
-                Q(pk__icontains=query['search']) |
-                Q(summary__icontains=query['search']) |
-                Q(author__email__startswith=query['search'])
-            )
+        if query.get('search') and query['search'].strip():
+            # summary and text are matched via the full-text search index
+            condition = search_condition(cls, query['search']) | \
+                Q(author__email__startswith=query['search'].strip())
+            if query['search'].strip().isdigit():
+                condition |= Q(pk=int(query['search']))
+            queryset = queryset.filter(condition)
 
         if query.get('summary'):
             queryset = queryset.filter(Q(summary__icontains=query['summary']))
@@ -228,57 +318,158 @@ class TestCase(TCMSActionModel):
     emailing = property(_get_email_conf)
 
     def clone(self, new_author, test_plans):
-        new_tc = self.__class__.objects.create(
-            is_automated=self.is_automated,
-            script=self.script,
-            arguments=self.arguments,
-            extra_link=self.extra_link,
-            summary=self.summary,
-            requirement=self.requirement,
-            case_status=TestCaseStatus.get_proposed(),
-            category=self.category,
-            priority=self.priority,
-            notes=self.notes,
-            text=self.text,
-            author=new_author,
-            default_tester=self.default_tester,
-        )
-
-        # apply tags as well
-        for tag in self.tag.all():
-            new_tc.add_tag(tag)
-
-        for plan in test_plans:
-            plan.add_case(new_tc)
-
-            # clone TC category b/c we may be cloning a 'linked'
-            # TC which has a different Product that doesn't have the
-            # same categories yet
-            try:
-                tc_category = plan.product.category.get(name=self.category.name)
-            except ObjectDoesNotExist:
-                tc_category = plan.product.category.create(
-                    name=self.category.name,
-                    description=self.category.description,
+        return self.clone_cases([self], new_author, test_plans)[0]
+
+    @classmethod
+    def clone_cases(cls, cases, new_author, test_plans,  # pylint: disable=too-many-locals
+                    batch_size=500):
+        """
+            Clone multiple TestCase objects and add the clones to all of
+            *test_plans*. Categories and components which don't exist in
+            the products of *test_plans* are created b/c we may be cloning
+            'linked' TCs from a different Product.
+
+            Everything is inserted in bulk, with a fixed number of queries
+            per batch. The exception are databases which don't return PKs
+            from bulk inserts, e.g. SQLite and MySQL, where each clone
+            is saved individually.
+
+            :param cases: TestCase objects to clone
+            :type cases: iterable
+            :param new_author: Author of the cloned TestCase objects
+            :type new_author: User
+            :param test_plans: TestPlan objects to which clones are added
+            :type test_plans: iterable
+            :param batch_size: Number of TestCase objects cloned at once
+            :type batch_size: int
+            :return: The cloned TestCase objects, in the same order as *cases*
+            :rtype: list
+        """
+        cases = list(cases)
+        test_plans = list(test_plans)
+        prefetch_related_objects(cases, 'category', 'tag', 'component')
+
+        product_ids = list(set(plan.product_id for plan in test_plans))
+        categories = _objects_by_name(
+            Category, product_ids, (case.category for case in cases))
+        components = _objects_by_name(
+            Component, product_ids,
+            (component for case in cases for component in case.component.all()),
+            initial_owner=new_author)
+        sortkeys = _next_sortkeys(test_plans)
+        proposed = TestCaseStatus.get_proposed()
+
+        result = []
+        with transaction.atomic():
+            for start in range(0, len(cases), batch_size):
+                batch = cases[start:start + batch_size]
+
+                new_cases = []
+                for case in batch:
+                    category = case.category
+                    if test_plans:
+                        # same as before: the category from the last TestPlan wins
+                        category = categories[(test_plans[-1].product_id, category.name)]
+
+                    new_cases.append(cls(
+                        is_automated=case.is_automated,
+                        script=case.script,
+                        arguments=case.arguments,
+                        extra_link=case.extra_link,
+                        summary=case.summary,
+                        requirement=case.requirement,
+                        case_status=proposed,
+                        category=category,
+                        priority_id=case.priority_id,
+                        notes=case.notes,
+                        text=case.text,
+                        rendered_text=case.rendered_text,
+                        rendered_version=case.rendered_version,
+                        author=new_author,
+                        default_tester_id=case.default_tester_id,
+                    ))
+
+                if connection.features.can_return_rows_from_bulk_insert:
+                    cls.objects.bulk_create(new_cases)  # pylint: disable=bulk-create-used
+                    cls.history.bulk_history_create(  # pylint: disable=no-member
+                        new_cases, default_user=new_author)
+                    update_documents(new_cases)
+                else:
+                    for new_case in new_cases:
+                        # recorded by simple_history instead of the current request's user
+                        new_case._history_user = new_author  # pylint: disable=protected-access
+                        new_case.save()
+
+                plan_links = []
+                tag_links = []
+                component_links = []
+                for case, new_case in zip(batch, new_cases):
+                    for plan in test_plans:
+                        plan_links.append(TestCasePlan(plan=plan, case=new_case,
+                                                       sortkey=sortkeys[plan.pk]))
+                        sortkeys[plan.pk] += 10
+
+                    for tag in case.tag.all():
+                        tag_links.append(TestCaseTag(case=new_case, tag=tag))
+
+                    new_components = set()
+                    for component in case.component.all():
+                        for product_id in product_ids:
+                            new_components.add(components[(product_id, component.name)])
+                    for component in new_components:
+                        component_links.append(
+                            TestCaseComponent(case=new_case, component=component))
+
+                # pylint: disable=bulk-create-used
+                TestCasePlan.objects.bulk_create(plan_links)
+                TestCaseTag.objects.bulk_create(tag_links)
+                TestCaseComponent.objects.bulk_create(component_links)
+                result.extend(new_cases)
+
+        return result
+
+
+def _objects_by_name(model, product_ids, sources, **kwargs):
+    """
+        Return a mapping between (product_id, name) pairs and Category or
+        Component objects with the same names as *sources*, in every
+        one of *product_ids*. Objects which don't exist are created.
+    """
+    sources = dict((source.name, source) for source in sources)
+
+    result = {}
+    for obj in model.objects.filter(product__in=product_ids,
+                                    name__in=sources.keys()).order_by('pk'):
+        result.setdefault((obj.product_id, obj.name), obj)
+
+    for product_id in product_ids:
+        for name, source in sources.items():
+            if (product_id, name) not in result:
+                result[(product_id, name)] = model.objects.create(
+                    product_id=product_id,
+                    name=name,
+                    description=source.description,
+                    **kwargs
                 )
-            new_tc.category = tc_category
-            new_tc.save()
-
-            # clone TC components b/c we may be cloning a 'linked'
-            # TC which has a different Product that doesn't have the
-            # same components yet
-            for component in self.component.all():
-                try:
-                    new_component = plan.product.component.get(name=component.name)
-                except ObjectDoesNotExist:
-                    new_component = plan.product.component.create(
-                        name=component.name,
-                        initial_owner=new_author,
-                        description=component.description,
-                    )
-                new_tc.add_component(new_component)
-
-        return new_tc
+
+    return result
+
+
+def _next_sortkeys(test_plans):
+    """
+        Return a mapping between TestPlan PKs and the sortkey for the
+        next TestCase added to each one of them, using a single query!
+    """
+    result = dict((plan.pk, 0) for plan in test_plans)
+
+    query_set = TestCasePlan.objects.filter(
+        plan__in=result.keys()
+    ).values('plan').annotate(last=Max('sortkey')).order_by('plan')
+    for row in query_set:
+        if row['last'] is not None:
+            result[row['plan']] = row['last'] + 10
+
+    return result
 
 
 class TestCasePlan(models.Model):
@@ -378,6 +569,34 @@ Leave empty to disable!
         return self.name
 
 
+class QueuedComment(models.Model):
+    """
+        Comment waiting to be posted to an issue tracker by
+        :func:`tcms.issuetracker.comments.send_queued_comments`.
+        Delivered and failed comments are kept for reference!
+    """
+    PENDING = 'pending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+
+    bug_system = models.ForeignKey(BugSystem, on_delete=models.CASCADE)
+    url = models.CharField(max_length=1024)
+    text = models.TextField()
+    status = models.CharField(max_length=16, default=PENDING, db_index=True)
+    created_on = models.DateTimeField(auto_now_add=True, db_index=True)
+    # set while delivery is in progress
+    claimed_on = models.DateTimeField(null=True, blank=True, db_index=True)
+    # not delivered before this time after a failed attempt or
+    # when the issue tracker asked us to slow down
+    retry_on = models.DateTimeField(null=True, blank=True, db_index=True)
+    delivered_on = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.url
+
+
 class TestCaseEmailSettings(models.Model):
     case = models.OneToOneField(TestCase, related_name='email_settings', on_delete=models.CASCADE)
     notify_on_case_update = models.BooleanField(default=True)
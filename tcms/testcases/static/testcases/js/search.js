@@ -59,15 +59,12 @@ $(document).ready(function() {
                 params['is_automated'] = false;
             };
 
-            // todo: see BaseCaseSearchForm
-            const text = $('#id_text').val();
-            if (text) {
-                params['text__icontains'] = text;
-            };
-
             updateParamsToSearchTags('#id_tag', params);
 
-            dataTableJsonRPC('TestCase.filter', params, callback, pre_process_data);
+            // full-text search in summary and text, ordered by relevance
+            const search = $('#id_text').val();
+
+            dataTableJsonRPC('TestCase.filter', [params, null, null, null, search], callback, pre_process_data);
         },
         columns: [
             { data: "id" },
@@ -98,7 +95,8 @@ $(document).ready(function() {
             processing: '<div class="spinner spinner-lg"></div>',
             zeroRecords: "No records found"
         },
-        order: [[ 0, 'asc' ]],
+        // keep the order from the server, by relevance when searching
+        order: [],
     });
 
     hookIntoPagination('#resultsTable', table);
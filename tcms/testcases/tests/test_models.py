@@ -1,21 +1,26 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=invalid-name, no-member
 
+from django import test
 from django.conf import settings
-from django.test import TestCase
+from django.core import mail
 from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
-from mock import patch
 
 from tcms.core.history import history_email_for
+from tcms.core.utils.markup import MARKDOWN_VERSION
+from tcms.management.models import Component
+from tcms.testcases.models import Category, TestCase, TestCaseStatus
 from tcms.testcases.helpers.email import get_case_notification_recipients
 from tcms.tests import BasePlanCase
-from tcms.tests.factories import (ComponentFactory, TagFactory,
-                                  TestCaseComponentFactory, TestCaseTagFactory)
+from tcms.tests.factories import (ComponentFactory, ProductFactory,
+                                  TagFactory, TestCaseComponentFactory,
+                                  TestCaseTagFactory, TestPlanFactory,
+                                  UserFactory)
 from tcms.tests.factories import TestCaseFactory
 
 
-class SupportsCyrillic(TestCase):
+class SupportsCyrillic(test.TestCase):
     def test_create_testcase_with_cyrillic_works_issue_1770(self):
         # https://github.com/kiwitcms/Kiwi/issues/1770
         case = TestCaseFactory(summary="Това е тест на кирилица")
@@ -80,6 +85,112 @@ class TestCaseRemoveTag(BasePlanCase):
         self.assertEqual([self.tag_fedora.pk], tag_pks)
 
 
+class TestCaseCloneCases(BasePlanCase):
+    """Test TestCase.clone_cases"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.new_author = UserFactory()
+        cls.component = ComponentFactory(name='Application', product=cls.product)
+        cls.tag = TagFactory()
+        for case in (cls.case_1, cls.case_2):
+            TestCaseComponentFactory(case=case, component=cls.component)
+            TestCaseTagFactory(case=case, tag=cls.tag)
+
+        cls.other_plan = TestPlanFactory(product=ProductFactory())
+        cls.other_plan.add_case(cls.case, sortkey=50)
+
+    def test_clone_into_plan_of_another_product(self):
+        cases = [self.case_1, self.case_2, self.case_3]
+
+        clones = TestCase.clone_cases(
+            cases, self.new_author, [self.other_plan], batch_size=2)
+
+        self.assertEqual(3, len(clones))
+        component = Component.objects.get(product=self.other_plan.product,
+                                          name='Application')
+        for number, (case, clone) in enumerate(zip(cases, clones)):
+            clone = TestCase.objects.get(pk=clone.pk)
+            self.assertNotEqual(case.pk, clone.pk)
+            self.assertEqual(case.summary, clone.summary)
+            self.assertEqual(case.text, clone.text)
+            self.assertEqual(case.priority, clone.priority)
+            self.assertEqual(self.new_author, clone.author)
+            self.assertEqual(TestCaseStatus.get_proposed(), clone.case_status)
+            self.assertEqual(self.other_plan.product, clone.category.product)
+            self.assertEqual(case.category.name, clone.category.name)
+            self.assertEqual(1, clone.history.count())
+            self.assertEqual(self.new_author, clone.history.get().history_user)
+            # sortkeys continue after the last TC in the plan
+            self.assertEqual(60 + number * 10,
+                             clone.testcaseplan_set.get(plan=self.other_plan).sortkey)
+
+        self.assertEqual([component], list(clones[0].component.all()))
+        self.assertEqual(3, Category.objects.filter(
+            product=self.other_plan.product,
+            name__in=list(case.category.name for case in cases)).count())
+        self.assertEqual([self.tag], list(clones[1].tag.all()))
+        self.assertFalse(clones[2].component.exists())
+        self.assertFalse(clones[2].tag.exists())
+        # original cases are not modified
+        self.assertEqual([self.component], list(self.case_1.component.all()))
+
+    def test_clone_without_plans(self):
+        clone = self.case_1.clone(self.new_author, [])
+
+        self.assertEqual(self.case_1.category, clone.category)
+        self.assertFalse(clone.plan.exists())
+        self.assertFalse(clone.component.exists())
+        self.assertEqual([self.tag], list(clone.tag.all()))
+
+
+class TestCaseRenderedText(BasePlanCase):
+    def test_rendered_text_is_refreshed_on_save(self):
+        case = TestCaseFactory(text='*first*')
+        case.refresh_from_db()
+        self.assertEqual('<p><em>first</em></p>', case.rendered_text)
+        self.assertEqual(MARKDOWN_VERSION, case.rendered_version)
+
+        case.text = '**second**'
+        case.save(update_fields=['text'])
+        case.refresh_from_db()
+        self.assertEqual('<p><strong>second</strong></p>', case.rendered_text)
+
+        # not part of the changelog
+        self.assertNotIn('rendered', case.history.latest().history_change_reason)
+
+    def test_rendered_text_is_refreshed_on_bulk_update(self):
+        case = TestCaseFactory(text='*first*')
+        TestCase.bulk_update([case.pk], {'text': '**second**'})
+
+        case.refresh_from_db()
+        self.assertEqual('<p><strong>second</strong></p>', case.rendered_text)
+
+
+class TestCaseList(BasePlanCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.login = TestCaseFactory(summary='Login works', text='Open the login page',
+                                    author=UserFactory(email='writer@example.com'))
+        cls.logout = TestCaseFactory(summary='Logout works', text='Click logout')
+        # note: TestCaseFactory doesn't send post_save
+        cls.login.save()
+        cls.logout.save()
+
+    def test_search_matches_summary_and_text(self):
+        self.assertEqual([self.login], list(TestCase.list({'search': 'login'})))
+        self.assertEqual([self.logout], list(TestCase.list({'search': 'click'})))
+
+    def test_search_matches_pk_and_author_email(self):
+        result = TestCase.list({'search': str(self.logout.pk)})
+        self.assertIn(self.logout, result)
+        self.assertNotIn(self.login, result)
+        self.assertEqual([self.login], list(TestCase.list({'search': 'writer@'})))
+
+
 class TestSendMailOnCaseIsUpdated(BasePlanCase):
     """Test send mail on case post_save signal is triggered"""
     @classmethod
@@ -90,8 +201,7 @@ class TestSendMailOnCaseIsUpdated(BasePlanCase):
         cls.case.emailing.auto_to_case_author = True
         cls.case.emailing.save()
 
-    @patch('tcms.core.utils.mailto.send_mail')
-    def test_send_mail_to_case_author(self, send_mail):
+    def test_send_mail_to_case_author(self):
         self.case.summary = 'New summary for running test'
         self.case.save()
 
@@ -99,11 +209,12 @@ class TestSendMailOnCaseIsUpdated(BasePlanCase):
         recipients = get_case_notification_recipients(self.case)
 
         # Verify notification mail
-        send_mail.assert_called_once_with(settings.EMAIL_SUBJECT_PREFIX + expected_subject,
-                                          expected_body,
-                                          settings.DEFAULT_FROM_EMAIL,
-                                          recipients,
-                                          fail_silently=False)
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual(settings.EMAIL_SUBJECT_PREFIX + expected_subject,
+                         mail.outbox[0].subject)
+        self.assertEqual(expected_body, mail.outbox[0].body)
+        self.assertEqual(settings.DEFAULT_FROM_EMAIL, mail.outbox[0].from_email)
+        self.assertEqual(sorted(recipients), mail.outbox[0].to)
 
 
 class TestSendMailOnCaseIsDeleted(BasePlanCase):
@@ -116,8 +227,7 @@ class TestSendMailOnCaseIsDeleted(BasePlanCase):
         cls.case.emailing.auto_to_case_author = True
         cls.case.emailing.save()
 
-    @patch('tcms.core.utils.mailto.send_mail')
-    def test_send_mail_to_case_author(self, send_mail):
+    def test_send_mail_to_case_author(self):
         expected_subject = _('DELETED: TestCase #%(pk)d - %(summary)s') % {
             'pk': self.case.pk,
             'summary': self.case.summary
@@ -128,8 +238,9 @@ class TestSendMailOnCaseIsDeleted(BasePlanCase):
         self.case.delete()
 
         # Verify notification mail
-        send_mail.assert_called_once_with(settings.EMAIL_SUBJECT_PREFIX + expected_subject,
-                                          expected_body,
-                                          settings.DEFAULT_FROM_EMAIL,
-                                          recipients,
-                                          fail_silently=False)
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual(settings.EMAIL_SUBJECT_PREFIX + expected_subject,
+                         mail.outbox[0].subject)
+        self.assertEqual(expected_body, mail.outbox[0].body)
+        self.assertEqual(settings.DEFAULT_FROM_EMAIL, mail.outbox[0].from_email)
+        self.assertEqual(sorted(recipients), mail.outbox[0].to)
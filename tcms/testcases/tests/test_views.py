@@ -6,17 +6,19 @@ from http import HTTPStatus
 from urllib.parse import urlencode
 
 from django.forms import ValidationError
+from django.http import StreamingHttpResponse
 from django.test import RequestFactory
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
+from mock import patch
 
 from tcms.management.models import Priority, Tag
 from tcms.testcases.fields import MultipleEmailField
 from tcms.testcases.models import TestCase, TestCasePlan
 from tcms.testcases.views import get_selected_testcases
 from tcms.testruns.models import TestExecutionStatus
-from tcms.tests import (BaseCaseRun, BasePlanCase, remove_perm_from_user,
-                        user_should_have_perm)
+from tcms.tests import (BaseCaseRun, BasePlanCase, consume_streaming_response,
+                        remove_perm_from_user, user_should_have_perm)
 from tcms.tests.factories import LinkReferenceFactory, TestCaseFactory
 from tcms.utils.permissions import initiate_user_with_default_setups
 
@@ -309,10 +311,14 @@ class TestPrintablePage(BasePlanCase):
         super().setUpTestData()
         cls.printable_url = reverse('testcases-printable')
 
+    def post_printable(self, data):
+        response = self.client.post(self.printable_url, data)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return consume_streaming_response(response)
+
     def test_printable_page(self):
         # printing only 1 of the cases
-        response = self.client.post(self.printable_url,
-                                    {'case': [self.case_1.pk]})
+        response = self.post_printable({'case': [self.case_1.pk]})
 
         # not printing the Test Plan header section
         self.assertNotContains(response, 'Test Plan Document')
@@ -331,6 +337,48 @@ class TestPrintablePage(BasePlanCase):
             html=True
         )
 
+    def test_printable_page_renders_outdated_text(self):
+        case = TestCaseFactory(text='*current*', plan=[self.plan])
+        # e.g. rendered with a previous allowlist
+        TestCase.objects.filter(pk=case.pk).update(  # pylint: disable=objects-update-used
+            rendered_text='<p>outdated</p>', rendered_version='previous'
+        )
+
+        response = self.post_printable({'case': [case.pk]})
+
+        self.assertContains(response, '<p><em>current</em></p>', html=True)
+        self.assertNotContains(response, 'outdated')
+
+    def test_printable_page_uses_rendered_text(self):
+        case = TestCaseFactory(text='*current*', plan=[self.plan])
+        TestCase.objects.filter(pk=case.pk).update(  # pylint: disable=objects-update-used
+            rendered_text='<p>precomputed</p>'
+        )
+
+        response = self.post_printable({'case': [case.pk]})
+
+        self.assertContains(response, '<p>precomputed</p>', html=True)
+
+    def test_printable_plan_is_rendered_in_chunks(self):
+        # pylint: disable=objects-update-used
+        TestCasePlan.objects.filter(plan=self.plan, case=self.case_1).update(sortkey=1000)
+        expected = list(TestCasePlan.objects.filter(plan=self.plan).order_by(
+            'sortkey', 'pk').values_list('case_id', flat=True))
+
+        # session, user, plan, contents and cases regardless of the number of chunks
+        with patch('tcms.testcases.views.PRINTABLE_CHUNK_SIZE', 2), \
+                self.assertNumQueries(5):
+            response = self.post_printable({'plan': self.plan.pk})
+
+        content = response.content.decode()
+        self.assertIn('Test Plan Document', content)
+        # ordered by sortkey, in the table of contents and in the document
+        positions = list(content.index('<li>TC-%d: ' % case_id) for case_id in expected)
+        self.assertEqual(sorted(positions), positions)
+        positions = list(content.index('<h3>TC-%d: ' % case_id) for case_id in expected)
+        self.assertEqual(sorted(positions), positions)
+        self.assertEqual(self.case_1.pk, expected[-1])
+
 
 class TestCloneCase(BasePlanCase):
     """Test clone view method"""
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
+from itertools import islice
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import permission_required
-from django.http import Http404, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
 from django.test import modify_settings
 from django.urls import reverse
 from django.utils.decorators import method_decorator
@@ -17,6 +19,7 @@ from django.views.generic.base import TemplateView, View
 from tcms.core.contrib.linkreference.models import LinkReference
 from tcms.core.helpers.comments import get_comments
 from tcms.core.response import ModifySettingsTemplateResponse
+from tcms.core.utils.markup import MARKDOWN_VERSION, markdown_to_html
 from tcms.management.models import Priority, Tag
 from tcms.search import remove_from_request_path
 from tcms.search.order import order_case_queryset
@@ -34,6 +37,9 @@ TESTCASE_OPERATION_ACTIONS = (
     'delete_cases',  # unlink cases from a TestPlan
 )
 
+# number of cases fetched from the database, and rendered, at once by printable()
+PRINTABLE_CHUNK_SIZE = 100
+
 
 # _____________________________________________________________________________
 # helper functions
@@ -543,18 +549,22 @@ class TestCaseGetView(DetailView):  # pylint: disable=missing-permission-require
 
 
 @require_POST
-def printable(request,  # pylint: disable=missing-permission-required
-              template_name='case/printable.html'):
+def printable(request):  # pylint: disable=missing-permission-required
     """
         Create the printable copy for plan/case.
         Only CONFIRMED TestCases are printed when printing a TestPlan!
+
+        The page is streamed to the client while cases are fetched from
+        the database, and rendered, in chunks so that memory usage stays
+        constant regardless of how many cases are printed!
     """
     # fixme: remove when TestPlan and TestCase templates have been converted to Patternfly
     # instead of generating the print values on the backend we can use CSS to do
     # this in the browser
     # search only by case PK. Used when printing selected cases
     case_ids = request.POST.getlist('case')
-    case_filter = {'pk__in': case_ids}
+    cases = TestCase.objects.filter(pk__in=case_ids).order_by('pk')
+    contents = TestCasePlan.objects.none()
 
     test_plan = None
     # plan_pk is passed from the TestPlan.printable function
@@ -563,23 +573,59 @@ def printable(request,  # pylint: disable=missing-permission-required
         plan_pk = request.POST.get('plan', 0)
         try:
             test_plan = TestPlan.objects.get(pk=plan_pk)
-            # search cases from a TestPlan, used when printing entire plan
-            case_filter = {
-                'pk__in': test_plan.case.all(),
-                'case_status': TestCaseStatus.objects.get(name='CONFIRMED').pk,
-            }
+            # search cases from a TestPlan, used when printing entire plan,
+            # in the same order as they appear in the TestPlan page
+            contents = TestCasePlan.objects.filter(plan=test_plan).values(
+                'case_id', 'case__summary', 'case__case_status__name'
+            ).order_by('sortkey', 'pk')
+            cases = TestCase.objects.filter(
+                testcaseplan__plan=test_plan,
+                case_status__name='CONFIRMED',
+            ).order_by('testcaseplan__sortkey', 'pk')
         except (ValueError, TestPlan.DoesNotExist):
             test_plan = None
 
-    tcs = TestCase.objects.filter(**case_filter).values(
-        'pk', 'summary', 'text'
-    ).order_by('pk')
+    cases = cases.values('pk', 'summary', 'text', 'rendered_text', 'rendered_version')
+    return StreamingHttpResponse(printable_pages(request, test_plan, contents, cases))
 
-    context_data = {
-        'test_plan': test_plan,
-        'test_cases': tcs,
-    }
-    return render(request, template_name, context_data)
+
+def printable_pages(request, test_plan,  # pylint: disable=missing-permission-required
+                    contents, cases):
+    """
+        Render the printable copy one piece at a time, see :func:`printable`.
+    """
+    chunk_size = PRINTABLE_CHUNK_SIZE
+    context = {'test_plan': test_plan}
+    yield render_to_string('case/printable/header.html', context, request)
+
+    if test_plan:
+        rows = contents.iterator(chunk_size)
+        chunk = list(islice(rows, chunk_size))
+        while chunk:
+            yield render_to_string('case/printable/contents.html', {'contents': chunk}, request)
+            chunk = list(islice(rows, chunk_size))
+
+    yield render_to_string('case/printable/document.html', context, request)
+
+    rows = cases.iterator(chunk_size)
+    chunk = list(islice(rows, chunk_size))
+    while chunk:
+        yield render_to_string('case/printable/cases.html',
+                               {'test_cases': with_rendered_text(chunk)}, request)
+        chunk = list(islice(rows, chunk_size))
+
+    yield render_to_string('case/printable/footer.html', context, request)
+
+
+def with_rendered_text(cases):
+    """
+        Use the HTML stored in the database when it is up to date,
+        otherwise render the text again!
+    """
+    for case in cases:
+        if case['rendered_version'] != MARKDOWN_VERSION or case['rendered_text'] is None:
+            case['rendered_text'] = markdown_to_html(case['text'])
+        yield case
 
 
 @method_decorator(permission_required('testcases.change_testcase'), name='dispatch')
@@ -639,8 +685,8 @@ class CloneTestCaseView(View):
         clone_form.populate(case_ids=request.POST.getlist('case'))
 
         if clone_form.is_valid():
-            for tc_src in clone_form.cleaned_data['case']:
-                tc_dest = tc_src.clone(request.user, clone_form.cleaned_data['plan'])
+            tc_dest = TestCase.clone_cases(clone_form.cleaned_data['case'], request.user,
+                                           clone_form.cleaned_data['plan'])[0]
 
             # Detect the number of items and redirect to correct one
             if len(clone_form.cleaned_data['case']) == 1:
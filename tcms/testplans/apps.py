@@ -6,9 +6,11 @@ class AppConfig(DjangoAppConfig):
     name = 'tcms.testplans'
 
     def ready(self):
-        from django.db.models.signals import post_save, pre_save
+        from django.db.models.signals import post_delete, post_save, pre_save
         from .models import TestPlan
         from tcms import signals
 
         pre_save.connect(signals.pre_save_clean, TestPlan)
         post_save.connect(signals.handle_emails_post_plan_save, TestPlan)
+        post_save.connect(signals.handle_search_index_post_save, TestPlan)
+        post_delete.connect(signals.handle_search_index_post_delete, TestPlan)
@@ -2,7 +2,7 @@
 
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from uuslug import slugify
 
@@ -10,8 +10,8 @@ from tcms.core.history import KiwiHistoricalRecords
 from tcms.core.models import TCMSActionModel
 from tcms.management.models import Version
 from tcms.rpc.serializer import TestPlanRPCSerializer
-from tcms.rpc.utils import distinct_filter
-from tcms.testcases.models import TestCasePlan
+from tcms.rpc.utils import search_filter, search_filter_page
+from tcms.testcases.models import TestCase, TestCasePlan
 
 
 class PlanType(TCMSActionModel):
@@ -51,12 +51,16 @@ class TestPlan(TCMSActionModel):
         return self.name
 
     @classmethod
-    def to_xmlrpc(cls, query=None):
-
+    def to_xmlrpc(cls, query=None,  # pylint: disable=arguments-differ,too-many-arguments
+                  stream=False, limit=None, after_pk=None, fields=None, search=None,
+                  start=0):
         _query = query or {}
-        qs = distinct_filter(TestPlan, _query).order_by('pk')
-        serializer = TestPlanRPCSerializer(model_class=cls, queryset=qs)
-        return serializer.serialize_queryset()
+        qs = search_filter(TestPlan, _query, after_pk, search)
+        serializer = TestPlanRPCSerializer(model_class=cls, queryset=qs, fields=fields)
+        result = serializer.serialize(stream, limit, start)
+        if limit is not None:
+            result = search_filter_page(result, search, start, limit)
+        return result
 
     def add_case(self, case, sortkey=None):
         if sortkey is None:
@@ -129,31 +133,34 @@ class TestPlan(TCMSActionModel):
         :return: cloned plan
         :rtype: :class:`tcms.testplans.models.TestPlan`
         """
-        tp_dest = TestPlan.objects.create(
-            name=name or self.make_cloned_name(),
-            product=product or self.product,
-            author=new_author or self.author,
-            type=self.type,
-            product_version=version or self.product_version,
-            create_date=self.create_date,
-            is_active=self.is_active,
-            extra_link=self.extra_link,
-            parent=self if set_parent else None,
-            text=self.text)
-
-        # Copy the plan tags
-        for tp_tag_src in self.tag.all():
-            tp_dest.add_tag(tag=tp_tag_src)
-
-        # include TCs inside cloned TP
-        for tc_src in self.case.all():
+        with transaction.atomic():
+            tp_dest = TestPlan.objects.create(
+                name=name or self.make_cloned_name(),
+                product=product or self.product,
+                author=new_author or self.author,
+                type=self.type,
+                product_version=version or self.product_version,
+                create_date=self.create_date,
+                is_active=self.is_active,
+                extra_link=self.extra_link,
+                parent=self if set_parent else None,
+                text=self.text)
+
+            # Copy the plan tags
+            TestPlanTag.objects.bulk_create(  # pylint: disable=bulk-create-used
+                TestPlanTag(plan=tp_dest, tag_id=tag_id)
+                for tag_id in self.tag.values_list('pk', flat=True))
+
+            # include TCs inside cloned TP
             # this parameter should really be named clone_testcases b/c if set
             # it clones the source TC and then adds it to the new TP
             if copy_testcases:
-                tc_src.clone(new_author, [tp_dest])
+                TestCase.clone_cases(self.case.all(), new_author, [tp_dest])
             else:
                 # otherwise just link the existing TC to the new TP
-                tp_dest.add_case(tc_src)
+                TestCasePlan.objects.bulk_create(  # pylint: disable=bulk-create-used
+                    TestCasePlan(plan=tp_dest, case_id=case_id, sortkey=number * 10)
+                    for number, case_id in enumerate(self.case.values_list('pk', flat=True)))
 
         return tp_dest
 
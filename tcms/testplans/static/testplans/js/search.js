@@ -1,22 +1,11 @@
-function pre_process_data(data) {
-    var tags_cache = {};
-
-    data.forEach(function(element) {
-        addResourceToData(element, 'tag', 'Tag.filter', tags_cache);
-    });
-}
-
-
 $(document).ready(function() {
     var table = $("#resultsTable").DataTable({
         pageLength: $('#navbar').data('defaultpagesize'),
+        // pages are sorted and sliced on the server
+        serverSide: true,
         ajax: function(data, callback, settings) {
             var params = {};
 
-            if ($('#id_name').val()) {
-                params['name__icontains'] = $('#id_name').val();
-            }
-
             if ($('#id_before').val()) {
                 params['create_date__lte'] = $('#id_before').data('DateTimePicker').date().format('YYYY-MM-DD 23:59:59');
             }
@@ -49,12 +38,16 @@ $(document).ready(function() {
 
             params['is_active'] = $('#id_active').is(':checked');
 
-            dataTableJsonRPC('TestPlan.filter', params, callback, pre_process_data);
+            // full-text search in name and text, ordered by relevance
+            const search = $('#id_name').val();
+
+            dataTableSearchRPC('TestPlan.search', params, data, callback, search);
         },
         columns: [
-            { data: "id" },
+            { data: "id", name: "id" },
             {
                 data: null,
+                name: "name",
                 render: function (data, type, full, meta) {
                     result = '<a href="/plan/'+ data.id + '/">' + escapeHTML(data.name) + '</a>';
                     if (! data.is_active) {
@@ -63,14 +56,17 @@ $(document).ready(function() {
                     return result;
                 }
             },
-            { data: "create_date" },
-            { data: "product" },
-            { data: "product_version" },
-            { data: "type"},
-            { data: "author" },
+            { data: "create_date", name: "create_date" },
+            { data: "product", name: "product" },
+            { data: "product_version", name: "product_version" },
+            { data: "type", name: "type" },
+            { data: "author", name: "author" },
             {
                 data: "tag",
-                render: renderFromCache,
+                orderable: false,
+                render: function (data, type, full, meta) {
+                    return data.join(', ');
+                }
             },
         ],
         dom: "t",
@@ -79,7 +75,8 @@ $(document).ready(function() {
             processing: '<div class="spinner spinner-lg"></div>',
             zeroRecords: "No records found"
         },
-        order: [[ 0, 'asc' ]],
+        // keep the order from the server, by relevance when searching
+        order: [],
     });
 
     hookIntoPagination('#resultsTable', table);
@@ -11,7 +11,7 @@ from uuslug import slugify
 from tcms.management.models import Product, Version
 from tcms.testcases.models import TestCasePlan, TestCaseStatus
 from tcms.testplans.models import TestPlan
-from tcms.tests import (BasePlanCase, remove_perm_from_user,
+from tcms.tests import (BasePlanCase, consume_streaming_response, remove_perm_from_user,
                         user_should_have_perm)
 from tcms.tests.factories import (ClassificationFactory, PlanTypeFactory,
                                   ProductFactory, TestCaseFactory,
@@ -90,7 +90,8 @@ class PlanTests(BasePlanTest):
 
     def test_plan_printable(self):
         location = reverse('plans-printable')
-        response = self.client.post(location, {'plan': [self.test_plan.pk]})
+        response = consume_streaming_response(
+            self.client.post(location, {'plan': [self.test_plan.pk]}))
         self.assertEqual(response.status_code, HTTPStatus.OK)
 
         self.assertContains(response, self.test_plan.name)
@@ -6,10 +6,14 @@ class AppConfig(DjangoAppConfig):
     name = 'tcms.testruns'
 
     def ready(self):
-        from django.db.models.signals import post_save, pre_save, pre_delete
+        from django.db.models.signals import post_delete, post_save, pre_save, pre_delete
         from .models import TestExecution, TestRun
         from tcms import signals
 
         post_save.connect(signals.handle_emails_post_run_save, sender=TestRun)
         pre_save.connect(signals.pre_save_clean, sender=TestRun)
         pre_delete.connect(signals.handle_comments_pre_delete, TestExecution)
+        post_save.connect(signals.handle_status_counts_post_execution_save,
+                          sender=TestExecution)
+        post_delete.connect(signals.handle_status_counts_post_execution_delete,
+                            sender=TestExecution)
@@ -0,0 +1,46 @@
+# Generated by Django 3.0.9 on 2026-10-17 07:41
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def count_executions(apps, schema_editor):
+    test_execution_model = apps.get_model('testruns', 'TestExecution')
+    test_run_status_count_model = apps.get_model('testruns', 'TestRunStatusCount')
+
+    counters = []
+    for row in test_execution_model.objects.values('run', 'status').annotate(
+            total=Count('pk')
+    ).order_by():
+        counters.append(test_run_status_count_model(
+            run_id=row['run'], status_id=row['status'], count=row['total']))
+
+    test_run_status_count_model.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testruns', '0009_remove_autofield'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestRunStatusCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                                          related_name='status_counts',
+                                          to='testruns.TestRun')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                                             to='testruns.TestExecutionStatus')),
+            ],
+            options={
+                'unique_together': {('run', 'status')},
+            },
+        ),
+        migrations.RunPython(count_executions, migrations.RunPython.noop),
+    ]
@@ -3,8 +3,8 @@ from collections import namedtuple
 
 import vinaigrette
 from django.conf import settings
-from django.db import models
-from django.db.models import Count
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import override
@@ -17,6 +17,7 @@ from tcms.core.models import TCMSActionModel
 from tcms.rpc.serializer import (TestExecutionRPCSerializer,
                                  TestRunRPCSerializer)
 from tcms.rpc.utils import distinct_filter
+from tcms.testcases.models import TestCase
 
 TestExecutionStatusSubtotal = namedtuple('TestExecutionStatusSubtotal', [
     'StatusSubtotal',
@@ -60,11 +61,12 @@ class TestRun(TCMSActionModel):
         return self.summary
 
     @classmethod
-    def to_xmlrpc(cls, query=None):
+    def to_xmlrpc(cls, query=None,  # pylint: disable=arguments-differ,too-many-arguments
+                  stream=False, limit=None, after_pk=None, fields=None):
         _query = query or {}
-        qs = distinct_filter(TestRun, _query).order_by('pk')
-        serializer = TestRunRPCSerializer(model_class=cls, queryset=qs)
-        return serializer.serialize_queryset()
+        qs = distinct_filter(TestRun, _query, after_pk).order_by('pk')
+        serializer = TestRunRPCSerializer(model_class=cls, queryset=qs, fields=fields)
+        return serializer.serialize(stream, limit)
 
     def _get_absolute_url(self):
         return reverse('testruns-get', args=[self.pk, ])
@@ -114,6 +116,100 @@ class TestRun(TCMSActionModel):
                                     sortkey=sortkey,
                                     close_date=None)
 
+    def add_case_runs(self, executions, user=None):
+        """
+            Save multiple new TestExecution objects for this TestRun,
+            together with their history, using a fixed number of queries.
+
+            :param executions: Unsaved TestExecution objects
+            :type executions: list
+            :param user: Recorded as the author of the historical records
+            :type user: User
+            :return: The saved TestExecution objects
+            :rtype: list
+        """
+        if not executions:
+            return []
+
+        with transaction.atomic():
+            TestExecution.objects.bulk_create(executions)  # pylint: disable=bulk-create-used
+
+            # only PostgreSQL sets PKs after bulk_create(). Reload everything
+            # in one query via the unique (case, run, case_text_version)
+            # constraint instead of the 1 query per object which
+            # bulk_create_with_history() does on other databases
+            if executions[0].pk is None:
+                saved = {}
+                for execution in self.case_run.filter(
+                        case__in=set(execution.case_id for execution in executions)):
+                    saved[(execution.case_id, execution.case_text_version)] = execution
+
+                reloaded = []
+                for execution in executions:
+                    reloaded.append(saved[(execution.case_id, execution.case_text_version)])
+                executions = reloaded
+
+            TestExecution.history.bulk_history_create(  # pylint: disable=no-member
+                executions, default_user=user)
+
+            TestRunStatusCount.record_changes(
+                (None, execution) for execution in executions)
+
+        return executions
+
+    def add_cases(self, cases, status=1, assignee=None,  # pylint: disable=too-many-arguments
+                  sortkeys=None, user=None, batch_size=500):
+        """
+            Add multiple TestCase objects to this TestRun. Uses the same
+            defaults as :meth:`add_case_run` but only 1 query per batch
+            to resolve the latest case_text_version, in addition to
+            the queries done by :meth:`add_case_runs`.
+
+            :param cases: TestCase objects to add
+            :type cases: iterable
+            :param status: PK of the initial TestExecutionStatus or the object itself
+            :type status: int or TestExecutionStatus
+            :param assignee: Defaults to the default tester of each TestCase
+                             and then to the default tester of this TestRun
+            :type assignee: User
+            :param sortkeys: Mapping between TestCase PKs and sortkeys, default 0
+            :type sortkeys: dict
+            :param user: Recorded as the author of the historical records
+            :type user: User
+            :param batch_size: Number of TestExecution objects created at once
+            :type batch_size: int
+            :return: The saved TestExecution objects, in the same order as *cases*
+            :rtype: list
+        """
+        status_id = status if isinstance(status, int) else status.pk
+        assignee_id = assignee.pk if assignee else None
+        sortkeys = sortkeys or {}
+        cases = list(cases)
+
+        result = []
+        with transaction.atomic():
+            for start in range(0, len(cases), batch_size):
+                batch = cases[start:start + batch_size]
+                latest_history_ids = TestCase.get_latest_history_ids(
+                    set(case.pk for case in batch))
+
+                executions = []
+                for case in batch:
+                    executions.append(TestExecution(
+                        run=self,
+                        case=case,
+                        assignee_id=assignee_id or case.default_tester_id
+                        or self.default_tester_id,
+                        tested_by=None,
+                        status_id=status_id,
+                        case_text_version=latest_history_ids[case.pk],
+                        build_id=self.build_id,
+                        sortkey=sortkeys.get(case.pk, 0),
+                        close_date=None))
+                result.extend(self.add_case_runs(executions, user))
+
+        return result
+
     def add_tag(self, tag):
         return TestRunTag.objects.get_or_create(
             run=self,
@@ -153,17 +249,16 @@ class TestRun(TCMSActionModel):
         return percent
 
     def _get_completed_case_run_percentage(self):
-        ids = TestExecutionStatus.objects.exclude(weight=0).values_list('pk', flat=True)
-
-        completed_caserun = self.case_run.filter(
-            status__in=ids)
+        completed_caserun = self.status_counts.exclude(
+            status__weight=0
+        ).aggregate(total=Sum('count'))['total'] or 0
 
-        return self.get_percentage(completed_caserun.count())
+        return self.get_percentage(completed_caserun)
 
     completed_case_run_percent = property(_get_completed_case_run_percentage)
 
     def _get_total_case_run_num(self):
-        return self.case_run.count()
+        return self.status_counts.aggregate(total=Sum('count'))['total'] or 0
 
     total_num_caseruns = property(_get_total_case_run_num)
 
@@ -188,11 +283,7 @@ class TestRun(TCMSActionModel):
         if statuses is None:
             statuses = TestExecutionStatus.objects.only('pk', 'name').order_by('pk')
 
-        rows = TestExecution.objects.filter(
-            run=self.pk
-        ).values(
-            'status'
-        ).annotate(status_count=Count('status'))
+        rows = self.status_counts.values('status', status_count=F('count'))
 
         caserun_statuses_subtotal = dict((status.pk, [0, status])
                                          for status in statuses)
@@ -259,7 +350,7 @@ vinaigrette.register(TestExecutionStatus, ['name'])
 
 
 class TestExecution(TCMSActionModel):
-    history = KiwiHistoricalRecords()
+    history = KiwiHistoricalRecords(snapshot=True)
 
     assignee = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True,
                                  related_name='case_run_assignee',
@@ -290,12 +381,14 @@ class TestExecution(TCMSActionModel):
         return '%s: %s' % (self.pk, self.case_id)
 
     @classmethod
-    def to_xmlrpc(cls, query: dict = None):
+    def to_xmlrpc(cls, query: dict = None,  # pylint: disable=arguments-differ,too-many-arguments
+                  stream=False, limit=None, after_pk=None, fields=None):
         if query is None:
             query = {}
-        query_set = distinct_filter(TestExecution, query).order_by('pk')
-        serializer = TestExecutionRPCSerializer(model_class=cls, queryset=query_set)
-        return serializer.serialize_queryset()
+        query_set = distinct_filter(TestExecution, query, after_pk).order_by('pk')
+        serializer = TestExecutionRPCSerializer(model_class=cls, queryset=query_set,
+                                                fields=fields)
+        return serializer.serialize(stream, limit)
 
     def get_bugs(self):
         return LinkReference.objects.filter(
@@ -310,6 +403,98 @@ class TestExecution(TCMSActionModel):
         return reverse('testruns-get', args=[self.run_id])
 
 
+class TestRunStatusCount(models.Model):
+    """
+        Denormalized number of executions in each status for every
+        TestRun. Kept up to date by signal handlers so that progress
+        statistics don't have to aggregate all executions of a run!
+    """
+    run = models.ForeignKey(TestRun, related_name='status_counts', on_delete=models.CASCADE)
+    status = models.ForeignKey(TestExecutionStatus, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('run', 'status')
+
+    def __str__(self):
+        return '%s: %s' % (self.status_id, self.count)
+
+    @classmethod
+    def record_changes(cls, changes):
+        """
+            Update counters after TestExecution objects have been
+            created, modified or deleted.
+
+            :param changes: (previous, current) pairs of TestExecution objects.
+                            ``previous`` is None for new objects and
+                            ``current`` is None for deleted objects
+            :type changes: iterable
+        """
+        deltas = {}
+        for previous, current in changes:
+            if previous is not None:
+                key = (previous.run_id, previous.status_id)
+                deltas[key] = deltas.get(key, 0) - 1
+
+            if current is not None:
+                key = (current.run_id, current.status_id)
+                deltas[key] = deltas.get(key, 0) + 1
+
+        cls.change_counts(deltas)
+
+    @classmethod
+    def change_counts(cls, deltas):
+        """
+            Apply changes in the number of executions.
+
+            :param deltas: Mapping between (run_id, status_id) pairs and
+                           the number of executions added (or removed
+                           if negative) for them
+            :type deltas: dict
+        """
+        for (run_id, status_id), delta in deltas.items():
+            if delta > 0:
+                counter, created = cls.objects.get_or_create(
+                    run_id=run_id, status_id=status_id, defaults={'count': delta})
+                if not created:
+                    cls.objects.filter(  # pylint: disable=objects-update-used
+                        pk=counter.pk
+                    ).update(count=F('count') + delta)
+            elif delta < 0:
+                # note: never create counters here b/c executions are also
+                # removed when cascading the delete of their TestRun
+                cls.objects.filter(  # pylint: disable=objects-update-used
+                    run_id=run_id, status_id=status_id
+                ).update(count=F('count') + delta)
+
+    @classmethod
+    def rebuild(cls, run_ids=None):
+        """
+            Recalculate counters from scratch for the specified TestRun
+            PKs or for all test runs.
+        """
+        executions = TestExecution.objects.all()
+        counters = cls.objects.all()
+        if run_ids is not None:
+            executions = executions.filter(run__in=run_ids)
+            counters = counters.filter(run__in=run_ids)
+
+        new_counters = []
+        for row in executions.values('run', 'status').annotate(
+                total=Count('pk')
+        ).order_by():
+            new_counters.append(
+                cls(run_id=row['run'], status_id=row['status'], count=row['total']))
+
+        with transaction.atomic():
+            counters.delete()
+            # counters don't keep history
+            cls.objects.bulk_create(  # pylint: disable=bulk-create-used
+                new_counters, batch_size=1000)
+
+        return len(new_counters)
+
+
 class TestRunTag(models.Model):
     tag = models.ForeignKey('management.Tag', on_delete=models.CASCADE)
     run = models.ForeignKey(TestRun, related_name='tags', on_delete=models.CASCADE)
@@ -1,26 +1,8 @@
-function pre_process_data(data) {
-    var product_cache = {};
-    var tags_cache = {};
-
-    data.forEach(function(element) {
-        // collect info about products
-        addResourceToData(element, 'tag', 'Tag.filter', tags_cache);
-
-        if (element.plan_id in product_cache) {
-            element['product'] = product_cache[element.plan_id];
-        } else {
-            jsonRPC('TestPlan.filter', {pk: element.plan_id}, function(data) {
-                element['product'] = data[0].product;
-            }, true);
-            product_cache[element.plan_id] = element.product;
-        }
-    });
-}
-
-
 $(document).ready(function() {
     var table = $("#resultsTable").DataTable({
         pageLength: $('#navbar').data('defaultpagesize'),
+        // pages are sorted and sliced on the server
+        serverSide: true,
         ajax: function(data, callback, settings) {
             var params = {};
 
@@ -56,12 +38,13 @@ $(document).ready(function() {
 
             params['stop_date__isnull'] = $('#id_running').is(':checked');
 
-            dataTableJsonRPC('TestRun.filter', params, callback, pre_process_data);
+            dataTableSearchRPC('TestRun.search', params, data, callback);
         },
         columns: [
-            { data: "id" },
+            { data: "id", name: "id" },
             {
                 data: null,
+                name: "summary",
                 render: function (data, type, full, meta) {
                     result = '<a href="/runs/'+ data.id + '/" target="_parent">' + escapeHTML(data.summary) + '</a>';
                     if (data.stop_date) {
@@ -72,19 +55,23 @@ $(document).ready(function() {
             },
             {
                 data: null,
+                name: "plan",
                 render: function (data, type, full, meta) {
                     return '<a href="/plan/'+ data.plan_id + '/" target="_parent">TP-' + data.plan_id + ': ' + escapeHTML(data.plan) + '</a>';
                 }
             },
-            { data: "product" },
-            { data: "product_version"},
-            { data: "build"},
+            { data: "product", name: "product" },
+            { data: "product_version", name: "product_version" },
+            { data: "build", name: "build" },
 
-            { data: "manager" },
-            { data: "default_tester" },
+            { data: "manager", name: "manager" },
+            { data: "default_tester", name: "default_tester" },
             {
                 data: "tag",
-                render: renderFromCache,
+                orderable: false,
+                render: function (data, type, full, meta) {
+                    return data.join(', ');
+                }
             },
         ],
         dom: "t",
@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=too-many-ancestors
 
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.translation import gettext_lazy as _
-from mock import patch
 
+from tcms.testruns.models import (TestExecution, TestExecutionStatus, TestRun,
+                                  TestRunStatusCount)
 from tcms.tests import BaseCaseRun
-from tcms.tests.factories import LinkReferenceFactory, TestRunFactory
+from tcms.tests.factories import (LinkReferenceFactory, TestCaseFactory,
+                                  TestExecutionFactory, TestRunFactory,
+                                  UserFactory)
 
 
 class Test_TestRun(BaseCaseRun):  # pylint: disable=invalid-name
@@ -29,8 +35,7 @@ class Test_TestRun(BaseCaseRun):  # pylint: disable=invalid-name
 
         self.assertEqual(3, self.test_run.get_bug_count())
 
-    @patch('tcms.core.utils.mailto.send_mail')
-    def test_send_mail_after_test_run_creation(self, send_mail):
+    def test_send_mail_after_test_run_creation(self):
         test_run = TestRunFactory(plan=self.plan)
 
         recipients = test_run.get_notify_addrs()
@@ -38,6 +43,127 @@ class Test_TestRun(BaseCaseRun):  # pylint: disable=invalid-name
         # Verify notification mail
         self.assertIn(_("NEW: TestRun #%(pk)d - %(summary)s") %
                       {'pk': test_run.pk, 'summary': test_run.summary},
-                      send_mail.call_args_list[0][0][0])
+                      mail.outbox[0].subject)
         for recipient in recipients:
-            self.assertIn(recipient, send_mail.call_args_list[0][0][-1])
+            self.assertIn(recipient, mail.outbox[0].to)
+
+
+class TestRunStatusCounters(BaseCaseRun):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.status_passed = TestExecutionStatus.objects.get(name='PASSED')
+
+    def assert_counts(self, test_run, expected):
+        counts = dict(test_run.status_counts.filter(
+            count__gt=0
+        ).values_list('status', 'count'))
+        self.assertEqual(expected, counts)
+
+        # must always match the actual number of executions
+        TestRunStatusCount.rebuild([test_run.pk])
+        self.assertEqual(expected, dict(test_run.status_counts.values_list('status', 'count')))
+
+    def test_counters_follow_execution_changes(self):
+        self.assert_counts(self.test_run, {self.status_idle.pk: 3})
+
+        # note: not modifying self.execution_1 b/c it is shared between tests
+        execution = TestExecution.objects.get(pk=self.execution_1.pk)
+        execution.status = self.status_passed
+        execution.save()
+        self.assert_counts(self.test_run, {self.status_idle.pk: 2, self.status_passed.pk: 1})
+
+        TestExecutionFactory(run=self.test_run, status=self.status_passed)
+        self.assert_counts(self.test_run, {self.status_idle.pk: 2, self.status_passed.pk: 2})
+
+        TestExecution.objects.get(pk=self.execution_2.pk).delete()
+        self.assert_counts(self.test_run, {self.status_idle.pk: 1, self.status_passed.pk: 2})
+
+    def test_moving_execution_to_another_run(self):
+        execution = TestExecution.objects.get(pk=self.execution_1.pk)
+        execution.run = self.test_run_1
+        execution.save()
+
+        self.assert_counts(self.test_run, {self.status_idle.pk: 2})
+        self.assert_counts(self.test_run_1, {self.status_idle.pk: 4})
+
+    def test_deleting_test_run_deletes_counters(self):
+        run_id = self.test_run.pk
+        # note: not using self.test_run b/c delete() resets its PK
+        TestRun.objects.get(pk=run_id).delete()
+
+        self.assertFalse(TestRunStatusCount.objects.filter(run=run_id).exists())
+        self.assertFalse(TestExecution.objects.filter(run=run_id).exists())
+
+    def test_statistics_are_read_from_counters(self):
+        execution = TestExecution.objects.get(pk=self.execution_1.pk)
+        execution.status = self.status_passed
+        execution.save()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(3, self.test_run.total_num_caseruns)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(33.33, self.test_run.completed_case_run_percent)
+
+        stats = self.test_run.stats_executions_status()
+        self.assertEqual(3, stats.CaseRunsTotalCount)
+        self.assertEqual(1, stats.StatusSubtotal[self.status_passed.pk][0])
+        self.assertEqual(2, stats.StatusSubtotal[self.status_idle.pk][0])
+
+
+class TestRunAddCases(BaseCaseRun):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.case_tester = UserFactory()
+        cls.case_with_tester = TestCaseFactory(default_tester=cls.case_tester,
+                                               case_status=cls.case_status_confirmed,
+                                               plan=[cls.plan])
+        cls.case_with_tester.save()  # will generate history object
+        cls.cases = [cls.case_1, cls.case_2, cls.case_3, cls.case_with_tester]
+
+    def new_run(self):
+        return TestRunFactory(plan=self.plan, build=self.build,
+                              manager=self.tester, default_tester=self.tester)
+
+    def test_add_cases(self):
+        test_run = self.new_run()
+
+        executions = test_run.add_cases(self.cases, sortkeys={self.case_2.pk: 20},
+                                        batch_size=3)
+
+        self.assertEqual(list(case.pk for case in self.cases),
+                         list(execution.case_id for execution in executions))
+        for case, execution in zip(self.cases, executions):
+            execution = TestExecution.objects.get(pk=execution.pk)
+            self.assertEqual(test_run, execution.run)
+            self.assertEqual(case.history.latest().history_id, execution.case_text_version)
+            self.assertEqual(self.status_idle, execution.status)
+            self.assertEqual(self.build, execution.build)
+            self.assertIsNone(execution.tested_by)
+            self.assertEqual(20 if case == self.case_2 else 0, execution.sortkey)
+            self.assertEqual(1, execution.history.count())
+
+        self.assertEqual(self.tester, executions[0].assignee)
+        self.assertEqual(self.case_tester, executions[-1].assignee)
+        self.assertEqual(4, test_run.total_num_caseruns)
+
+    def test_add_cases_with_assignee(self):
+        assignee = UserFactory()
+
+        executions = self.new_run().add_cases(self.cases, assignee=assignee)
+
+        for execution in executions:
+            self.assertEqual(assignee.pk, execution.assignee_id)
+
+    def test_query_count_does_not_depend_on_number_of_cases(self):
+        with CaptureQueriesContext(connection) as single:
+            self.new_run().add_cases(self.cases[:1])
+
+        with CaptureQueriesContext(connection) as multiple:
+            self.new_run().add_cases(self.cases)
+
+        self.assertEqual(len(single.captured_queries), len(multiple.captured_queries))
@@ -6,14 +6,19 @@ from http import HTTPStatus
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import formats
 from django.utils.translation import gettext_lazy as _
 
 from tcms.testruns.models import TestExecutionStatus, TestRun
+from tcms.testruns.views import _open_run_get_executions, _walk_executions
 from tcms.tests import (BaseCaseRun, BasePlanCase, remove_perm_from_user,
                         user_should_have_perm)
-from tcms.tests.factories import (TagFactory, TestCaseFactory,
+from tcms.tests.factories import (LinkReferenceFactory, TagFactory,
+                                  TestCaseFactory, TestExecutionFactory,
                                   UserFactory)
 from tcms.utils.permissions import initiate_user_with_default_setups
 
@@ -77,6 +82,60 @@ class TestGetRun(BaseCaseRun):
         self.assertNotContains(response, 'js-remove-tag')
 
 
+class TestWalkExecutions(BaseCaseRun):
+    """Rendering the executions table must not issue queries per execution"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        LinkReferenceFactory(execution=cls.execution_1, is_defect=True)
+        LinkReferenceFactory(execution=cls.execution_1, is_defect=True)
+        LinkReferenceFactory(execution=cls.execution_2, is_defect=False)
+
+    @staticmethod
+    def _walk_and_count_queries(test_run):
+        request = RequestFactory().get('/')
+        rows = {}
+
+        with CaptureQueriesContext(connection) as context:
+            executions = _open_run_get_executions(request, test_run)
+            for execution, tester, assignee, priority, comments, bugs in \
+                    _walk_executions(executions):
+                # attributes accessed in templates/run/table_executions.html
+                rows[execution.pk] = (
+                    execution.case_id, execution.case.summary, execution.case.is_automated,
+                    str(execution.case.category), execution.status.icon,
+                    execution.status.color, tester, assignee, priority,
+                    comments, bugs,
+                )
+
+        return rows, len(context.captured_queries)
+
+    def test_bugs_are_counted_per_execution(self):
+        rows, _queries = self._walk_and_count_queries(self.test_run)
+
+        self.assertEqual(2, rows[self.execution_1.pk][-1])
+        self.assertEqual(0, rows[self.execution_2.pk][-1])
+        self.assertEqual(0, rows[self.execution_3.pk][-1])
+        self.assertEqual(self.execution_1.case.priority.value, rows[self.execution_1.pk][-3])
+
+    def test_query_count_does_not_grow_with_run_size(self):
+        _rows, queries_for_small_run = self._walk_and_count_queries(self.test_run)
+
+        for _i in range(20):
+            case = TestCaseFactory()
+            case.save()  # will generate history object
+            execution = TestExecutionFactory(run=self.test_run, build=self.build,
+                                             status=self.status_idle, case=case)
+            LinkReferenceFactory(execution=execution, is_defect=True)
+
+        rows, queries_for_large_run = self._walk_and_count_queries(self.test_run)
+
+        self.assertEqual(23, len(rows))
+        self.assertEqual(queries_for_small_run, queries_for_large_run)
+
+
 class TestCreateNewRun(BasePlanCase):
     """Test creating new run"""
 
@@ -6,7 +6,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import permission_required
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count, Q
+from django.db.models import Count, F, Q
 from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
@@ -80,17 +80,14 @@ class CreateTestRunView(View):
                     default_tester=default_tester,
                 )
 
-                loop = 1
-                for case in form.cleaned_data['case']:
-                    try:
-                        tcp = TestCasePlan.objects.get(plan=test_plan, case=case)
-                        sortkey = tcp.sortkey
-                    except ObjectDoesNotExist:
-                        sortkey = loop * 10
+                cases = form.cleaned_data['case']
+                sortkeys = dict(TestCasePlan.objects.filter(
+                    plan=test_plan, case__in=cases).values_list('case', 'sortkey'))
+                for loop, case in enumerate(cases, 1):
+                    if case.pk not in sortkeys:
+                        sortkeys[case.pk] = loop * 10
 
-                    test_run.add_case_run(case=case, sortkey=sortkey,
-                                          assignee=default_tester)
-                    loop += 1
+                test_run.add_cases(cases, assignee=default_tester, sortkeys=sortkeys)
 
                 return HttpResponseRedirect(
                     reverse('testruns-get', args=[test_run.pk, ])
@@ -133,9 +130,10 @@ def _open_run_get_executions(request, run):  # pylint: disable=missing-permissio
     """
 
     executions = run.case_run.select_related(
-        'run', 'case'
+        'run', 'case', 'case__category', 'status'
     ).only('run_id',
-           'status',
+           'status__icon',
+           'status__color',
            'assignee',
            'tested_by',
            'case_text_version',
@@ -144,7 +142,7 @@ def _open_run_get_executions(request, run):  # pylint: disable=missing-permissio
            'case__is_automated',
            'case__priority',
            'case__category__name'
-           )
+           ).annotate(priority_value=F('case__priority__value'))
 
     # Continue to search the executionss with conditions
     # 4. executions preparing for render executions table
@@ -184,6 +182,16 @@ def open_run_get_users(case_runs):
     return (dict(testers.iterator()), dict(assignees.iterator()))
 
 
+def open_run_get_bugs_subtotal(execution_ids):
+    query_set = LinkReference.objects.filter(
+        is_defect=True,
+        execution__in=execution_ids
+    ).values('execution').annotate(bug_count=Count('pk')).order_by('execution')
+
+    result = ((row['execution'], row['bug_count']) for row in query_set)
+    return dict(result)
+
+
 class GetTestRunView(TemplateView):  # pylint: disable=missing-permission-required
     """Display testrun's details"""
 
@@ -245,21 +253,20 @@ def _get_tags(test_executions):
 def _walk_executions(test_executions):
     """Walking executions for helping rendering executions table"""
 
-    priorities = dict(Priority.objects.values_list('pk', 'value'))
     testers, assignees = open_run_get_users(test_executions)
     execution_pks = []
     for execution in test_executions:
         execution_pks.append(execution.pk)
     comments_subtotal = open_run_get_comments_subtotal(execution_pks)
+    bugs_subtotal = open_run_get_bugs_subtotal(execution_pks)
 
     for execution in test_executions:
         yield (execution,
                testers.get(execution.tested_by_id, None),
                assignees.get(execution.assignee_id, None),
-               priorities.get(execution.case.priority_id),
+               execution.priority_value,
                comments_subtotal.get(execution.pk, 0),
-               LinkReference.objects.filter(is_defect=True,
-                                            execution=execution.pk).count())
+               bugs_subtotal.get(execution.pk, 0))
 
 
 @method_decorator(permission_required('testruns.change_testrun'), name='dispatch')
@@ -439,17 +446,12 @@ class AddCasesToRunView(View):
             'default_tester').only('default_tester_id').filter(
                 pk__in=test_cases_ids)
 
+        sortkeys = None
         if request.POST.get('_use_plan_sortkey'):
-            test_case_pks = (test_case.pk for test_case in test_cases)
-            query_set = TestCasePlan.objects.filter(
-                plan=test_plan, case__in=test_case_pks).values('case', 'sortkey')
-            sort_keys_in_plan = dict((row['case'], row['sortkey']) for row in query_set.iterator())
-            for test_case in test_cases:
-                sort_key = sort_keys_in_plan.get(test_case.pk, 0)
-                test_run.add_case_run(case=test_case, sortkey=sort_key)
-        else:
-            for test_case in test_cases:
-                test_run.add_case_run(case=test_case)
+            sortkeys = dict(TestCasePlan.objects.filter(
+                plan=test_plan, case__in=test_cases).values_list('case', 'sortkey'))
+
+        test_run.add_cases(test_cases, sortkeys=sortkeys)
 
         return HttpResponseRedirect(reverse('testruns-get',
                                             args=[test_run.pk, ]))
@@ -5,6 +5,7 @@ from django import test
 from django.urls import reverse
 from django.conf import settings
 from django.contrib.auth.models import Permission
+from django.http import HttpResponse
 
 from tcms.testruns.models import TestExecutionStatus
 from tcms.testcases.models import TestCaseStatus
@@ -68,6 +69,14 @@ def create_request_user(username=None, password=None):
     return user
 
 
+def consume_streaming_response(response):
+    """
+        Return a regular response with the content of a streaming response
+        so that it can be inspected with ``assertContains()`` more than once!
+    """
+    return HttpResponse(b''.join(response.streaming_content), status=response.status_code)
+
+
 class LoggedInTestCase(test.TestCase):
     """
         Test case class for logged-in users which also provides couple of